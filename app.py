@@ -5,10 +5,13 @@ Streamlit 웹 인터페이스
 
 import streamlit as st
 import json
+import uuid
 from datetime import datetime
 from graph import create_quiz_graph, create_answer_graph
 from state import QuizState
+from nodes.clients import get_clients
 from nodes.question_search import search_wrong_questions
+from nodes.write_behind import get_write_behind
 
 
 # 페이지 설정
@@ -70,10 +73,38 @@ st.markdown("""
 
 
 # Session State 초기화
+@st.cache_resource
+def get_quiz_graph():
+    """문제 생성 그래프 (세션/재실행 사이에서 공유)"""
+    return create_quiz_graph()
+
+
+@st.cache_resource
+def get_answer_graph():
+    """답변 확인 그래프 (세션/재실행 사이에서 공유)"""
+    return create_answer_graph()
+
+
+@st.cache_resource
+def get_shared_clients():
+    """OpenAI/벡터 DB 클라이언트 (프로세스 종료 시 nodes.clients가 정리)"""
+    return get_clients()
+
+
 def initialize_session_state():
     """세션 상태 초기화"""
+    # 브라우저마다 사용자 ID (푼 문제/출제 순서를 다른 사용자와 공유하지 않음)
+    # URL 쿼리 파라미터(?uid=...)에 남겨 두므로 새로고침/북마크해도 진행 상태가 이어짐
+    if 'user_id' not in st.session_state:
+        user_id = st.query_params.get("uid")
+        if not user_id:
+            user_id = uuid.uuid4().hex
+            st.query_params["uid"] = user_id
+        st.session_state.user_id = user_id
+
     if 'quiz_state' not in st.session_state:
         st.session_state.quiz_state = {
+            "user_id": st.session_state.user_id,
             "question_type": "code",
             "similar_questions": [],
             "generated_question": None,
@@ -111,11 +142,12 @@ def generate_question_async(question_type: str):
 
     with st.spinner('🔄 문제 생성 중... 잠시만 기다려주세요!'):
         try:
-            # 그래프 생성
-            app = create_quiz_graph()
+            # 그래프 (한 번만 컴파일)
+            app = get_quiz_graph()
 
             # 초기 상태
             initial_state: QuizState = {
+                "user_id": st.session_state.user_id,
                 "question_type": question_type,
                 "similar_questions": [],
                 "generated_question": None,
@@ -152,8 +184,8 @@ def check_answer_async(user_answer: str):
 
     with st.spinner('답변 확인 중...'):
         try:
-            # 답변 확인용 그래프 사용
-            app = create_answer_graph()
+            # 답변 확인용 그래프 (한 번만 컴파일)
+            app = get_answer_graph()
 
             # 현재 상태 가져오기
             state = st.session_state.quiz_state
@@ -202,6 +234,7 @@ def generate_similar_question_from_wrong(wrong_question: dict):
 
         # 상태 생성 (틀린 문제 1개를 Few-shot으로!)
         state = {
+            "user_id": st.session_state.user_id,
             "question_type": question_type,
             "similar_questions": [wrong_question],  # 틀린 문제만 사용!
             "generated_question": None,
@@ -291,16 +324,22 @@ def main():
 
         with col2:
             if st.button("♻️ 문제\n초기화", type="secondary", use_container_width=True):
-                import os
-                # solved_questions.json 삭제
-                if os.path.exists("solved_questions.json"):
-                    os.remove("solved_questions.json")
+                # 이 사용자의 푼 문제 기록과 출제 순서만 처음으로 (다른 사용자에게는 영향 없음)
+                from nodes.quiz_store import get_quiz_store
+                get_write_behind().flush(timeout=5)
+                get_quiz_store().clear_solved(st.session_state.user_id)
+                get_quiz_store().reset_progress(st.session_state.user_id)
                 # 세션 초기화
                 st.session_state.question_generated = False
                 st.session_state.answer_submitted = False
                 st.success("푼 문제 초기화! 모든 문제를 다시 풀 수 있습니다!")
                 st.rerun()
 
+        # 백그라운드 저장 대기 작업 수
+        st.caption(f"💾 저장 대기: {get_write_behind().queue_depth}개")
+        clients = get_shared_clients()
+        st.caption(f"🔌 OpenAI 연결 풀: 최대 {clients.max_connections}개 (유휴 {clients.max_keepalive}개 유지)")
+
     # 메인 페이지
     if page == "📝 문제 풀기":
         show_quiz_page()
@@ -428,7 +467,7 @@ def show_review_page():
     if st.button("📚 복습 문제 불러오기", type="primary"):
         with st.spinner("복습 문제를 찾는 중..."):
             try:
-                result = search_wrong_questions({})
+                result = search_wrong_questions({"user_id": st.session_state.user_id})
                 wrong_questions = result.get('wrong_questions', [])
 
                 if wrong_questions:
@@ -0,0 +1,142 @@
+"""
+대량 임베딩/업로드 로더 벤치마크 (API 호출 없이 가짜 임베딩/인덱스로 실행)
+- 가짜 API는 호출마다 지연을 주고, 일정 확률로 일시적 오류를 냄
+- 요청 한도(토큰 수, 업로드 크기)를 넘는 청크가 오면 바로 실패시킴
+- 동시 처리 수별 vectors/sec를 비교하고, 중간에 끊긴 실행이 체크포인트에서 이어지는지 확인
+
+사용법:
+    python bench_bulk_load.py
+    python bench_bulk_load.py --count 5000 --latency 0.05 --failure-rate 0.1
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+
+from nodes.bulk_loader import BulkLoader
+
+
+DIMENSION = 1536
+
+
+# ==================== 가짜 API ====================
+
+class FakeEmbeddingAPI:
+    """OpenAI 임베딩 API 흉내 (토큰 한도, 지연, 일시적 오류)"""
+
+    def __init__(self, latency=0.02, failure_rate=0.0, max_tokens=300_000, seed=0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.max_tokens = max_tokens
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        with self.lock:
+            self.calls += 1
+            fail = self.random.random() < self.failure_rate
+        if sum(len(text) for text in texts) > self.max_tokens:
+            raise ValueError("요청 토큰 한도 초과")
+        threading.Event().wait(self.latency)
+        if fail:
+            raise ConnectionError("일시적 오류 (가짜)")
+
+        vectors = []
+        for text in texts:
+            digest = hashlib.sha256(text.encode('utf-8')).digest()
+            vectors.append([digest[i % 32] / 255 for i in range(DIMENSION)])
+        return vectors
+
+
+class FakeIndex:
+    """벡터 인덱스 upsert API 흉내 (업로드 크기 한도, 지연, 일시적 오류, 강제 중단)"""
+
+    def __init__(self, latency=0.02, failure_rate=0.0, max_bytes=2_000_000, crash_after=None, seed=1):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.max_bytes = max_bytes
+        self.crash_after = crash_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.vectors = {}
+
+    def upsert(self, ids, texts, embeddings, metadatas):
+        payload = json.dumps([{"id": i, "values": e, "metadata": m}
+                              for i, e, m in zip(ids, embeddings, metadatas)])
+        if len(payload.encode('utf-8')) > self.max_bytes:
+            raise ValueError("업로드 크기 한도 초과")
+        threading.Event().wait(self.latency)
+
+        with self.lock:
+            if self.crash_after is not None and len(self.vectors) >= self.crash_after:
+                # 재시도해도 계속 실패하는 장애 (프로세스가 끊긴 상황과 같음)
+                raise RuntimeError("인덱스 장애 (가짜)")
+            if self.random.random() < self.failure_rate:
+                raise ConnectionError("일시적 오류 (가짜)")
+            for vector_id, embedding in zip(ids, embeddings):
+                self.vectors[vector_id] = embedding
+
+
+def make_records(count):
+    records = []
+    for i in range(count):
+        text = f"문제 {i}번\n출처: 합성\n내용: 다음 코드의 실행 결과를 쓰시오. " + "가나다라" * (i % 50)
+        records.append((f"q_{i:08d}", text, {"question_number": i, "source": "합성"}))
+    return records
+
+
+# ==================== 실행 ====================
+
+def main():
+    parser = argparse.ArgumentParser(description="대량 임베딩/업로드 로더 벤치마크")
+    parser.add_argument("--count", type=int, default=2_000, help="레코드 수")
+    parser.add_argument("--latency", type=float, default=0.02, help="가짜 API 호출 지연(초)")
+    parser.add_argument("--failure-rate", type=float, default=0.05, help="가짜 API 일시적 오류 비율")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("대량 임베딩/업로드 로더 벤치마크")
+    print("="*60)
+
+    records = make_records(args.count)
+    no_sleep = lambda seconds: None
+
+    print("\n[동시 처리 수별 처리량]")
+    for concurrency in (1, 2, 4, 8):
+        api = FakeEmbeddingAPI(args.latency, args.failure_rate)
+        index = FakeIndex(args.latency, args.failure_rate)
+        loader = BulkLoader(api.embed_documents, index.upsert, DIMENSION,
+                            concurrency=concurrency, sleep=no_sleep)
+        stats = loader.load(records)
+        assert len(index.vectors) == args.count
+        print(f"  concurrency={concurrency}: {stats['vectors_per_sec']:8.1f} vectors/sec "
+              f"(청크 {stats['chunks']}개, 재시도 {stats['retries']}회)")
+
+    print("\n[중단 후 이어서 실행]")
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = os.path.join(tmp, "bench.checkpoint")
+        api = FakeEmbeddingAPI(args.latency)
+        index = FakeIndex(args.latency, crash_after=args.count // 2)
+        loader = BulkLoader(api.embed_documents, index.upsert, DIMENSION,
+                            checkpoint_file=checkpoint, retries=1, sleep=no_sleep)
+        try:
+            loader.load(records)
+        except RuntimeError as e:
+            print(f"  첫 실행 중단: {e}")
+
+        uploaded = len(index.vectors)
+        index.crash_after = None
+        stats = BulkLoader(api.embed_documents, index.upsert, DIMENSION,
+                           checkpoint_file=checkpoint, sleep=no_sleep).load(records)
+        assert len(index.vectors) == args.count
+        assert not os.path.exists(checkpoint)
+        print(f"  첫 실행 {uploaded}개 → 이어서 {stats['vectors']}개 (건너뜀 {stats['skipped']}개)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+PDF 텍스트 추출 엔진 비교 벤치마크
+- 같은 PDF들을 엔진별로 추출 + 파싱해서 페이지/초, 최대 메모리(RSS)를 측정
+- 기준 엔진(pdfplumber)과 파싱 결과(문제번호/답)가 어떻게 다른지 보여줌
+
+엔진마다 새 프로세스에서 실행하므로 최대 RSS가 서로 섞이지 않습니다.
+
+사용법:
+    python bench_extract.py
+    python bench_extract.py --data-folder data --engines pdfplumber pypdfium2
+"""
+
+import argparse
+import io
+import contextlib
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from exam_parser import ExamParser, parse_answer_block
+from pdf_engines import DEFAULT_ENGINE, ENGINES, available_engines, iter_pages
+
+
+def run_engine(engine, pdf_paths):
+    """(작업 프로세스) 엔진 하나로 모든 PDF를 추출/파싱하고 측정값을 반환합니다."""
+    pages = 0
+    chars = 0
+    parsed = {}
+
+    start = time.perf_counter()
+
+    for pdf_path in pdf_paths:
+        questions = {}
+        parser = ExamParser()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            for page_text in iter_pages(pdf_path, engine):
+                pages += 1
+                chars += len(page_text)
+                events = []
+                for line in page_text.split('\n'):
+                    events.extend(parser.feed(line))
+                _collect(events, questions)
+            _collect(parser.close(), questions)
+
+        parsed[os.path.basename(pdf_path)] = questions
+
+    elapsed = time.perf_counter() - start
+
+    # Linux는 KB, macOS는 byte 단위
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        max_rss *= 1024
+
+    return {
+        "pages": pages,
+        "chars": chars,
+        "seconds": elapsed,
+        "max_rss": max_rss,
+        "parsed": parsed
+    }
+
+
+def _collect(events, questions):
+    """문제번호 → 답 (답/해설 섹션이 없으면 문제번호만 None으로 기록)"""
+    for kind, question_num, content in events:
+        if kind == "question":
+            questions.setdefault(question_num, None)
+        elif kind == "answer":
+            questions[question_num] = parse_answer_block(content)["답"]
+
+
+def diff_parsed(baseline, other):
+    """PDF별로 기준 결과와 비교한 차이 목록을 반환합니다."""
+    diffs = {}
+
+    for pdf_name in sorted(set(baseline) | set(other)):
+        base = baseline.get(pdf_name, {})
+        cur = other.get(pdf_name, {})
+
+        missing = sorted(set(base) - set(cur))
+        extra = sorted(set(cur) - set(base))
+        changed = [(num, base[num], cur[num]) for num in sorted(set(base) & set(cur))
+                   if base[num] != cur[num]]
+
+        if missing or extra or changed:
+            diffs[pdf_name] = {"missing": missing, "extra": extra, "changed": changed}
+
+    return diffs
+
+
+def print_diffs(engine, diffs, max_examples):
+    if not diffs:
+        print(f"  ✓ {engine}: 기준과 문제번호/답이 모두 같음")
+        return
+
+    print(f"  ✗ {engine}: {len(diffs)}개 PDF에서 차이")
+    for pdf_name, diff in diffs.items():
+        print(f"    - {pdf_name}")
+        if diff["missing"]:
+            print(f"      누락된 문제: {diff['missing']}")
+        if diff["extra"]:
+            print(f"      추가된 문제: {diff['extra']}")
+        for num, base_answer, answer in diff["changed"][:max_examples]:
+            print(f"      문제 {num} 답: {base_answer!r} → {answer!r}")
+        if len(diff["changed"]) > max_examples:
+            print(f"      ... 답 차이 {len(diff['changed']) - max_examples}개 더")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 텍스트 추출 엔진 비교")
+    parser.add_argument("--data-folder", default="data", help="PDF 폴더")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES),
+                        help="비교할 엔진 (기본: 설치된 엔진 전부)")
+    parser.add_argument("--baseline", default=DEFAULT_ENGINE, help="파싱 결과 비교 기준 엔진")
+    parser.add_argument("--max-examples", type=int, default=5, help="PDF당 보여줄 답 차이 수")
+    args = parser.parse_args()
+
+    pdf_paths = sorted(
+        os.path.join(args.data_folder, f)
+        for f in os.listdir(args.data_folder) if f.endswith('.pdf')
+    )
+    if not pdf_paths:
+        print(f"❌ {args.data_folder} 폴더에 PDF 파일이 없습니다.")
+        return
+
+    engines = args.engines or available_engines()
+    if args.baseline not in engines:
+        engines.insert(0, args.baseline)
+
+    print("="*60)
+    print("PDF 텍스트 추출 엔진 비교")
+    print("="*60)
+    print(f"PDF {len(pdf_paths)}개, 엔진: {', '.join(engines)}\n")
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+
+    for engine in engines:
+        # 엔진마다 새 프로세스 (최대 RSS를 따로 재기 위해)
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            try:
+                results[engine] = executor.submit(run_engine, engine, pdf_paths).result()
+            except Exception as e:
+                print(f"  ✗ {engine}: 실행 실패 ({e})")
+
+    print(f"{'엔진':<12} {'페이지':>6} {'시간(s)':>8} {'페이지/초':>9} {'문자/초':>11} {'최대 RSS(MB)':>12}")
+    for engine, result in results.items():
+        seconds = max(result["seconds"], 1e-9)
+        print(f"{engine:<12} {result['pages']:>6} {result['seconds']:>8.2f} "
+              f"{result['pages'] / seconds:>9.1f} {result['chars'] / seconds:>11,.0f} "
+              f"{result['max_rss'] / 1024 / 1024:>12.1f}")
+
+    if args.baseline not in results:
+        print(f"\n⚠️ 기준 엔진 {args.baseline} 결과가 없어 파싱 결과 비교를 건너뜁니다.")
+        return
+
+    print(f"\n파싱 결과 비교 (기준: {args.baseline})")
+    baseline = results[args.baseline]["parsed"]
+    for engine, result in results.items():
+        if engine != args.baseline:
+            print_diffs(engine, diff_parsed(baseline, result["parsed"]), args.max_examples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+기출문제 파서 벤치마크
+- 정상적인 합성 시험지와 악의적인(깨진) 입력을 크기를 두 배씩 키워가며 파싱
+- 크기가 두 배일 때 시간이 두 배 근처면 선형, 네 배 근처면 이차 시간
+
+사용법:
+    python bench_parser.py
+    python bench_parser.py --max-size 1000000 --legacy-max-size 100000
+"""
+
+import argparse
+import io
+import contextlib
+import re
+import time
+
+from exam_parser import parse_exam_text
+
+
+# ==================== 입력 생성 ====================
+
+def make_exam_text(size):
+    """정상적인 형식의 합성 시험지 (문제 섹션 + 정답 및 해설 섹션)"""
+    questions = []
+    answers = []
+    num = 0
+
+    while sum(map(len, questions)) + sum(map(len, answers)) < size:
+        num += 1
+        body = [f"문제 {num} 다음 코드의 실행 결과를 쓰시오. (5점)"]
+        if num % 3 == 0:
+            body += ["def func(x):", "    return x * 2", "print(func(3))"]
+        elif num % 3 == 1:
+            body += ["#include <stdio.h>", "int main() {", '    printf("%d", 3);', "}"]
+        else:
+            body += ["public class Main {", "    public static void main(String[] args) {}", "}"]
+        body.append("답 :")
+        questions.append('\n'.join(body))
+        answers.append(f"[문제 {num}]\n정답{num}\n[해설]\n해설 {num}번 내용입니다.")
+
+    return '\n'.join(questions) + "\n기출문제 정답 및 해설\n" + '\n'.join(answers)
+
+
+def _repeat_to(unit, size, prefix="문제 1 "):
+    return prefix + unit * max(1, (size - len(prefix)) // len(unit))
+
+
+# 이름: (설명, 생성 함수)
+ADVERSARIAL_INPUTS = {
+    "include_without_main": (
+        "#include만 반복되고 int main이 없음",
+        lambda size: _repeat_to("#include <stdio.h>\n", size),
+    ),
+    "def_without_answer": (
+        "def가 반복되고 답 표시가 없음",
+        lambda size: _repeat_to("def f g ", size),
+    ),
+    "answer_label_noise": (
+        "'답' 뒤에 콜론 없이 공백만 반복",
+        lambda size: _repeat_to("답    ", size),
+    ),
+    "marker_whitespace": (
+        "'문제' 뒤 긴 공백 후 숫자가 아님",
+        lambda size: "문제" + " " * size + "x",
+    ),
+    "single_long_line": (
+        "줄바꿈 없는 거대한 한 줄",
+        lambda size: _repeat_to("가나다라 ", size),
+    ),
+    "marker_flood": (
+        "번호 없는 '[문제' 와 '문제' 표식 폭주",
+        lambda size: _repeat_to("[문제 문제 ", size, prefix="정답 및 해설\n"),
+    ),
+}
+
+
+# ==================== 기존 정규식 방식 (비교용) ====================
+
+_LEGACY_CODE_PATTERNS = [
+    r'((?:def|class)\s+\w+.*?)(?=답\s*[:：]|$)',  # Python
+    r'((?:public|private|protected)\s+(?:static\s+)?(?:class|void|int|String).*?)(?=답\s*[:：]|$)',  # Java
+    r'(#include.*?int\s+main.*?)(?=답\s*[:：]|$)',  # C/C++
+]
+
+
+def legacy_parse_questions(questions_text):
+    """예전 parse_questions_improved의 정규식 처리 (코드 추출 부분까지)"""
+    questions = []
+    pattern = r'문제\s+(\d+)\s+(.*?)(?=문제\s+\d+|$)'
+
+    for match in re.finditer(pattern, questions_text, re.DOTALL):
+        content = match.group(2).strip()
+        code = None
+        for code_pattern in _LEGACY_CODE_PATTERNS:
+            code_match = re.search(code_pattern, content, re.DOTALL)
+            if code_match:
+                code = code_match.group(1).strip()
+                content = content.replace(code, '').strip()
+                break
+        content = re.sub(r'답\s*[:：].*$', '', content, flags=re.MULTILINE | re.DOTALL).strip()
+        questions.append((int(match.group(1)), content, code))
+
+    return questions
+
+
+# ==================== 측정 ====================
+
+def measure(func, text, repeat=3):
+    """가장 빠른 실행 시간(초)"""
+    best = float("inf")
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func(text)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def sizes_up_to(min_size, max_size):
+    size = min_size
+    while size <= max_size:
+        yield size
+        size *= 2
+
+
+def run_case(name, description, make_input, args):
+    print(f"\n[{name}] {description}")
+    print(f"  {'크기':>10} {'파서(ms)':>10} {'ns/문자':>8} {'증가율':>6}   {'기존(ms)':>10} {'증가율':>6}")
+
+    prev_new = prev_legacy = None
+    worst_growth = 0.0
+
+    for size in sizes_up_to(args.min_size, args.max_size):
+        text = make_input(size)
+        new_time = measure(parse_exam_text, text, args.repeat)
+        new_growth = new_time / prev_new if prev_new else None
+        if new_growth:
+            worst_growth = max(worst_growth, new_growth)
+
+        legacy_col = f"{'-':>10} {'':>6}"
+        if size <= args.legacy_max_size:
+            legacy_time = measure(legacy_parse_questions, text, 1)
+            legacy_growth = legacy_time / prev_legacy if prev_legacy else None
+            legacy_col = f"{legacy_time * 1000:>10.2f} {_fmt_growth(legacy_growth)}"
+            prev_legacy = legacy_time
+
+        print(f"  {len(text):>10,} {new_time * 1000:>10.2f} {new_time / len(text) * 1e9:>8.1f} "
+              f"{_fmt_growth(new_growth)}   {legacy_col}")
+        prev_new = new_time
+
+    return worst_growth
+
+
+def _fmt_growth(growth):
+    return f"{growth:>5.1f}x" if growth else f"{'':>6}"
+
+
+def check_equivalence(text):
+    """정상 입력에서 새 파서가 기존 정규식 방식과 같은 문제/코드를 뽑는지 확인"""
+    questions, _ = parse_exam_text(text)
+    questions_section = text.split("기출문제 정답 및 해설")[0].strip()
+    legacy = legacy_parse_questions(questions_section)
+    current = [(q["문제번호"], q["문제내용"], q["코드"]) for q in questions]
+    return current == legacy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기출문제 파서 벤치마크")
+    parser.add_argument("--min-size", type=int, default=4_000, help="가장 작은 입력 크기(문자)")
+    parser.add_argument("--max-size", type=int, default=512_000, help="가장 큰 입력 크기(문자)")
+    parser.add_argument("--legacy-max-size", type=int, default=64_000,
+                        help="기존 정규식 방식을 돌릴 최대 크기 (이차 시간이라 크게 잡지 말 것)")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 측정 횟수 (최솟값 사용)")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("기출문제 파서 벤치마크")
+    print("="*60)
+
+    sample = make_exam_text(20_000)
+    print(f"\n정상 입력 결과 일치 (새 파서 vs 기존 정규식): "
+          f"{'✓' if check_equivalence(sample) else '✗ 불일치'}")
+
+    results = {"synthetic_exam": run_case("synthetic_exam", "정상적인 합성 시험지",
+                                          make_exam_text, args)}
+    for name, (description, make_input) in ADVERSARIAL_INPUTS.items():
+        results[name] = run_case(name, description, make_input, args)
+
+    print(f"\n{'='*60}")
+    print("요약 (크기 2배당 최대 시간 증가율, 2x 근처면 선형)")
+    print(f"{'='*60}")
+    for name, growth in results.items():
+        print(f"  - {name}: {growth:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+문제 코퍼스 파일 입출력
+- NDJSON(.ndjson / .jsonl): 한 줄에 문제 하나. 읽기/쓰기 모두 스트리밍
+- JSON 배열(.json): 기존 형식. 쓰기는 스트리밍, 읽기는 파일 전체 로드
+"""
+
+import hashlib
+import json
+import os
+
+
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+
+
+def is_ndjson(path):
+    """경로 확장자로 NDJSON 여부 판단"""
+    return path.lower().endswith(NDJSON_EXTENSIONS)
+
+
+def question_key(question):
+    """코퍼스 안에서 문제를 가리키는 키 ("출처#문제번호")"""
+    return f"{question.get('출처', '')}#{question.get('문제번호')}"
+
+
+# 내용 ID에 쓰는 필드 = 임베딩 텍스트(QuestionVectorDB._create_question_text)에 들어가는 필드
+# (답/해설/분류 필드만 바뀐 문제는 같은 ID → 다시 임베딩하지 않음)
+CONTENT_ID_FIELDS = ('문제번호', '출처', '문제내용', '코드')
+
+# 내용 ID 규칙이 바뀌면 올림 (ID를 저장해 둔 인덱스를 다시 만들도록)
+CONTENT_ID_VERSION = 2
+
+
+def question_content_id(question):
+    """문제 내용으로 정하는 ID (임베딩되는 필드가 같으면 같고, 한 글자라도 바뀌면 달라짐)"""
+    content = json.dumps({field: question.get(field) for field in CONTENT_ID_FIELDS},
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]
+
+
+def iter_corpus(path):
+    """코퍼스 파일의 문제를 하나씩 돌려줍니다.
+
+    NDJSON은 한 줄씩 읽으므로 메모리에는 문제 하나만 남습니다.
+    """
+    if not is_ndjson(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_num} 잘못된 JSON 줄: {e}") from e
+
+
+class CorpusWriter:
+    """문제를 하나씩 받아 코퍼스 파일로 쓰는 클래스 (with 문으로 사용)
+
+    임시 파일에 쓰고 정상 종료 시에만 교체하므로, 중간에 실패해도 기존
+    파일은 그대로 남습니다. .json은 json.dump(..., indent=2)와 같은 모양의
+    배열로 씁니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.ndjson = is_ndjson(path)
+        self.count = 0
+        self._tmp_path = path + ".tmp"
+        self._file = None
+
+    def __enter__(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+        if not self.ndjson:
+            self._file.write('[')
+        return self
+
+    def write(self, record):
+        if self.ndjson:
+            self._file.write(json.dumps(record, ensure_ascii=False))
+            self._file.write('\n')
+        else:
+            item = json.dumps(record, ensure_ascii=False, indent=2)
+            self._file.write(',\n  ' if self.count else '\n  ')
+            self._file.write(item.replace('\n', '\n  '))
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.ndjson:
+            self._file.write('\n]' if self.count else ']')
+        self._file.close()
+
+        if exc_type is None:
+            os.replace(self._tmp_path, self.path)
+        else:
+            os.remove(self._tmp_path)
+        return False
+
+
+def write_corpus(path, records):
+    """문제 iterator를 코퍼스 파일로 저장하고 저장한 개수를 반환합니다."""
+    with CorpusWriter(path) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.count
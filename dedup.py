@@ -0,0 +1,126 @@
+"""
+거의 같은 문제(중복 문제) 탐지
+- 문제내용 + 코드를 글자 n-gram(shingle) 집합으로 바꾸고 MinHash 서명을 계산
+- 서명을 band로 나눈 LSH 버킷에서만 후보를 찾으므로 전체 쌍 비교(O(N²)) 없이 동작
+- 후보는 서명으로 추정한 Jaccard 유사도가 기준 이상일 때만 중복으로 판단
+
+merge_json이 코퍼스를 쓰는 패스에서 문제를 하나씩 넣으며 바로 판단합니다.
+먼저 들어온 문제가 클러스터 대표가 됩니다.
+"""
+
+import re
+import zlib
+
+import numpy as np
+
+
+# MinHash 해시 함수: h(x) = (a * x + b) mod p  (p = 2^31 - 1, 곱이 uint64 범위 안)
+_MERSENNE_PRIME = (1 << 31) - 1
+_SEED = 20240601
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 16
+DEFAULT_SHINGLE_SIZE = 5
+
+DEDUP_MODES = ("collapse", "link")
+
+
+def normalize_text(question):
+    """중복 비교용 텍스트: 문제내용 + 코드, 공백을 하나로 합치고 소문자로"""
+    text = (question.get('문제내용') or '') + '\n' + (question.get('코드') or '')
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+def shingles(text, size=DEFAULT_SHINGLE_SIZE):
+    """글자 n-gram 해시 집합 (crc32, 실행마다 같은 값)"""
+    if len(text) <= size:
+        return {zlib.crc32(text.encode('utf-8'))}
+    return {zlib.crc32(text[i:i + size].encode('utf-8'))
+            for i in range(len(text) - size + 1)}
+
+
+class MinHasher:
+    """shingle 해시 집합 → MinHash 서명 (uint32 배열)"""
+
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, seed=_SEED):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, _MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, _MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+
+    def signature(self, shingle_hashes):
+        values = np.fromiter(shingle_hashes, dtype=np.uint64, count=len(shingle_hashes))
+        values %= _MERSENNE_PRIME
+        # (shingle 수 × num_perm) 행렬에서 열별 최솟값
+        hashed = (np.outer(values, self.a) + self.b) % _MERSENNE_PRIME
+        return hashed.min(axis=0).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    """MinHash LSH 인덱스 (문제를 하나씩 넣으면서 중복 여부를 바로 판단)
+
+    bands × rows = num_perm. 유사도 s인 두 문제가 후보가 될 확률은
+    1 - (1 - s^rows)^bands 이므로, 기본값(16 × 8)에서는 s ≈ 0.7 근처부터
+    후보가 되고, 최종 판단은 추정 유사도(threshold)로 합니다.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM,
+                 bands=DEFAULT_BANDS, shingle_size=DEFAULT_SHINGLE_SIZE):
+        if num_perm % bands:
+            raise ValueError(f"num_perm({num_perm})은 bands({bands})로 나누어떨어져야 합니다.")
+
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm)
+
+        self.buckets = [{} for _ in range(bands)]  # band별 {band 바이트: [대표 키]}
+        self.signatures = {}                        # 대표 키 → 서명
+        self.clusters = {}                          # 대표 키 → [(중복 키, 유사도)]
+
+    def add(self, key, question):
+        """문제를 인덱스에 넣고, 중복이면 (대표 키, 추정 유사도), 아니면 None을 반환합니다."""
+        text = normalize_text(question)
+        if not text:
+            return None
+
+        signature = self.hasher.signature(shingles(text, self.shingle_size))
+        band_keys = [signature[i * self.rows:(i + 1) * self.rows].tobytes()
+                     for i in range(self.bands)]
+
+        # 같은 버킷에 들어간 대표들만 후보로 비교
+        best_key, best_similarity = None, 0.0
+        seen = set()
+        for bucket, band_key in zip(self.buckets, band_keys):
+            for candidate in bucket.get(band_key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                similarity = float(np.mean(self.signatures[candidate] == signature))
+                if similarity > best_similarity:
+                    best_key, best_similarity = candidate, similarity
+
+        if best_key is not None and best_similarity >= self.threshold:
+            self.clusters[best_key].append((key, best_similarity))
+            return best_key, best_similarity
+
+        # 새 대표로 등록
+        self.signatures[key] = signature
+        self.clusters[key] = []
+        for bucket, band_key in zip(self.buckets, band_keys):
+            bucket.setdefault(band_key, []).append(key)
+        return None
+
+    def report(self):
+        """중복이 있는 클러스터 목록 (요약 파일에 저장할 형태)"""
+        clusters = []
+        for representative, duplicates in self.clusters.items():
+            if duplicates:
+                clusters.append({
+                    "대표": representative,
+                    "중복": [{"키": key, "유사도": round(similarity, 3)}
+                             for key, similarity in duplicates]
+                })
+        return clusters
@@ -0,0 +1,261 @@
+"""
+기출문제 텍스트 파서 (단일 패스, 선형 시간)
+- 줄 단위 상태 기계로 "문제 N" / "[문제 N]" / "[해설]" 문법을 처리
+- 사용하는 정규식은 모두 리터럴로 시작하고 되돌아갈 곳이 없는 형태라서
+  입력 길이에 비례하는 시간만 걸림 (길고 깨진 페이지에서도 O(n))
+"""
+
+import re
+
+
+# "기출문제 정답 및 해설" 또는 유사한 섹션 구분 패턴 (앞쪽이 우선)
+SECTION_PATTERNS = [
+    r'기출문제\s*정답\s*및\s*해설',
+    r'정답\s*및\s*해설',
+    r'정답\s*해설',
+    r'모범\s*답안'
+]
+_SECTION_RES = [re.compile(pattern, re.IGNORECASE) for pattern in SECTION_PATTERNS]
+_SECTION_HINTS = ('정답', '모범')  # 모든 섹션 패턴에 들어가는 글자 (빠른 사전 검사용)
+
+# 블록 경계: 문제 섹션은 "문제 N", 답/해설 섹션은 "[문제 N]"
+QUESTION_MARK = re.compile(r'문제\s+(\d+)')
+ANSWER_MARK = re.compile(r'\[문제\s+(\d+)\]')
+
+# 문제 블록 안의 표식
+_SCORE = re.compile(r'\((\d+)점\)')
+_ANSWER_LABEL = re.compile(r'답\s*[:：]')
+_PYTHON_CODE = re.compile(r'(?:def|class)\s+\w+')
+_JAVA_CODE = re.compile(r'(?:public|private|protected)\s+(?:static\s+)?(?:class|void|int|String)')
+_C_MAIN = re.compile(r'int\s+main')
+
+_CODE_LINE_PREFIXES = ('public', 'def', 'class', 'import', 'from')
+
+
+class ExamParser:
+    """줄 단위로 텍스트를 받아 문제/답 블록을 완성되는 대로 돌려주는 상태 기계
+
+    상태는 문제 섹션 → 답/해설 섹션 한 방향으로만 바뀌며, 메모리에는
+    만들고 있는 블록 하나만 남습니다. (줄바꿈을 사이에 두고 끊긴
+    "문제\\n3" 같은 표기는 경계로 보지 않습니다)
+
+    이벤트:
+        ("question", 문제번호, 내용), ("answer", 문제번호, 내용),
+        답/해설 섹션 시작 시 ("section", None, 패턴) 한 번
+
+    이미 분리된 섹션만 파싱할 때는 section으로 시작 상태를 정하고
+    detect_sections=False로 섹션 구분 검사를 끕니다.
+    """
+
+    def __init__(self, section="question", detect_sections=True):
+        self.section = section
+        self.detect_sections = detect_sections
+        self._block = None  # [종류, 문제번호, 줄 목록]
+        self._started_at_line_end = False
+
+    def feed(self, line):
+        """한 줄을 처리하고 그 사이에 완성된 이벤트 목록을 반환합니다."""
+        events = []
+        parts = [line]
+
+        if (self.section == "question" and self.detect_sections and
+                any(hint in line for hint in _SECTION_HINTS)):
+            for pattern, section_re in zip(SECTION_PATTERNS, _SECTION_RES):
+                header = section_re.search(line)
+                if header:
+                    parts = [line[:header.start()], line[header.start():]]
+                    break
+
+        for part_index, text in enumerate(parts):
+            if part_index == 1:
+                # 문제 섹션 종료 → 답/해설 섹션 시작
+                # (섹션은 strip되므로 끝에 번호만 남은 "문제 N"은 문제가 아님)
+                if self._block is not None:
+                    finished = self._finish()
+                    if finished[2]:
+                        events.append(finished)
+                self.section = "answer"
+                events.append(("section", None, pattern))
+
+            self._feed_text(text, events)
+
+        return events
+
+    def close(self):
+        """입력이 끝났을 때 남은 블록을 이벤트 목록으로 반환합니다."""
+        if self._block is None:
+            return []
+
+        # 문서가 "문제 N"으로 끝나면 뒤에 공백이 없으므로 문제가 아님
+        kind, _, lines = self._block
+        if kind == "question" and lines == [""] and self._started_at_line_end:
+            self._block = None
+            return []
+
+        return [self._finish()]
+
+    def _feed_text(self, text, events):
+        if '문제' not in text:
+            if self._block is not None:
+                self._block[2].append(text)
+            return
+
+        marker = QUESTION_MARK if self.section == "question" else ANSWER_MARK
+        pos = 0
+
+        for match in marker.finditer(text):
+            if self._block is not None:
+                self._block[2].append(text[pos:match.start()])
+                events.append(self._finish())
+
+            pos = match.end()
+            # "문제 N" 뒤에 공백(줄바꿈 포함)이 와야 문제 시작
+            self._started_at_line_end = pos == len(text)
+            if (self.section == "answer" or self._started_at_line_end or
+                    text[pos].isspace()):
+                self._block = [self.section, int(match.group(1)), []]
+
+        if self._block is not None:
+            self._block[2].append(text[pos:])
+
+    def _finish(self):
+        kind, number, lines = self._block
+        self._block = None
+        return (kind, number, '\n'.join(lines).strip())
+
+
+def iter_blocks(lines, section="question", detect_sections=True):
+    """줄 목록(또는 줄을 돌려주는 iterator)을 ExamParser 이벤트로 바꿉니다."""
+    parser = ExamParser(section, detect_sections)
+    for line in lines:
+        yield from parser.feed(line)
+    yield from parser.close()
+
+
+def _find_code(content):
+    """코드 블록의 (시작, 끝) 위치를 찾습니다. 없으면 None
+
+    Python → Java → C/C++ 순서로 첫 시작 위치를 찾고, 그 뒤의 첫
+    "답 :" 앞(없으면 끝)까지를 코드로 봅니다. 각 단계는 앞으로만 훑습니다.
+    """
+    start = None
+
+    for code_re in (_PYTHON_CODE, _JAVA_CODE):
+        match = code_re.search(content)
+        if match:
+            start, scan_from = match.start(), match.end()
+            break
+    else:
+        # C/C++: 첫 #include 뒤에 int main이 있어야 함
+        include = content.find('#include')
+        if include >= 0:
+            main = _C_MAIN.search(content, include + len('#include'))
+            if main:
+                start, scan_from = include, main.end()
+
+    if start is None:
+        return None
+
+    label = _ANSWER_LABEL.search(content, scan_from)
+    end = label.start() if label else len(content)
+    return start, end
+
+
+def parse_question_block(question_num, content):
+    """문제 N 블록 하나를 문제 데이터로 변환합니다 (답은 제외)."""
+
+    # 점수 추출
+    score_match = _SCORE.search(content)
+    score = int(score_match.group(1)) if score_match else 0
+
+    # 코드 블록 추출 후 문제 내용에서 제거
+    code = None
+    span = _find_code(content)
+    if span:
+        start, end = span
+        code = content[start:end].strip()
+        content = (content[:start] + content[start + len(code):]).strip()
+
+    # "답 :" 이후 내용 제거 (혹시 있다면)
+    label = _ANSWER_LABEL.search(content)
+    if label:
+        content = content[:label.start()]
+    content = content.strip()
+
+    return {
+        "문제번호": question_num,
+        "문제내용": content,
+        "코드": code,
+        "점수": score,
+        "답": "",
+        "해설": ""
+    }
+
+
+def _strip_answer_label(line):
+    """'답 : xxx' 형태면 xxx를, 아니면 None을 반환합니다."""
+    if not line.startswith('답'):
+        return None
+
+    rest = line[1:].lstrip()
+    if rest[:1] not in (':', '：'):
+        return None
+
+    return rest[1:].strip()
+
+
+def parse_answer_block(content):
+    """[문제 N] 블록 하나에서 답과 해설을 추출합니다."""
+    answer = ""
+    explanation = []
+
+    in_explanation = False
+
+    for line in content.split('\n'):
+        line = line.strip()
+
+        # [해설] 시작
+        if line.startswith('[해설]'):
+            in_explanation = True
+            continue
+
+        # 명시적인 "답:" 패턴
+        labeled = _strip_answer_label(line)
+        if labeled is not None and not answer:
+            answer = labeled
+            continue
+
+        # [문제 N] 바로 다음이 답인 경우
+        if not answer and line and not line.startswith('※') and not line.startswith('['):
+            # 너무 긴 줄은 답이 아닐 가능성이 높음
+            if len(line) < 100 and not line.startswith(_CODE_LINE_PREFIXES):
+                answer = line
+                continue
+
+        # 해설 내용 수집
+        if in_explanation and line:
+            explanation.append(line)
+
+    return {
+        "답": answer,
+        "해설": '\n'.join(explanation) if explanation else ""
+    }
+
+
+def parse_exam_text(text):
+    """텍스트 전체를 한 번 훑어서 (문제 목록, 답 딕셔너리 또는 None)을 반환합니다.
+
+    답/해설 섹션이 없으면 답 딕셔너리 자리에 None을 돌려줍니다.
+    """
+    questions = []
+    answers_dict = None
+
+    for kind, question_num, content in iter_blocks(text.split('\n')):
+        if kind == "question":
+            questions.append(parse_question_block(question_num, content))
+        elif kind == "answer":
+            answers_dict[question_num] = parse_answer_block(content)
+        else:
+            answers_dict = {}
+
+    return questions, answers_dict
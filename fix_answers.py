@@ -1,66 +1,91 @@
 """
-잘못 파싱된 답을 수정하는 스크립트
+잘못 파싱된 답 수정 (답 패치)
+- 수정 내용은 answer_patches.json에 (출처, 문제번호) 단위로 선언
+- merge_json이 코퍼스를 만드는 패스에서 해시 인덱스로 바로 적용하므로
+  all_questions / theory_questions / output 파일을 따로 다시 쓰지 않음
+
+패치 파일 형식 (JSON 배열):
+    [
+      {
+        "출처": "1. 2024년2회_정보처리기사실기 기출문제",
+        "문제번호": 16,
+        "잘못된답": "- 30 -",     (선택: 현재 답이 이 값일 때만 수정)
+        "올바른답": "6.5"
+      }
+    ]
 """
 
 import json
 import os
 
 
-def fix_answers():
-    """잘못 파싱된 답을 수정합니다."""
+ANSWER_PATCHES_FILE = "answer_patches.json"
+
+
+def load_patches(patch_file=ANSWER_PATCHES_FILE):
+    """패치 목록을 읽습니다. 파일이 없으면 빈 목록을 반환합니다."""
+    if not os.path.exists(patch_file):
+        return []
+
+    with open(patch_file, 'r', encoding='utf-8') as f:
+        patches = json.load(f)
+
+    for idx, patch in enumerate(patches):
+        for field in ('출처', '문제번호', '올바른답'):
+            if field not in patch:
+                raise ValueError(f"{patch_file}[{idx}] '{field}' 필드가 없습니다: {patch}")
+
+    return patches
+
+
+def build_patch_index(patches):
+    """(출처, 문제번호) → 패치 딕셔너리 (같은 키가 여러 번 나오면 마지막 패치 사용)"""
+    return {(patch['출처'], int(patch['문제번호'])): patch for patch in patches}
+
+
+def apply_patch(question, patch_index):
+    """문제에 해당하는 패치가 있으면 답을 고치고, 적용한 패치를 반환합니다."""
+    if not patch_index:
+        return None
+
+    patch = patch_index.get((question.get('출처', ''), question.get('문제번호')))
+    if patch is None:
+        return None
+
+    # 잘못된답이 지정된 경우 현재 답이 같을 때만 수정 (이미 고쳐진 답은 그대로)
+    wrong_answer = patch.get('잘못된답')
+    if wrong_answer is not None and (question.get('답') or '').strip() != wrong_answer:
+        return None
+
+    question['답'] = patch['올바른답']
+    return patch
+
+
+def fix_answers(patch_file=ANSWER_PATCHES_FILE):
+    """패치 파일을 검사하고 코퍼스를 다시 만들어 패치를 반영합니다.
+
+    패치 파일은 통합 단계의 입력이므로 패치가 바뀌면 통합/분류만 다시 실행됩니다.
+    """
+    from merge_json import merge_json_files
+    from split_by_type import split_questions_by_type
 
     print("="*60)
     print("잘못 파싱된 답 수정 프로그램")
     print("="*60)
 
-    # 수정할 답 목록
-    fixes = [
-        {
-            '출처': '1. 2024년2회_정보처리기사실기 기출문제',
-            '문제번호': 16,
-            '잘못된답': '- 30 -',
-            '올바른답': '6.5'
-        }
-    ]
+    patches = load_patches(patch_file)
+    if not patches:
+        print(f"ℹ️  적용할 패치가 없습니다: {patch_file}")
+        return
 
-    # 모든 JSON 파일 수정
-    files_to_fix = [
-        'all_questions.json',
-        'theory_questions.json',
-        'output/1. 2024년2회_정보처리기사실기 기출문제.json'
-    ]
+    print(f"\n패치 {len(patches)}개 ({patch_file})")
+    for patch in patches:
+        print(f"  - {patch['출처']} 문제 {patch['문제번호']}번 → \"{patch['올바른답']}\"")
 
-    for file_path in files_to_fix:
-        if not os.path.exists(file_path):
-            print(f"⚠️  파일 없음: {file_path}")
-            continue
-
-        print(f"\n{file_path} 수정 중...")
-
-        # 파일 읽기
-        with open(file_path, 'r', encoding='utf-8') as f:
-            questions = json.load(f)
-
-        # 수정
-        fixed_count = 0
-        for q in questions:
-            for fix in fixes:
-                if (q.get('출처', '') == fix['출처'] and
-                    q.get('문제번호') == fix['문제번호'] and
-                    q.get('답', '').strip() == fix['잘못된답']):
-
-                    old_answer = q['답']
-                    q['답'] = fix['올바른답']
-                    fixed_count += 1
-                    print(f"  ✓ 문제 {fix['문제번호']}번 수정: \"{old_answer}\" → \"{fix['올바른답']}\"")
-
-        if fixed_count > 0:
-            # 파일 저장
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(questions, f, ensure_ascii=False, indent=2)
-            print(f"  ✅ {fixed_count}개 문제 수정 완료")
-        else:
-            print(f"  ℹ️  수정할 내용 없음")
+    print()
+    merge_json_files(patch_file=patch_file)
+    print()
+    split_questions_by_type()
 
     print(f"\n{'='*60}")
     print("수정 완료!")
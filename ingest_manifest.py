@@ -0,0 +1,119 @@
+"""
+증분 처리용 매니페스트 관리
+- PDF/JSON 입력 파일의 내용 해시를 기록해 두고 바뀐 입력만 다시 처리
+- pdf_to_json, merge_json, split_by_type에서 공통으로 사용
+"""
+
+import hashlib
+import json
+import os
+
+
+MANIFEST_FILE = "ingest_manifest.json"
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """파일 내용의 sha256 해시를 계산합니다."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_file=MANIFEST_FILE):
+    """매니페스트를 읽어옵니다. 없거나 깨진 경우 빈 매니페스트를 반환합니다."""
+    manifest = {"pdfs": {}, "stages": {}}
+
+    if os.path.exists(manifest_file):
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest.update(json.load(f))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️  매니페스트를 읽을 수 없어 새로 만듭니다: {e}")
+
+    return manifest
+
+
+def save_manifest(manifest, manifest_file=MANIFEST_FILE):
+    """매니페스트를 저장합니다 (임시 파일에 쓴 뒤 교체)."""
+    tmp_file = manifest_file + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, manifest_file)
+
+
+def fingerprint_files(paths, previous=None):
+    """파일별 해시 정보를 만듭니다.
+
+    크기와 수정 시각이 이전 기록과 같으면 해시를 다시 계산하지 않습니다.
+    """
+    previous = previous or {}
+    fingerprint = {}
+
+    for path in paths:
+        stat = os.stat(path)
+        old = previous.get(path)
+
+        if old and old.get("size") == stat.st_size and old.get("mtime") == stat.st_mtime:
+            sha256 = old["sha256"]
+        else:
+            sha256 = file_sha256(path)
+
+        fingerprint[path] = {
+            "sha256": sha256,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime
+        }
+
+    return fingerprint
+
+
+def _hashes(fingerprint):
+    return {path: info["sha256"] for path, info in fingerprint.items()}
+
+
+def pdf_is_up_to_date(manifest, pdf_file, content_hash, parser_version, output_path):
+    """PDF 내용과 파서 버전이 그대로이고 같은 위치에 결과 파일이 남아 있으면 True"""
+    entry = manifest["pdfs"].get(pdf_file)
+    if not entry:
+        return False
+
+    return (entry.get("sha256") == content_hash and
+            entry.get("parser_version") == parser_version and
+            entry.get("output") == output_path and
+            os.path.exists(output_path))
+
+
+def record_pdf(manifest, pdf_file, content_hash, parser_version, output_path, count):
+    """PDF 변환 결과를 매니페스트에 기록합니다."""
+    manifest["pdfs"][pdf_file] = {
+        "sha256": content_hash,
+        "parser_version": parser_version,
+        "output": output_path,
+        "count": count
+    }
+
+
+def stage_is_up_to_date(manifest, stage, fingerprint, output_files, settings=None):
+    """단계의 입력 해시와 설정이 지난 실행과 같고 출력 파일이 모두 있으면 True"""
+    entry = manifest["stages"].get(stage)
+    if not entry:
+        return False
+
+    if _hashes(entry.get("inputs", {})) != _hashes(fingerprint):
+        return False
+
+    if entry.get("settings") != settings:
+        return False
+
+    return all(os.path.exists(path) for path in output_files)
+
+
+def record_stage(manifest, stage, fingerprint, output_files, settings=None):
+    """단계 실행 결과(입력 해시, 설정, 출력 파일)를 매니페스트에 기록합니다."""
+    manifest["stages"][stage] = {
+        "inputs": fingerprint,
+        "settings": settings,
+        "outputs": list(output_files)
+    }
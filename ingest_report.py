@@ -0,0 +1,158 @@
+"""
+PDF 변환 단계별 측정 및 실행 리포트
+- 단계별 벽시계 시간, CPU 시간, 처리한 문자 수, 찾은 문제 수를 누적
+- process_all_pdfs가 PDF별 측정값과 전체 합계를 output 폴더 옆 JSON으로 저장
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+
+
+REPORT_FILE = "ingest_report.json"
+
+# 단계 이름: 설명 (출력 순서)
+STAGES = {
+    "extract": "PDF 텍스트 추출",
+    "split": "섹션 분리/블록 경계 탐지",
+    "parse_questions": "문제 파싱",
+    "parse_answers": "답/해설 파싱",
+    "merge": "문제와 답 매칭",
+    "save": "JSON 저장",
+}
+
+
+def _empty_stage():
+    return {"wall": 0.0, "cpu": 0.0, "chars": 0, "questions": 0, "calls": 0}
+
+
+class StageTimer:
+    """PDF 1개의 단계별 측정값을 모으는 클래스"""
+
+    def __init__(self):
+        self.stages = {name: _empty_stage() for name in STAGES}
+
+    def add(self, name, wall=0.0, cpu=0.0, chars=0, questions=0, calls=1):
+        stage = self.stages[name]
+        stage["wall"] += wall
+        stage["cpu"] += cpu
+        stage["chars"] += chars
+        stage["questions"] += questions
+        stage["calls"] += calls
+
+    @contextmanager
+    def stage(self, name, chars=0, questions=0):
+        """with 블록의 실행 시간을 단계에 더합니다."""
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield self.stages[name]
+        finally:
+            self.add(name,
+                     wall=time.perf_counter() - wall_start,
+                     cpu=time.process_time() - cpu_start,
+                     chars=chars,
+                     questions=questions)
+
+    def timed_pages(self, name, pages):
+        """페이지 iterator를 감싸서 다음 페이지를 꺼내는 데 걸린 시간을 단계에 더합니다."""
+        iterator = iter(pages)
+        while True:
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            try:
+                text = next(iterator)
+            except StopIteration:
+                self.add(name,
+                         wall=time.perf_counter() - wall_start,
+                         cpu=time.process_time() - cpu_start,
+                         calls=0)
+                return
+            self.add(name,
+                     wall=time.perf_counter() - wall_start,
+                     cpu=time.process_time() - cpu_start,
+                     chars=len(text))
+            yield text
+
+    def to_dict(self):
+        """JSON으로 저장할 수 있는 측정값 (합계 포함)"""
+        stages = {name: dict(values) for name, values in self.stages.items()}
+        return {
+            "stages": stages,
+            "total": _sum_stages([stages])
+        }
+
+
+def _sum_stages(stage_dicts):
+    total = _empty_stage()
+    for stages in stage_dicts:
+        for values in stages.values():
+            total["wall"] += values["wall"]
+            total["cpu"] += values["cpu"]
+    # 문자 수/문제 수는 단계마다 같은 데이터를 다시 세므로 대표 단계 값을 사용
+    total["chars"] = sum(stages["extract"]["chars"] for stages in stage_dicts)
+    total["questions"] = sum(stages["save"]["questions"] for stages in stage_dicts)
+    total["calls"] = sum(stages["extract"]["calls"] for stages in stage_dicts)
+    return total
+
+
+def aggregate_stages(per_pdf):
+    """PDF별 측정값({"stages": ...} 목록)을 단계별로 합칩니다."""
+    stages = {name: _empty_stage() for name in STAGES}
+    for timing in per_pdf:
+        for name, values in timing["stages"].items():
+            for key, value in values.items():
+                stages[name][key] += value
+
+    return {
+        "stages": stages,
+        "total": _sum_stages([timing["stages"] for timing in per_pdf])
+    }
+
+
+def default_report_path(output_folder):
+    """output 폴더와 같은 위치(부모 폴더)에 둘 리포트 경로"""
+    parent = os.path.dirname(os.path.abspath(output_folder))
+    return os.path.join(parent, REPORT_FILE)
+
+
+def build_run_report(results, batch_wall, settings):
+    """process_all_pdfs 결과로 실행 리포트를 만듭니다."""
+    timed = [r["timing"] for r in results.values() if r.get("timing")]
+    aggregate = aggregate_stages(timed)
+    total = aggregate["total"]
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": settings,
+        "batch": {
+            "wall": batch_wall,
+            "pdfs": len(results),
+            "converted": len(timed),
+            "pages": total["calls"],
+            "chars": total["chars"],
+            "questions": total["questions"],
+            "pages_per_sec": total["calls"] / batch_wall if batch_wall else 0.0,
+            "chars_per_sec": total["chars"] / batch_wall if batch_wall else 0.0,
+        },
+        "stages": aggregate["stages"],
+        "pdfs": results
+    }
+
+
+def save_run_report(report, report_file):
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n📊 실행 리포트 저장: {report_file}")
+
+
+def print_stage_table(stages):
+    """단계별 합계를 표로 출력합니다."""
+    total_wall = sum(values["wall"] for values in stages.values()) or 1e-9
+
+    print(f"\n{'단계':<24} {'시간(s)':>8} {'CPU(s)':>8} {'비율':>6} {'문자':>10} {'문제':>6}")
+    for name, description in STAGES.items():
+        values = stages[name]
+        print(f"{description:<20} {values['wall']:>8.3f} {values['cpu']:>8.3f} "
+              f"{values['wall'] / total_wall * 100:>5.1f}% {values['chars']:>10,} {values['questions']:>6}")
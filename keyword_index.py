@@ -0,0 +1,325 @@
+"""
+문제 키워드 검색 인덱스 (BM25, 글자 n-gram 역색인)
+- 문제내용 + 코드 + 해설을 글자 2-gram으로 나눠 역색인을 만듦 (한국어 조사/띄어쓰기에 강함)
+- 게시 목록(posting)마다 BM25 가중치를 미리 계산해 두므로 검색은 배열 합산 + top-k뿐
+- 네트워크/임베딩 없이 동작 (오프라인 검색, 하이브리드 검색의 키워드 쪽)
+- 인덱스는 코퍼스 옆에 {이름}.keyword.npz로 저장하고, 코퍼스 sha256이 다르면 다시 만듦
+- 출처/언어/코드 여부 필터는 값별 비트맵으로 점수 계산 전에 게시 목록을 거름
+
+split_by_type이 코드/이론 코퍼스를 쓴 직후 인덱스를 만듭니다.
+
+사용법:
+    index = get_keyword_index("code_questions.json")
+    for content_id, key, score in index.search("트랜잭션 정규화", top_k=5):
+        ...
+"""
+
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from corpus import CONTENT_ID_VERSION, iter_corpus, question_content_id, question_key
+from ingest_manifest import file_sha256
+
+
+NGRAM_SIZE = 2
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+
+# 검색 시 질의 용어 가지치기: 문서의 STOP_DF_RATIO 넘게 나오는 흔한 2-gram("다음", "것은")은
+# idf가 거의 0이라 순위에 영향이 작으므로 빼고, 남은 용어도 희귀한 순으로 MAX_QUERY_TERMS개만 사용
+STOP_DF_RATIO = 0.05
+MAX_QUERY_TERMS = 24
+
+# 인덱스에 넣는 필드
+INDEXED_FIELDS = ('문제내용', '코드', '해설')
+
+# 필터에 쓰는 필드 (벡터 메타데이터와 같은 이름)
+FILTER_FIELDS = ('source', 'language', 'has_code')
+
+
+def normalize_text(text):
+    """공백을 하나로 합치고 소문자로 (SQL 키워드 대소문자 무시)"""
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+def ngrams(text, size=NGRAM_SIZE):
+    text = normalize_text(text)
+    if len(text) <= size:
+        return [text] if text else []
+    return [text[i:i + size] for i in range(len(text) - size + 1)]
+
+
+def question_document(question):
+    """문제 하나에서 인덱스할 텍스트"""
+    return '\n'.join(question.get(field) or '' for field in INDEXED_FIELDS)
+
+
+def filter_values(question):
+    """필터 필드 값 (벡터 DB 메타데이터와 같은 규칙)"""
+    return {
+        'source': question.get('출처', ''),
+        'language': question.get('language') or '',
+        'has_code': bool(question.get('코드')),
+    }
+
+
+def keyword_index_path(corpus_path):
+    return os.path.splitext(corpus_path)[0] + ".keyword.npz"
+
+
+class KeywordIndex:
+    """CSR 형태의 역색인: 용어 t의 문서/가중치는 doc_ids[indptr[t]:indptr[t+1]]"""
+
+    def __init__(self, terms: Sequence[str], indptr, doc_ids, weights,
+                 content_ids: Sequence[str], keys: Sequence[str], fields: Dict[str, np.ndarray],
+                 version: str = ""):
+        self.terms = list(terms)
+        self.term_ids: Dict[str, int] = {term: i for i, term in enumerate(self.terms)}
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.content_ids = list(content_ids)
+        self.keys = list(keys)
+        self.fields = fields          # 필터 필드 → 문서별 값 배열
+        self.version = version
+        self._bitmaps: Dict[tuple, np.ndarray] = {}   # (필드, 값) → 문서 비트맵, 처음 쓸 때 만듦
+
+    def __len__(self):
+        return len(self.content_ids)
+
+    # ==================== 만들기 ====================
+
+    @classmethod
+    def build(cls, questions, version: str = "", k1: float = BM25_K1, b: float = BM25_B):
+        term_ids: Dict[str, int] = {}
+        posting_terms, posting_docs, posting_tfs = [], [], []
+        doc_lengths, content_ids, keys = [], [], []
+        field_values = {field: [] for field in FILTER_FIELDS}
+
+        for doc_id, question in enumerate(questions):
+            grams = ngrams(question_document(question))
+            counts = Counter(grams)
+            for gram, tf in counts.items():
+                term_id = term_ids.setdefault(gram, len(term_ids))
+                posting_terms.append(term_id)
+                posting_docs.append(doc_id)
+                posting_tfs.append(tf)
+            doc_lengths.append(len(grams))
+            content_ids.append(question_content_id(question))
+            keys.append(question_key(question))
+            for field, value in filter_values(question).items():
+                field_values[field].append(value)
+
+        num_docs = len(doc_lengths)
+        terms = np.array(posting_terms, dtype=np.int64)
+        docs = np.array(posting_docs, dtype=np.int32)
+        tfs = np.array(posting_tfs, dtype=np.float32)
+        lengths = np.array(doc_lengths, dtype=np.float32)
+
+        # 용어 순으로 정렬 (같은 용어 안에서는 문서 순)
+        order = np.lexsort((docs, terms))
+        terms, docs, tfs = terms[order], docs[order], tfs[order]
+
+        doc_freq = np.bincount(terms, minlength=len(term_ids))
+        indptr = np.zeros(len(term_ids) + 1, dtype=np.int64)
+        np.cumsum(doc_freq, out=indptr[1:])
+        df = doc_freq.astype(np.float32)
+
+        # BM25 가중치 미리 계산: idf(t) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+        avgdl = float(lengths.mean()) if num_docs else 0.0
+        idf = np.log(1.0 + (num_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = k1 * (1.0 - b + b * lengths[docs] / avgdl) if avgdl else np.full(len(docs), k1, dtype=np.float32)
+        weights = (idf[terms] * tfs * (k1 + 1.0) / (tfs + norm)).astype(np.float32)
+
+        fields = {field: np.array(values, dtype=bool if field == 'has_code' else str)
+                  for field, values in field_values.items()}
+        sorted_terms = sorted(term_ids, key=term_ids.get)
+        return cls(sorted_terms, indptr, docs, weights, content_ids, keys, fields, version)
+
+    # ==================== 저장/읽기 ====================
+
+    def save(self, path: str):
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path,
+                 terms=np.array(self.terms, dtype=str),
+                 indptr=self.indptr,
+                 doc_ids=self.doc_ids,
+                 weights=self.weights,
+                 content_ids=np.array(self.content_ids, dtype=str),
+                 keys=np.array(self.keys, dtype=str),
+                 version=np.array(self.version),
+                 **{f"field_{field}": values for field, values in self.fields.items()})
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as data:
+            fields = {field: data[f"field_{field}"] for field in FILTER_FIELDS if f"field_{field}" in data}
+            return cls(data['terms'].tolist(), data['indptr'], data['doc_ids'], data['weights'],
+                       data['content_ids'].tolist(), data['keys'].tolist(), fields, str(data['version']))
+
+    # ==================== 검색 ====================
+
+    def filter_mask(self, filters: Dict[str, Sequence]) -> np.ndarray:
+        """필터를 만족하는 문서 비트맵 (필드 안에서는 OR, 필드끼리는 AND)"""
+        mask = np.ones(len(self.content_ids), dtype=bool)
+        for field, values in filters.items():
+            field_mask = np.zeros(len(self.content_ids), dtype=bool)
+            for value in values:
+                bitmap = self._bitmaps.get((field, value))
+                if bitmap is None:
+                    bitmap = self.fields[field] == value
+                    self._bitmaps[(field, value)] = bitmap
+                field_mask |= bitmap
+            mask &= field_mask
+        return mask
+
+    def search(self, query: str, top_k: int = 10,
+               filters: Optional[Dict[str, Sequence]] = None) -> List[Tuple[str, str, float]]:
+        """BM25 상위 top_k개 [(내용 ID, 문제 키, 점수)], 점수 높은 순
+
+        흔한 용어는 빼고 희귀한 용어만으로 점수를 매깁니다. (STOP_DF_RATIO, MAX_QUERY_TERMS)
+        filters: {필드: 허용 값 목록}. 조건에 맞지 않는 문서는 점수 계산 전에 뺍니다.
+        """
+        num_docs = len(self.content_ids)
+        spans = []
+        for gram, count in Counter(ngrams(query)).items():
+            term_id = self.term_ids.get(gram)
+            if term_id is not None:
+                start, end = int(self.indptr[term_id]), int(self.indptr[term_id + 1])
+                spans.append((end - start, start, end, count))
+        if not spans or top_k <= 0:
+            return []
+
+        # 희귀한 용어부터, 흔한 용어는 빼되 전부 흔하면 가장 희귀한 것 하나는 남김
+        spans.sort()
+        max_df = max(1, int(num_docs * STOP_DF_RATIO))
+        selected = [span for span in spans if span[0] <= max_df][:MAX_QUERY_TERMS] or spans[:1]
+        mask = self.filter_mask(filters) if filters else None
+
+        candidates, scores = self._score(selected, mask)
+        if len(candidates) < top_k and len(selected) < min(len(spans), MAX_QUERY_TERMS):
+            # 희귀한 용어만으로는 결과가 모자라면 흔한 용어까지 넣어 다시 계산
+            candidates, scores = self._score(spans[:MAX_QUERY_TERMS], mask)
+        if not len(candidates):
+            return []
+
+        k = min(top_k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(self.content_ids[candidates[i]], self.keys[candidates[i]], float(scores[i])) for i in top]
+
+    def _score(self, spans, mask):
+        """질의 용어의 게시 목록만 모아 문서별로 BM25 합산 → (후보 문서 배열, 점수 배열)"""
+        docs = np.concatenate([self.doc_ids[start:end] for _, start, end, _ in spans])
+        weights = np.concatenate([self.weights[start:end] * count if count > 1 else self.weights[start:end]
+                                  for _, start, end, count in spans])
+        if mask is not None:
+            keep = mask[docs]
+            docs, weights = docs[keep], weights[keep]
+
+        num_docs = len(self.content_ids)
+        if len(docs) * 8 < num_docs:
+            candidates, inverse = np.unique(docs, return_inverse=True)
+            return candidates, np.bincount(inverse, weights=weights)
+
+        totals = np.bincount(docs, weights=weights, minlength=num_docs)
+        candidates = np.flatnonzero(totals)
+        return candidates, totals[candidates]
+
+
+def index_version(corpus_path: str) -> str:
+    """인덱스가 맞는 코퍼스인지 확인하는 값 (코퍼스 sha256 + 내용 ID 규칙)"""
+    return f"{file_sha256(corpus_path)}:id{CONTENT_ID_VERSION}"
+
+
+def build_keyword_index(corpus_path: str, index_path: Optional[str] = None) -> KeywordIndex:
+    """코퍼스 파일로 인덱스를 만들어 저장합니다. (수집 단계에서 호출)"""
+    index_path = index_path or keyword_index_path(corpus_path)
+    start = time.perf_counter()
+
+    index = KeywordIndex.build(iter_corpus(corpus_path), version=index_version(corpus_path))
+    index.save(index_path)
+
+    print(f"🔎 키워드 인덱스 저장: {index_path} "
+          f"(문제 {len(index)}개, 용어 {len(index.terms)}개, {time.perf_counter() - start:.2f}초)")
+    return index
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """여러 순위 목록을 RRF로 합침: score(d) = Σ 1 / (k + rank). 점수 높은 순 [(ID, 점수)]"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, 1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda pair: pair[1], reverse=True)
+
+
+# ==================== 프로세스 공유 ====================
+
+# 코퍼스 경로 → [인덱스, 확인한 (크기, 수정 시각), 확인 시각]
+_indexes: Dict[str, list] = {}
+_indexes_lock = threading.Lock()
+
+CHECK_INTERVAL = 1.0
+
+
+def get_keyword_index(corpus_path: str) -> KeywordIndex:
+    """코퍼스와 맞는 인덱스를 돌려줍니다. 저장된 인덱스가 없거나 낡았으면 다시 만듭니다."""
+    path = os.path.abspath(corpus_path)
+    entry = _indexes.get(path)
+    now = time.monotonic()
+    if entry is not None and now - entry[2] < CHECK_INTERVAL:
+        return entry[0]
+
+    with _indexes_lock:
+        entry = _indexes.get(path)
+        stat = os.stat(path)
+        current = (stat.st_size, stat.st_mtime_ns)
+        if entry is not None and entry[1] == current:
+            entry[2] = now
+            return entry[0]
+
+        version = index_version(path)
+        if entry is not None and entry[0].version == version:
+            index = entry[0]
+        else:
+            index = None
+            index_path = keyword_index_path(path)
+            if os.path.exists(index_path):
+                index = KeywordIndex.load(index_path)
+                # 코퍼스나 내용 ID 규칙이 바뀌었거나 필터 필드가 없는 예전 인덱스면 다시 만듦
+                if index.version != version or set(index.fields) != set(FILTER_FIELDS):
+                    index = None
+            if index is None:
+                index = build_keyword_index(path, index_path)
+
+        _indexes[path] = [index, current, now]
+        return index
+
+
+if __name__ == "__main__":
+    # 코퍼스로 인덱스 만들기 / 검색해 보기: python keyword_index.py code_questions.json "정규화"
+    import sys
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(script_dir)
+
+    corpus_file = sys.argv[1] if len(sys.argv) > 1 else "theory_questions.json"
+    index = build_keyword_index(corpus_file)
+
+    if len(sys.argv) > 2:
+        query = sys.argv[2]
+        start = time.perf_counter()
+        results = index.search(query, top_k=5)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"\n'{query}' 검색 ({elapsed:.3f}ms)")
+        for content_id, key, score in results:
+            print(f"  {score:7.3f}  {key}")
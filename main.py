@@ -5,6 +5,7 @@
 
 from graph import create_quiz_graph
 from state import QuizState
+from nodes.quiz_store import DEFAULT_USER_ID
 
 
 def run_quiz(question_type: str = "code"):
@@ -20,6 +21,7 @@ def run_quiz(question_type: str = "code"):
 
     # 초기 상태
     initial_state: QuizState = {
+        "user_id": DEFAULT_USER_ID,
         "question_type": question_type,
         "similar_questions": [],
         "generated_question": None,
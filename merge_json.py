@@ -1,14 +1,52 @@
 """
-여러 JSON 파일을 하나로 합치는 스크립트
+여러 JSON 파일을 하나의 코퍼스 파일(all_questions.ndjson)로 합치는 스크립트
 """
 
 import json
 import os
 from pathlib import Path
-
-
-def merge_json_files(input_folder="output", output_file="all_questions.json"):
-    """output 폴더의 모든 JSON 파일을 하나로 합칩니다."""
+from corpus import CorpusWriter, iter_corpus, question_key
+from dedup import DEDUP_MODES, DEFAULT_THRESHOLD, NearDuplicateIndex
+from fix_answers import ANSWER_PATCHES_FILE, load_patches, build_patch_index, apply_patch
+from split_by_type import CLASSIFIER_VERSION, classify_question
+from ingest_manifest import (
+    MANIFEST_FILE,
+    load_manifest,
+    save_manifest,
+    fingerprint_files,
+    stage_is_up_to_date,
+    record_stage
+)
+
+
+def merge_json_files(input_folder="output", output_file="all_questions.ndjson",
+                     force=False, manifest_file=MANIFEST_FILE,
+                     patch_file=ANSWER_PATCHES_FILE, dedup="collapse",
+                     dedup_threshold=DEFAULT_THRESHOLD):
+    """output 폴더의 모든 JSON 파일을 하나의 코퍼스 파일로 합칩니다.
+
+    문제를 하나씩 출처와 분류 필드(type, language, has_answer)를 붙여 바로 쓰고
+    요약 정보도 같은 패스에서 세므로, 메모리에는 시험 파일 하나 분량만 남습니다.
+    출력 형식은 확장자로 정합니다 (.ndjson/.jsonl: 한 줄에 문제 하나, .json: 배열).
+    요약 정보를 반환합니다.
+
+    answer_patches.json의 답 패치도 같은 패스에서 (출처, 문제번호) 인덱스로
+    적용합니다. 패치 파일도 입력으로 취급하므로 패치만 바뀌어도 다시 통합합니다.
+
+    여러 PDF에 실린 같은 문제는 MinHash/LSH(dedup.py)로 찾아 처리합니다.
+      - dedup="collapse": 먼저 나온 문제만 남기고 중복은 코퍼스에서 제외
+      - dedup="link": 모두 남기고 중복 문제에 duplicate_of(대표 키) 필드를 추가
+      - dedup=None: 중복 탐지 안 함
+    중복 클러스터 목록은 요약 파일의 '중복_클러스터'에 저장합니다.
+    파일별/출처별 문제 수는 코퍼스에 실제로 쓴 문제만 세고, 제외한 중복은
+    '출처별_중복수'에 따로 셉니다. (출처별 문제 수의 합 = 총_문제수)
+
+    입력 JSON 파일들이 지난 통합 이후 바뀌지 않았으면 건너뛰고 None을 반환합니다.
+    (force=True이면 항상 다시 통합)
+    """
+
+    if dedup is not None and dedup not in DEDUP_MODES:
+        raise ValueError(f"알 수 없는 중복 처리 방식: {dedup} (사용 가능: {', '.join(DEDUP_MODES)})")
 
     # JSON 파일 목록
     json_files = sorted([f for f in os.listdir(input_folder) if f.endswith('.json')])
@@ -19,70 +57,129 @@ def merge_json_files(input_folder="output", output_file="all_questions.json"):
 
     print(f"발견된 JSON 파일: {len(json_files)}개\n")
 
-    all_questions = []
-    file_info = []
-
-    for idx, json_file in enumerate(json_files, 1):
-        json_path = os.path.join(input_folder, json_file)
-
-        print(f"[{idx}/{len(json_files)}] {json_file} 읽는 중...")
-
-        with open(json_path, 'r', encoding='utf-8') as f:
-            questions = json.load(f)
+    # 입력 변경 여부 확인
+    summary_file = os.path.splitext(output_file)[0] + '_summary.json'
+    manifest = load_manifest(manifest_file)
+    previous = manifest["stages"].get("merge", {}).get("inputs")
+    input_paths = [os.path.join(input_folder, f) for f in json_files]
+    if os.path.exists(patch_file):
+        input_paths.append(patch_file)
+    fingerprint = fingerprint_files(input_paths, previous)
+    settings = {"dedup": dedup, "dedup_threshold": dedup_threshold,
+                "classifier_version": CLASSIFIER_VERSION}
+
+    if not force and stage_is_up_to_date(manifest, "merge", fingerprint,
+                                         [output_file, summary_file], settings):
+        print(f"✓ 입력 파일 변경 없음. 통합을 건너뜁니다: {output_file}")
+        return None
+
+    # 답 패치 인덱스 (출처, 문제번호) → 패치
+    patch_index = build_patch_index(load_patches(patch_file))
+    applied_patches = set()
+
+    # 중복 탐지 인덱스
+    dedup_index = NearDuplicateIndex(threshold=dedup_threshold) if dedup else None
+    duplicate_count = 0
 
-        # 각 문제에 출처 정보 추가
-        exam_name = json_file.replace('.json', '')
-
-        for question in questions:
-            question['출처'] = exam_name
-
-        all_questions.extend(questions)
-
-        file_info.append({
-            '파일명': json_file,
-            '문제수': len(questions)
-        })
+    summary = {
+        '총_문제수': 0,
+        '파일_정보': [],
+        '출처별_문제수': {},
+        '답_수정': []
+    }
 
-        print(f"  → {len(questions)}개 문제 추가")
+    with CorpusWriter(output_file) as writer:
+        for idx, json_file in enumerate(json_files, 1):
+            json_path = os.path.join(input_folder, json_file)
+
+            print(f"[{idx}/{len(json_files)}] {json_file} 읽는 중...")
+
+            # 각 문제에 출처 정보와 분류 필드를 붙여서 바로 기록
+            exam_name = json_file.replace('.json', '')
+            count = 0
+            duplicates = 0
+
+            for question in iter_corpus(json_path):
+                question['출처'] = exam_name
+
+                old_answer = question.get('답')
+                patch = apply_patch(question, patch_index)
+                if patch is not None:
+                    applied_patches.add((exam_name, question['문제번호']))
+                    summary['답_수정'].append({
+                        '출처': exam_name,
+                        '문제번호': question['문제번호'],
+                        '이전답': old_answer,
+                        '수정답': question['답']
+                    })
+                    print(f"  ✓ 문제 {question['문제번호']}번 답 수정: \"{old_answer}\" → \"{question['답']}\"")
+
+                if dedup_index is not None:
+                    duplicate = dedup_index.add(question_key(question), question)
+                    if duplicate is not None:
+                        duplicate_count += 1
+                        duplicates += 1
+                        if dedup == "collapse":
+                            continue
+                        question['duplicate_of'] = duplicate[0]
+
+                writer.write(classify_question(question))
+                count += 1
+
+            summary['파일_정보'].append({
+                '파일명': json_file,
+                '문제수': count
+            })
+            summary['출처별_문제수'][exam_name] = (
+                summary['출처별_문제수'].get(exam_name, 0) + count
+            )
+            if duplicates:
+                source_duplicates = summary.setdefault('출처별_중복수', {})
+                source_duplicates[exam_name] = source_duplicates.get(exam_name, 0) + duplicates
+
+            if duplicates and dedup == "collapse":
+                print(f"  → {count}개 문제 추가 (중복 {duplicates}개 제외)")
+            else:
+                print(f"  → {count}개 문제 추가")
+
+    summary['총_문제수'] = writer.count
+    if dedup_index is not None:
+        summary['중복_처리'] = dedup
+        summary['중복_문제수'] = duplicate_count
+        summary['중복_클러스터'] = dedup_index.report()
 
-    # 통합 데이터 저장
     print(f"\n{'='*60}")
-    print(f"통합 JSON 파일 저장 중...")
+    print(f"통합 코퍼스 저장 완료")
     print(f"{'='*60}")
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(all_questions, f, ensure_ascii=False, indent=2)
-
     print(f"\n✅ 저장 완료: {output_file}")
-    print(f"✅ 총 {len(all_questions)}개 문제")
+    print(f"✅ 총 {writer.count}개 문제")
+    if patch_index:
+        print(f"✅ 답 패치 적용: {len(applied_patches)}/{len(patch_index)}개")
+        for key in sorted(set(patch_index) - applied_patches):
+            print(f"  ⚠️  적용되지 않은 패치: {key[0]} 문제 {key[1]}번")
+    if dedup_index is not None:
+        action = "제외" if dedup == "collapse" else "연결"
+        print(f"✅ 중복 문제 {duplicate_count}개 {action} "
+              f"(클러스터 {len(summary['중복_클러스터'])}개)")
 
     # 요약 정보도 별도 저장
-    summary = {
-        '총_문제수': len(all_questions),
-        '파일_정보': file_info,
-        '출처별_문제수': {}
-    }
-
-    # 출처별 문제 수 계산
-    for q in all_questions:
-        source = q['출처']
-        summary['출처별_문제수'][source] = summary['출처별_문제수'].get(source, 0) + 1
-
-    summary_file = output_file.replace('.json', '_summary.json')
     with open(summary_file, 'w', encoding='utf-8') as f:
         json.dump(summary, f, ensure_ascii=False, indent=2)
 
     print(f"✅ 요약 정보 저장: {summary_file}")
 
+    record_stage(manifest, "merge", fingerprint, [output_file, summary_file], settings)
+    save_manifest(manifest, manifest_file)
+
     # 결과 출력
     print(f"\n{'='*60}")
     print(f"통합 결과")
     print(f"{'='*60}")
-    for info in file_info:
+    for info in summary['파일_정보']:
         print(f"  - {info['파일명']}: {info['문제수']}개")
-    print(f"\n  총 {len(all_questions)}개 문제가 하나의 파일로 통합되었습니다.")
+    print(f"\n  총 {writer.count}개 문제가 하나의 파일로 통합되었습니다.")
 
-    return all_questions
+    return summary
 
 
 if __name__ == "__main__":
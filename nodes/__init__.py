@@ -1,14 +1,27 @@
 """
 LangGraph 노드 모듈 (간소화 - 벡터 DB 없음)
+
+노드 함수는 처음 쓸 때 가져옵니다. (nodes.bulk_loader처럼 LangChain이 필요 없는
+하위 모듈은 LangChain이 설치되지 않은 환경에서도 바로 import 가능)
 """
 
-from .question_search import search_similar_questions
-from .question_generate import generate_question
-from .answer_check_simple import check_answer, save_wrong_question
+import importlib
+
+# 노드 함수 이름 → 정의된 하위 모듈
+_NODE_MODULES = {
+    'search_similar_questions': '.question_search',
+    'generate_question': '.question_generate',
+    'check_answer': '.answer_check_simple',
+    'save_wrong_question': '.answer_check_simple',
+}
+
+__all__ = list(_NODE_MODULES)
+
 
-__all__ = [
-    'search_similar_questions',
-    'generate_question',
-    'check_answer',
-    'save_wrong_question',
-]
+def __getattr__(name):
+    module_name = _NODE_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
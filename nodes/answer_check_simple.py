@@ -1,12 +1,29 @@
 """
 답변 확인 및 틀린 문제 저장 노드 (간소화 버전)
-- JSON 파일로 틀린 문제 저장
+- 푼 문제/틀린 문제를 SQLite(quiz_store)에 저장
+- 저장은 쓰기 지연 큐(write_behind)로 넘기므로 채점 결과는 바로 돌려줌
 """
 
-import json
-import os
 import time
-from typing import Dict
+from typing import Dict, List
+
+from corpus import question_key
+
+from .quiz_store import DEFAULT_USER_ID, get_quiz_store, make_wrong_item
+from .write_behind import get_write_behind
+
+
+def _write_solved(rows: List[tuple]):
+    get_quiz_store().add_solved_batch(rows)
+
+
+def _write_wrong(items: List[Dict]):
+    get_quiz_store().add_wrong_batch(items)
+
+
+_write_queue = get_write_behind()
+_write_queue.register("solved", _write_solved)
+_write_queue.register("wrong", _write_wrong)
 
 
 def check_answer(state: Dict) -> Dict:
@@ -51,28 +68,13 @@ def check_answer(state: Dict) -> Dict:
     # Few-shot으로 사용된 원본 문제를 "푼 문제"로 저장
     similar_questions = state.get("similar_questions", [])
     if similar_questions:
-        solved_file = "solved_questions.json"
-
-        # 기존 데이터 로드
-        if os.path.exists(solved_file):
-            with open(solved_file, 'r', encoding='utf-8') as f:
-                solved_data = json.load(f)
-        else:
-            solved_data = {"code": [], "theory": []}
-
-        # Few-shot 문제 ID 저장
+        user_id = state.get("user_id") or DEFAULT_USER_ID
+        now = time.time()
         for q in similar_questions:
-            q_id = q.get('문제번호')
-            if q_id and q_id not in solved_data.get(question_type, []):
-                if question_type not in solved_data:
-                    solved_data[question_type] = []
-                solved_data[question_type].append(q_id)
-
-        # 저장
-        with open(solved_file, 'w', encoding='utf-8') as f:
-            json.dump(solved_data, f, ensure_ascii=False, indent=2)
+            if q.get('문제번호'):
+                _write_queue.submit("solved", (user_id, question_type, question_key(q), now))
 
-        print(f"📝 푼 문제 저장 완료 (문제 {similar_questions[0].get('문제번호', '')}번)")
+        print(f"📝 푼 문제 저장 예약 (문제 {similar_questions[0].get('문제번호', '')}번)")
 
     return {
         "is_correct": is_correct,
@@ -81,7 +83,7 @@ def check_answer(state: Dict) -> Dict:
 
 
 def save_wrong_question(state: Dict) -> Dict:
-    """틀린 문제를 JSON 파일에 저장"""
+    """틀린 문제를 DB에 저장 (쓰기 지연 큐 사용)"""
 
     generated_question = state.get("generated_question")
     user_answer = state.get("user_answer", "")
@@ -93,29 +95,19 @@ def save_wrong_question(state: Dict) -> Dict:
     print(f"틀린 문제 저장 중...")
     print(f"{'='*60}")
 
-    # JSON 파일에 저장
-    wrong_file = "wrong_questions.json"
-
-    # 기존 데이터 로드
-    if os.path.exists(wrong_file):
-        with open(wrong_file, 'r', encoding='utf-8') as f:
-            wrong_questions = json.load(f)
-    else:
-        wrong_questions = []
-
-    # 새 틀린 문제 추가
-    wrong_questions.append({
-        "question": generated_question,
-        "user_answer": user_answer,
-        "correct_answer": generated_question.get('답', ''),
-        "timestamp": time.time()
-    })
+    # DB 저장은 백그라운드에서 (다른 답변 기록과 묶어서 한 트랜잭션)
+    item = make_wrong_item(
+        generated_question,
+        user_answer=user_answer,
+        correct_answer=generated_question.get('답', ''),
+        user_id=state.get("user_id") or DEFAULT_USER_ID
+    )
+    _write_queue.submit("wrong", item)
 
-    # 저장
-    with open(wrong_file, 'w', encoding='utf-8') as f:
-        json.dump(wrong_questions, f, ensure_ascii=False, indent=2)
+    # wrong_questions 리스트에 추가
+    wrong_questions = state.get("wrong_questions", []) + [item]
 
-    print(f"❌ 틀린 문제가 저장되었습니다. (총 {len(wrong_questions)}개)")
+    print(f"❌ 틀린 문제가 저장되었습니다. (저장 대기 {_write_queue.queue_depth}개)")
 
     return {
         "wrong_questions": wrong_questions,
@@ -0,0 +1,238 @@
+"""
+대량 임베딩/업로드 로더
+- 레코드를 토큰 수(임베딩 요청 한도)와 바이트 수(업로드 요청 한도)로 나눠 청크를 만듦
+- 청크는 동시에 최대 concurrency개까지 처리 (임베딩 → 업로드)
+- 실패한 호출은 지수 백오프(+지터)로 재시도
+- 끝난 레코드 ID를 체크포인트 파일에 한 줄씩 덧붙이므로 중간에 끊겨도 이어서 실행
+  (청크 하나가 끝날 때 그 청크의 ID만 씀)
+- 체크포인트 첫 줄에 계획 ID(plan_id)를 적어 두고, 다른 계획의 체크포인트는 버림
+- 처리량(vectors/sec)과 재시도 수를 stats로 반환
+
+임베딩 함수와 업로드 함수를 밖에서 넣으므로(의존성 주입) 가짜 구현으로도 돌려볼 수 있습니다.
+(bench_bulk_load.py 참고)
+
+사용법:
+    loader = BulkLoader(embeddings.embed_documents, upsert, dimension=1536,
+                        checkpoint_file="vector_store/code.checkpoint", plan_id=plan_hash)
+    stats = loader.load([(vector_id, text, metadata), ...])
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+DEFAULT_MAX_TOKENS = 50_000       # 임베딩 요청 하나에 넣을 최대 토큰 수
+DEFAULT_MAX_BYTES = 2_000_000     # 업로드 요청 하나의 최대 크기 (Pinecone 한도 2MB)
+DEFAULT_MAX_ITEMS = 100           # 업로드 요청 하나의 최대 벡터 수
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 5
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30.0
+
+# 체크포인트 첫 줄 (뒤에 계획 ID)
+_PLAN_HEADER = "# plan "
+
+# 벡터 값 하나가 JSON으로 차지하는 바이트 수 (float 전체 자릿수 + 구분자, 넉넉하게)
+_BYTES_PER_VALUE = 20
+
+Record = Tuple[str, str, Dict]   # (벡터 ID, 임베딩할 텍스트, 메타데이터)
+
+
+def _default_token_counter():
+    """tiktoken이 있으면 실제 토큰 수, 없으면 글자 수(한국어는 글자당 1토큰 안팎)로 셈"""
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text))
+    except Exception:
+        return len
+
+
+class BulkLoader:
+    """청크 단위 동시 임베딩/업로드 (재시도 + 체크포인트)"""
+
+    def __init__(self,
+                 embed_documents: Callable[[List[str]], List[List[float]]],
+                 upsert: Callable[[List[str], List[str], List[List[float]], List[Dict]], None],
+                 dimension: int,
+                 max_tokens: int = DEFAULT_MAX_TOKENS,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_items: int = DEFAULT_MAX_ITEMS,
+                 concurrency: int = DEFAULT_CONCURRENCY,
+                 retries: int = DEFAULT_RETRIES,
+                 base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY,
+                 checkpoint_file: Optional[str] = None,
+                 plan_id: str = "",
+                 count_tokens: Optional[Callable[[str], int]] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.embed_documents = embed_documents
+        self.upsert = upsert
+        self.dimension = dimension
+        self.max_tokens = max_tokens
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.concurrency = concurrency
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.checkpoint_file = checkpoint_file
+        self.plan_id = plan_id
+        self.count_tokens = count_tokens or _default_token_counter()
+        self.sleep = sleep
+
+        self._lock = threading.Lock()
+        self._done_ids = set()
+        self.stats = {}
+
+    # ==================== 청크 나누기 ====================
+
+    def _record_bytes(self, record: Record) -> int:
+        vector_id, _, metadata = record
+        return (len(vector_id.encode('utf-8')) +
+                len(json.dumps(metadata, ensure_ascii=False).encode('utf-8')) +
+                self.dimension * _BYTES_PER_VALUE)
+
+    def make_chunks(self, records: Iterable[Record]) -> List[List[Record]]:
+        """토큰 수/바이트 수/개수 한도를 넘지 않게 레코드를 청크로 나눕니다."""
+        chunks = []
+        chunk, chunk_tokens, chunk_bytes = [], 0, 0
+
+        for record in records:
+            tokens = self.count_tokens(record[1])
+            size = self._record_bytes(record)
+
+            if chunk and (chunk_tokens + tokens > self.max_tokens or
+                          chunk_bytes + size > self.max_bytes or
+                          len(chunk) >= self.max_items):
+                chunks.append(chunk)
+                chunk, chunk_tokens, chunk_bytes = [], 0, 0
+
+            chunk.append(record)
+            chunk_tokens += tokens
+            chunk_bytes += size
+
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    # ==================== 체크포인트 ====================
+
+    def _load_checkpoint(self):
+        """끝난 ID 집합 (한 줄에 ID 하나, 쓰다가 끊긴 마지막 줄은 어떤 ID와도 맞지 않아 무시됨)
+
+        첫 줄의 계획 ID가 이번 계획(plan_id)과 다르면 다른 동기화가 남긴 체크포인트이므로
+        지우고 처음부터 실행합니다.
+        """
+        if not (self.checkpoint_file and os.path.exists(self.checkpoint_file)):
+            return set()
+        with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+            header = f.readline()
+            if header == f"{_PLAN_HEADER}{self.plan_id}\n":
+                return {line.rstrip("\n") for line in f if line.endswith("\n")}
+        print(f"⚠️ 다른 계획의 체크포인트를 버립니다: {self.checkpoint_file}")
+        self.clear_checkpoint()
+        return set()
+
+    def _append_checkpoint(self, ids: Sequence[str]):
+        """방금 끝난 청크의 ID만 체크포인트 끝에 덧붙임"""
+        if not self.checkpoint_file:
+            return
+        directory = os.path.dirname(self.checkpoint_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        new_file = not os.path.exists(self.checkpoint_file)
+        with open(self.checkpoint_file, 'a', encoding='utf-8') as f:
+            if new_file:
+                f.write(f"{_PLAN_HEADER}{self.plan_id}\n")
+            f.write("".join(f"{vector_id}\n" for vector_id in ids))
+
+    def clear_checkpoint(self):
+        if self.checkpoint_file and os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+
+    # ==================== 실행 ====================
+
+    def _with_retry(self, name: str, func, *args):
+        for attempt in range(self.retries + 1):
+            try:
+                return func(*args)
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.5)
+                with self._lock:
+                    self.stats["retries"] += 1
+                print(f"⚠️ {name} 실패, {delay:.1f}초 후 재시도 ({attempt + 1}/{self.retries}): {e}")
+                self.sleep(delay)
+
+    def _run_chunk(self, chunk: Sequence[Record]):
+        ids = [record[0] for record in chunk]
+        texts = [record[1] for record in chunk]
+        metadatas = [record[2] for record in chunk]
+
+        embeddings = self._with_retry("임베딩", self.embed_documents, texts)
+        self._with_retry("업로드", self.upsert, ids, texts, embeddings, metadatas)
+
+        with self._lock:
+            self._done_ids.update(ids)
+            self.stats["vectors"] += len(ids)
+            self.stats["chunks"] += 1
+            self._append_checkpoint(ids)
+
+    def load(self, records: Iterable[Record]) -> Dict:
+        """레코드를 모두 임베딩/업로드하고 통계를 반환합니다.
+
+        체크포인트에 있는 레코드는 건너뜁니다. 모든 청크가 성공하면 체크포인트를
+        지우고, 실패한 청크가 있으면 체크포인트를 남긴 채 RuntimeError를 냅니다.
+        """
+        self._done_ids = self._load_checkpoint()
+        records = list(records)
+        pending = [record for record in records if record[0] not in self._done_ids]
+        chunks = self.make_chunks(pending)
+
+        self.stats = {
+            "vectors": 0,
+            "skipped": len(records) - len(pending),
+            "chunks": 0,
+            "failed_chunks": 0,
+            "retries": 0,
+            "seconds": 0.0,
+            "vectors_per_sec": 0.0,
+        }
+
+        start = time.perf_counter()
+        errors = []
+
+        # 동시에 처리 중인 청크를 concurrency개로 제한
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            in_flight = set()
+            for chunk in chunks:
+                if len(in_flight) >= self.concurrency:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    errors.extend(future.exception() for future in done if future.exception())
+                in_flight.add(executor.submit(self._run_chunk, chunk))
+
+            for future in in_flight:
+                if future.exception():
+                    errors.append(future.exception())
+
+        elapsed = time.perf_counter() - start
+        self.stats["seconds"] = elapsed
+        self.stats["failed_chunks"] = len(errors)
+        self.stats["vectors_per_sec"] = self.stats["vectors"] / elapsed if elapsed else 0.0
+
+        print(f"📤 벡터 {self.stats['vectors']}개 업로드 ({self.stats['chunks']}개 청크, "
+              f"{self.stats['vectors_per_sec']:.1f} vectors/sec, 재시도 {self.stats['retries']}회, "
+              f"이전 실행에서 완료 {self.stats['skipped']}개)")
+
+        if errors:
+            raise RuntimeError(f"청크 {len(errors)}개 업로드 실패 (체크포인트에서 이어서 실행 가능): {errors[0]}")
+
+        self.clear_checkpoint()
+        return self.stats
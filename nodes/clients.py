@@ -0,0 +1,162 @@
+"""
+외부 서비스 클라이언트 모음 (프로세스 전체에서 공유)
+- OpenAI(채팅/임베딩)는 keep-alive 연결 풀을 가진 httpx.Client 하나를 같이 씀
+- Pinecone 클라이언트와 인덱스 핸들, ChromaDB PersistentClient도 한 번만 만들어 재사용
+- 풀 크기/타임아웃은 환경 변수로 조정
+- 프로세스 종료 시(atexit) 쓰기 지연 큐를 먼저 비운 뒤 클라이언트를 닫음
+
+환경 변수:
+    OPENAI_MAX_CONNECTIONS   OpenAI 동시 연결 수 (기본 20)
+    OPENAI_MAX_KEEPALIVE     유지할 유휴 연결 수 (기본 10)
+    HTTP_KEEPALIVE_EXPIRY    유휴 연결 유지 시간(초) (기본 30)
+    HTTP_TIMEOUT             요청 타임아웃(초) (기본 60)
+    PINECONE_POOL_THREADS    Pinecone 요청 스레드/연결 수 (기본 4)
+
+사용법:
+    clients = get_clients()
+    embeddings = clients.embeddings("text-embedding-3-small")
+    llm = clients.chat_model("gpt-5-chat-latest", temperature=0.8)
+"""
+
+import atexit
+import os
+import threading
+from typing import Dict, Optional
+
+
+class ClientRegistry:
+    """백엔드별 클라이언트를 처음 쓸 때 한 번만 만들어 두는 저장소 (스레드 안전)"""
+
+    def __init__(self):
+        self.max_connections = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+        self.max_keepalive = int(os.getenv("OPENAI_MAX_KEEPALIVE", "10"))
+        self.keepalive_expiry = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+        self.timeout = float(os.getenv("HTTP_TIMEOUT", "60"))
+        self.pinecone_pool_threads = int(os.getenv("PINECONE_POOL_THREADS", "4"))
+
+        self._lock = threading.RLock()
+        self._http_client = None
+        self._embeddings: Dict[str, object] = {}
+        self._chat_models: Dict[tuple, object] = {}
+        self._pinecone = None
+        self._pinecone_indexes: Dict[str, object] = {}
+        self._chroma: Dict[str, object] = {}
+
+    # ==================== OpenAI ====================
+
+    def http_client(self):
+        """OpenAI 호출에 같이 쓰는 연결 풀 (keep-alive)"""
+        with self._lock:
+            if self._http_client is None:
+                import httpx
+                self._http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_keepalive,
+                        keepalive_expiry=self.keepalive_expiry
+                    ),
+                    timeout=self.timeout
+                )
+            return self._http_client
+
+    def embeddings(self, model: str):
+        """모델별 OpenAIEmbeddings (연결 풀 공유)"""
+        with self._lock:
+            if model not in self._embeddings:
+                from langchain_openai import OpenAIEmbeddings
+                self._embeddings[model] = OpenAIEmbeddings(model=model, http_client=self.http_client())
+            return self._embeddings[model]
+
+    def chat_model(self, model: str, temperature: float = 0.7):
+        """(모델, temperature)별 ChatOpenAI (연결 풀 공유)"""
+        key = (model, temperature)
+        with self._lock:
+            if key not in self._chat_models:
+                from langchain_openai import ChatOpenAI
+                self._chat_models[key] = ChatOpenAI(model=model, temperature=temperature,
+                                                    http_client=self.http_client())
+            return self._chat_models[key]
+
+    # ==================== Pinecone ====================
+
+    def pinecone(self):
+        with self._lock:
+            if self._pinecone is None:
+                from pinecone import Pinecone
+                self._pinecone = Pinecone(api_key=os.getenv("PINECONE_API_KEY"),
+                                          pool_threads=self.pinecone_pool_threads)
+            return self._pinecone
+
+    def pinecone_index(self, index_name: str):
+        """인덱스 핸들 (만들 때 호스트 조회가 있으므로 재사용)"""
+        with self._lock:
+            if index_name not in self._pinecone_indexes:
+                self._pinecone_indexes[index_name] = self.pinecone().Index(
+                    index_name, pool_threads=self.pinecone_pool_threads
+                )
+            return self._pinecone_indexes[index_name]
+
+    def forget_pinecone_index(self, index_name: str):
+        """인덱스를 지웠을 때 핸들도 버림 (다시 만들면 호스트가 바뀜)"""
+        with self._lock:
+            self._pinecone_indexes.pop(index_name, None)
+
+    # ==================== ChromaDB ====================
+
+    def chroma(self, path: str):
+        """경로별 PersistentClient"""
+        path = os.path.abspath(path)
+        with self._lock:
+            if path not in self._chroma:
+                import chromadb
+                from chromadb.config import Settings
+                self._chroma[path] = chromadb.PersistentClient(
+                    path=path,
+                    settings=Settings(
+                        anonymized_telemetry=False,
+                        allow_reset=True
+                    )
+                )
+            return self._chroma[path]
+
+    # ==================== 종료 ====================
+
+    def close(self):
+        """연결 풀을 닫고 만들어 둔 클라이언트를 모두 버림 (이후 다시 쓰면 새로 만듦)"""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            close_pinecone = getattr(self._pinecone, "close", None)
+            if close_pinecone:
+                close_pinecone()
+
+            self._http_client = None
+            self._embeddings.clear()
+            self._chat_models.clear()
+            self._pinecone = None
+            self._pinecone_indexes.clear()
+            self._chroma.clear()
+
+
+_registry_instance: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_clients() -> ClientRegistry:
+    """프로세스 전체에서 하나만 쓰는 클라이언트 저장소 (종료 시 shutdown_clients 호출)"""
+    global _registry_instance
+    if _registry_instance is None:
+        with _registry_lock:
+            if _registry_instance is None:
+                _registry_instance = ClientRegistry()
+                atexit.register(shutdown_clients)
+    return _registry_instance
+
+
+def shutdown_clients():
+    """종료 훅: 틀린 문제 임베딩처럼 클라이언트를 쓰는 대기 작업을 먼저 끝내고 닫음"""
+    from .write_behind import get_write_behind
+    get_write_behind().close()
+
+    if _registry_instance is not None:
+        _registry_instance.close()
@@ -0,0 +1,167 @@
+"""
+문제 코퍼스 저장소 (프로세스 전체에서 공유)
+- 코퍼스 파일을 한 번만 읽어 메모리에 두고 문제번호/출처/키 인덱스를 만듦
+- 파일의 크기/수정 시각이 바뀌고 내용 해시까지 바뀐 경우에만 다시 읽음
+- 조회와 랜덤 샘플링은 디스크를 건드리지 않음
+
+사용법:
+    store = get_corpus_store("code_questions.json")
+    question = store.sample(exclude_numbers={1, 3})
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from corpus import iter_corpus, question_content_id, question_key
+from ingest_manifest import file_sha256
+
+
+# 파일 변경 확인(os.stat) 최소 간격(초)
+CHECK_INTERVAL = 1.0
+
+# 제외 조건이 있을 때 랜덤 뽑기를 다시 시도하는 횟수 (넘으면 남은 문제 목록을 만들어 뽑음)
+_SAMPLE_ATTEMPTS = 32
+
+
+class CorpusStore:
+    """코퍼스 파일 하나를 메모리에 올려 두고 조회/샘플링하는 클래스"""
+
+    def __init__(self, path: str, check_interval: float = CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stat = None          # (크기, 수정 시각)
+        self._checked_at = 0.0
+        self.version: Optional[str] = None  # 읽은 파일의 sha256
+
+        self.questions: List[Dict] = []   # 샘플링 대상 (중복으로 연결된 문제 제외)
+        self.by_number: Dict[int, List[Dict]] = {}
+        self.by_source: Dict[str, List[Dict]] = {}
+        self.by_key: Dict[str, Dict] = {}
+        self._by_content_id = None   # (만들 때의 by_key, 내용 ID → 문제), 처음 ID로 조회할 때 만듦
+
+    def refresh(self, force: bool = False) -> bool:
+        """파일이 바뀌었으면 다시 읽습니다. 다시 읽었으면 True를 반환합니다.
+
+        파일이 없으면 FileNotFoundError가 발생합니다.
+        """
+        now = time.monotonic()
+        if not force and self._stat is not None and now - self._checked_at < self.check_interval:
+            return False
+
+        with self._lock:
+            stat = os.stat(self.path)
+            current = (stat.st_size, stat.st_mtime_ns)
+            self._checked_at = now
+
+            if not force and current == self._stat:
+                return False
+
+            # 수정 시각만 바뀌고 내용이 같으면 다시 읽지 않음
+            sha256 = file_sha256(self.path)
+            if not force and sha256 == self.version:
+                self._stat = current
+                return False
+
+            self._load()
+            self._stat = current
+            self.version = sha256
+            return True
+
+    def _load(self):
+        questions = []
+        by_number = {}
+        by_source = {}
+        by_key = {}
+
+        for question in iter_corpus(self.path):
+            by_key[question_key(question)] = question
+            if question.get('duplicate_of'):
+                continue
+            questions.append(question)
+            by_number.setdefault(question.get('문제번호'), []).append(question)
+            by_source.setdefault(question.get('출처', ''), []).append(question)
+
+        # 인덱스를 한꺼번에 교체 (읽는 쪽은 항상 완성된 인덱스를 봄)
+        self.questions = questions
+        self.by_number = by_number
+        self.by_source = by_source
+        self.by_key = by_key
+
+        print(f"📚 코퍼스 로드: {self.path} ({len(questions)}개 문제)")
+
+    def __len__(self):
+        self.refresh()
+        return len(self.questions)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """문제 키("출처#문제번호")로 조회"""
+        self.refresh()
+        return self.by_key.get(key)
+
+    def get_many_by_id(self, content_ids: Iterable[str]) -> Dict[str, Dict]:
+        """내용 ID(corpus.question_content_id)로 여러 문제를 한 번에 조회. 없는 ID는 빠짐."""
+        self.refresh()
+        by_key = self.by_key
+        cached = self._by_content_id
+        if cached is not None and cached[0] is by_key:
+            by_content_id = cached[1]
+        else:
+            # 다시 읽은 뒤 처음 조회할 때 한 번만 만듦
+            by_content_id = {question_content_id(q): q for q in by_key.values()}
+            self._by_content_id = (by_key, by_content_id)
+        return {cid: by_content_id[cid] for cid in content_ids if cid in by_content_id}
+
+    def find_by_number(self, question_num: int) -> List[Dict]:
+        self.refresh()
+        return self.by_number.get(question_num, [])
+
+    def find_by_source(self, source: str) -> List[Dict]:
+        self.refresh()
+        return self.by_source.get(source, [])
+
+    def count_excluding(self, exclude_numbers: Iterable[int] = ()) -> int:
+        """제외할 문제번호를 뺀 문제 수 (제외 목록 크기에만 비례)"""
+        self.refresh()
+        by_number = self.by_number
+        excluded = sum(len(by_number.get(num, ())) for num in set(exclude_numbers))
+        return len(self.questions) - excluded
+
+    def sample(self, exclude_numbers: Iterable[int] = ()) -> Optional[Dict]:
+        """제외할 문제번호가 아닌 문제를 하나 랜덤하게 고릅니다. 없으면 None."""
+        self.refresh()
+        questions = self.questions
+        if not questions:
+            return None
+
+        exclude_numbers = set(exclude_numbers)
+
+        # 남은 문제가 많으면 몇 번 뽑아 보는 것으로 충분
+        for _ in range(_SAMPLE_ATTEMPTS):
+            question = random.choice(questions)
+            if question.get('문제번호') not in exclude_numbers:
+                return question
+
+        # 거의 다 푼 경우에만 남은 문제 목록을 만듦
+        remaining = [q for q in questions if q.get('문제번호') not in exclude_numbers]
+        return random.choice(remaining) if remaining else None
+
+
+_stores: Dict[str, CorpusStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_corpus_store(path: str) -> CorpusStore:
+    """경로별 CorpusStore를 프로세스 전체에서 하나씩만 만들어 돌려줍니다."""
+    key = os.path.abspath(path)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = CorpusStore(key)
+                _stores[key] = store
+    return store
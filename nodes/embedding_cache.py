@@ -0,0 +1,326 @@
+"""
+임베딩 캐시 (SQLite 파일)
+- (모델, 차원, 텍스트 sha256)를 키로 임베딩 벡터를 저장
+- 인덱스를 다시 만들거나 같은 문제를 또 저장할 때, 바뀐 텍스트만 API를 호출
+- 항목 수가 max_entries를 넘으면 가장 오래 안 쓴 항목부터 삭제 (LRU)
+- 적중/미스 수를 stats로 확인
+- 검색어 임베딩은 디스크 캐시 앞에 프로세스 메모리 LRU(TTL, 항목 수/바이트 제한)를 두어
+  자주 나오는 검색어는 SQLite도 거치지 않음
+- 문서 임베딩(동기화/이웃 그래프처럼 한 번에 수천 개)은 디스크 캐시만 사용
+  (메모리 LRU를 거치면 자주 쓰는 검색어 항목을 밀어내고 적중률 통계도 흐려짐)
+
+사용법:
+    embeddings = CachedEmbeddings(OpenAIEmbeddings(model=...), model=..., dimension=1536)
+    vectors = embeddings.embed_documents(texts)      # 디스크 캐시만
+    query_vectors = embeddings.embed_queries(queries)  # 메모리 → 디스크 캐시
+    embeddings.print_stats()
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+CACHE_FILE = "embedding_cache.db"
+DEFAULT_MAX_ENTRIES = 20_000   # 1536차원 float32 기준 약 120MB
+
+# 메모리 캐시 기본값
+MEMORY_MAX_ENTRIES = 4_096
+MEMORY_MAX_BYTES = 32 * 1024 * 1024   # 1536차원 float32 기준 약 5,400개
+MEMORY_TTL = 600.0                    # 초
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key       TEXT PRIMARY KEY,
+    vector    BLOB NOT NULL,
+    last_used REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used);
+"""
+
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """임베딩 벡터 디스크 캐시 (스레드마다 연결을 따로 사용)"""
+
+    def __init__(self, db_path: str = CACHE_FILE, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(model: str, dimension: int, text: str) -> str:
+        return f"{model}:{dimension}:{text_sha256(text)}"
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """캐시에 있는 키의 벡터만 돌려주고, 찾은 항목의 사용 시각을 갱신합니다."""
+        found = {}
+        conn = self._connect()
+
+        # SQLite 변수 개수 제한을 넘지 않게 나눠서 조회
+        unique_keys = list(dict.fromkeys(keys))
+        for start in range(0, len(unique_keys), 500):
+            chunk = unique_keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+            )
+            for key, blob in rows:
+                found[key] = array('f', blob).tolist()
+
+        if found:
+            now = time.time()
+            with conn:
+                conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                 [(now, key) for key in found])
+
+        hits = sum(1 for key in keys if key in found)
+        self.stats["hits"] += hits
+        self.stats["misses"] += len(keys) - hits
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]):
+        """벡터를 저장하고, 항목 수가 한도를 넘으면 오래 안 쓴 것부터 지웁니다."""
+        if not items:
+            return
+
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [(key, array('f', vector).tobytes(), now) for key, vector in items.items()]
+            )
+
+            count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)", (overflow,)
+                )
+                self.stats["evicted"] += overflow
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+
+class MemoryEmbeddingCache:
+    """프로세스 메모리 LRU 캐시 (TTL + 항목 수/바이트 제한, 스레드 안전)
+
+    적중할 때마다 캐시가 없었으면 걸렸을 시간(최근 미스 처리 시간의 이동 평균)을
+    saved_seconds에 더합니다.
+    """
+
+    def __init__(self, max_entries: int = MEMORY_MAX_ENTRIES, max_bytes: int = MEMORY_MAX_BYTES,
+                 ttl: float = MEMORY_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()   # 키 → (만료 시각, array)
+        self._bytes = 0
+        self._miss_cost = 0.0   # 벡터 하나를 캐시 없이 얻는 데 걸린 시간(초), 이동 평균
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0, "saved_seconds": 0.0}
+
+    def get(self, key: str) -> Optional[List[float]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                self._remove(key)
+                self.stats["expired"] += 1
+                entry = None
+
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            self.stats["saved_seconds"] += self._miss_cost
+            return entry[1].tolist()
+
+    def put(self, key: str, vector: List[float]):
+        values = array('f', vector)
+        size = len(values) * values.itemsize
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, values)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats["evicted"] += 1
+
+    def record_miss_cost(self, seconds: float, count: int):
+        """캐시 미스 count개를 처리하는 데 걸린 시간 기록 (saved_seconds 계산용)"""
+        if count <= 0:
+            return
+        per_vector = seconds / count
+        with self._lock:
+            self._miss_cost = per_vector if not self._miss_cost else 0.8 * self._miss_cost + 0.2 * per_vector
+
+    def _remove(self, key: str):
+        _, values = self._entries.pop(key)
+        self._bytes -= len(values) * values.itemsize
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class CachedEmbeddings:
+    """임베딩 래퍼: 검색어는 메모리 캐시 → 디스크 캐시, 문서는 디스크 캐시만"""
+
+    def __init__(self, embeddings, model: str, dimension: int,
+                 cache: Optional[EmbeddingCache] = None,
+                 memory: Optional[MemoryEmbeddingCache] = None):
+        self.embeddings = embeddings
+        self.model = model
+        self.dimension = dimension
+        self.cache = cache if cache is not None else get_embedding_cache()
+        self.memory = memory if memory is not None else get_memory_embedding_cache()
+
+    @property
+    def stats(self) -> Dict:
+        return self.cache.stats
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서 임베딩 (대량) - 디스크 캐시 → API, 메모리 캐시는 읽지도 쓰지도 않음"""
+        keys = [EmbeddingCache.make_key(self.model, self.dimension, text) for text in texts]
+        found = self._embed_uncached(keys, texts)
+        return [found[key] for key in keys]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """검색어 여러 개를 한 번에 임베딩 - 메모리 캐시 → 디스크 캐시 → API"""
+        keys = [EmbeddingCache.make_key(self.model, self.dimension, text) for text in texts]
+
+        # 메모리 캐시에 없는 것만 디스크 캐시/API로
+        found = {}
+        for key in dict.fromkeys(keys):
+            vector = self.memory.get(key)
+            if vector is not None:
+                found[key] = vector
+
+        pending = [(key, text) for key, text in zip(keys, texts) if key not in found]
+        if pending:
+            start = time.perf_counter()
+            vectors = self._embed_uncached([key for key, _ in pending], [text for _, text in pending])
+            self.memory.record_miss_cost(time.perf_counter() - start, len(vectors))
+            for key, vector in vectors.items():
+                self.memory.put(key, vector)
+            found.update(vectors)
+
+        return [found[key] for key in keys]
+
+    def _embed_uncached(self, keys: List[str], texts: List[str]) -> Dict[str, List[float]]:
+        """디스크 캐시 → API 순서로 벡터를 구함 (키 → 벡터)"""
+        found = self.cache.get_many(keys)
+
+        # 캐시에 없는 텍스트만 API 호출 (같은 텍스트는 한 번만)
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(computed)
+            found.update(computed)
+
+        return found
+
+    def embed_query(self, text: str) -> List[float]:
+        key = EmbeddingCache.make_key(self.model, self.dimension, text)
+        vector = self.memory.get(key)
+        if vector is not None:
+            return vector
+
+        start = time.perf_counter()
+        found = self.cache.get_many([key])
+        if key in found:
+            vector = found[key]
+        else:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put_many({key: vector})
+        self.memory.record_miss_cost(time.perf_counter() - start, 1)
+        self.memory.put(key, vector)
+        return vector
+
+    def print_stats(self):
+        stats = self.cache.stats
+        total = stats["hits"] + stats["misses"]
+        rate = stats["hits"] / total * 100 if total else 0.0
+        print(f"🗂️ 임베딩 캐시: 적중 {stats['hits']}개, 미스 {stats['misses']}개 "
+              f"(적중률 {rate:.1f}%, 삭제 {stats['evicted']}개)")
+
+        memory = self.memory.stats
+        print(f"⚡ 메모리 캐시: 적중 {memory['hits']}개, 미스 {memory['misses']}개 "
+              f"(적중률 {self.memory.hit_rate * 100:.1f}%, 만료 {memory['expired']}개, "
+              f"절약 {memory['saved_seconds']:.2f}초, {self.memory.nbytes / 1024 / 1024:.1f}MB)")
+
+
+_cache_instance: Optional[EmbeddingCache] = None
+_memory_instance: Optional[MemoryEmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """프로세스 전체에서 하나만 쓰는 임베딩 캐시"""
+    global _cache_instance
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                _cache_instance = EmbeddingCache()
+    return _cache_instance
+
+
+def get_memory_embedding_cache() -> MemoryEmbeddingCache:
+    """프로세스 전체에서 하나만 쓰는 메모리 캐시 (QuestionVectorDB 인스턴스끼리 공유)"""
+    global _memory_instance
+    if _memory_instance is None:
+        with _cache_lock:
+            if _memory_instance is None:
+                _memory_instance = MemoryEmbeddingCache()
+    return _memory_instance
@@ -0,0 +1,226 @@
+"""
+문제 이웃 그래프 (미리 계산한 kNN)
+- 코퍼스의 문제마다 임베딩 코사인 유사도 상위 k개 이웃을 미리 구해 둠
+- 이웃은 N×k int32 행 번호 배열 + float32 유사도 배열로 코퍼스 옆에 저장
+  ({이름}.neighbors.npz, 행 순서 = ids 순서, 이웃이 k개보다 적으면 -1)
+- "문제 X와 비슷한 문제"는 검색 없이 배열 조회 한 번
+- 문제가 추가되면 새 문제 × 전체만 계산해서 기존 이웃 목록에 합침 (전체 N×N 재계산 없음)
+  삭제된 문제를 이웃으로 가졌던 행만 다시 계산
+
+QuestionVectorDB.initialize_questions가 벡터 동기화 뒤 함께 갱신합니다.
+
+사용법:
+    graph = get_neighbor_graph("code_questions.json")
+    neighbor_ids = graph.neighbors_of(content_id, top_k=3)
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+DEFAULT_K = 10
+BLOCK_SIZE = 1024   # 한 번에 유사도를 계산하는 행 수 (BLOCK_SIZE × N 행렬)
+
+
+def neighbor_graph_path(corpus_path: str) -> str:
+    return os.path.splitext(corpus_path)[0] + ".neighbors.npz"
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k_rows(vectors, rows, k: int, block_size: int = BLOCK_SIZE):
+    """rows 행마다 전체 벡터 중 자기 자신을 뺀 상위 k개 (이웃 행 번호, 유사도)"""
+    neighbors = np.full((len(rows), k), -1, dtype=np.int32)
+    scores = np.full((len(rows), k), -np.inf, dtype=np.float32)
+    count = min(k, len(vectors) - 1)
+    if count <= 0:
+        return neighbors, scores
+
+    for start in range(0, len(rows), block_size):
+        block_rows = rows[start:start + block_size]
+        sims = vectors[block_rows] @ vectors.T
+        sims[np.arange(len(block_rows)), block_rows] = -np.inf   # 자기 자신 제외
+
+        top = np.argpartition(-sims, count - 1, axis=1)[:, :count]
+        top_scores = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        neighbors[start:start + len(block_rows), :count] = np.take_along_axis(top, order, axis=1)
+        scores[start:start + len(block_rows), :count] = np.take_along_axis(top_scores, order, axis=1)
+    return neighbors, scores
+
+
+class NeighborGraph:
+    """ids[i]의 이웃 = ids[neighbors[i, j]] (유사도 scores[i, j], 높은 순)"""
+
+    def __init__(self, ids: Sequence[str], neighbors, scores, version: str = ""):
+        self.ids = list(ids)
+        self.rows: Dict[str, int] = {item: i for i, item in enumerate(self.ids)}
+        self.neighbors = neighbors
+        self.scores = scores
+        self.version = version
+
+    @property
+    def k(self) -> int:
+        return self.neighbors.shape[1]
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ==================== 만들기 / 갱신 ====================
+
+    @classmethod
+    def build(cls, ids: Sequence[str], vectors, k: int = DEFAULT_K, version: str = ""):
+        vectors = _normalize(vectors)
+        neighbors, scores = _top_k_rows(vectors, np.arange(len(ids)), k)
+        return cls(ids, neighbors, scores, version)
+
+    def updated(self, ids: Sequence[str], vectors, version: str = "") -> "NeighborGraph":
+        """새 ID 목록(ids, 행 순서대로의 벡터)에 맞춘 그래프를 돌려줍니다.
+
+        남은 문제의 기존 이웃은 유지하고, 추가된 문제와의 유사도만 계산해 합칩니다.
+        """
+        vectors = _normalize(vectors)
+        k = self.k
+        num_rows = len(ids)
+
+        # 예전 행 번호 → 새 행 번호 (삭제된 문제는 -1)
+        old_to_new = np.full(len(self.ids) + 1, -1, dtype=np.int32)   # 마지막 칸: 패딩(-1)용
+        new_rows = {item: i for i, item in enumerate(ids)}
+        for old_row, item in enumerate(self.ids):
+            old_to_new[old_row] = new_rows.get(item, -1)
+
+        kept_new = []     # 이웃 목록을 이어받는 새 행
+        kept_old = []     # 그 행의 예전 행 번호
+        for item, new_row in new_rows.items():
+            old_row = self.rows.get(item)
+            if old_row is not None:
+                kept_new.append(new_row)
+                kept_old.append(old_row)
+        kept_new = np.array(kept_new, dtype=np.int64)
+        kept_old = np.array(kept_old, dtype=np.int64)
+        added = np.setdiff1d(np.arange(num_rows), kept_new)
+
+        neighbors = np.full((num_rows, k), -1, dtype=np.int32)
+        scores = np.full((num_rows, k), -np.inf, dtype=np.float32)
+        if len(kept_new):
+            neighbors[kept_new] = old_to_new[self.neighbors[kept_old]]
+            scores[kept_new] = self.scores[kept_old]
+
+        # 삭제된 이웃이 있던 행(이웃이 모자라게 된 행)과 새 행은 전체와 다시 계산
+        lost = (neighbors[kept_new] == -1) & (self.neighbors[kept_old] != -1) if len(kept_new) else np.zeros((0, k), bool)
+        recompute = np.union1d(added, kept_new[lost.any(axis=1)]).astype(np.int64)
+
+        # 나머지 기존 행은 새 문제와의 유사도만 보고 더 가까우면 교체
+        merge_rows = np.setdiff1d(kept_new, recompute)
+        if len(added) and len(merge_rows):
+            for start in range(0, len(merge_rows), BLOCK_SIZE):
+                rows = merge_rows[start:start + BLOCK_SIZE]
+                sims = vectors[rows] @ vectors[added].T
+                all_neighbors = np.concatenate([neighbors[rows], np.broadcast_to(added, sims.shape)], axis=1)
+                all_scores = np.concatenate([scores[rows], sims.astype(np.float32)], axis=1)
+                order = np.argsort(-all_scores, axis=1, kind='stable')[:, :k]
+                neighbors[rows] = np.take_along_axis(all_neighbors, order, axis=1)
+                scores[rows] = np.take_along_axis(all_scores, order, axis=1)
+
+        if len(recompute):
+            neighbors[recompute], scores[recompute] = _top_k_rows(vectors, recompute, k)
+
+        # 패딩 칸은 -1로 통일
+        neighbors[~np.isfinite(scores)] = -1
+        return NeighborGraph(ids, neighbors, scores, version)
+
+    # ==================== 저장 / 읽기 ====================
+
+    def save(self, path: str):
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, ids=np.array(self.ids, dtype=str), neighbors=self.neighbors,
+                 scores=self.scores, version=np.array(self.version))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as data:
+            return cls(data['ids'].tolist(), data['neighbors'], data['scores'], str(data['version']))
+
+    # ==================== 조회 ====================
+
+    def neighbors_of(self, item: str, top_k: Optional[int] = None) -> List[str]:
+        """item과 비슷한 ID 목록 (유사도 높은 순). 모르는 ID면 빈 목록."""
+        row = self.rows.get(item)
+        if row is None:
+            return []
+        neighbor_rows = self.neighbors[row, :top_k]
+        return [self.ids[neighbor] for neighbor in neighbor_rows if neighbor >= 0]
+
+
+def sync_neighbor_graph(corpus_path: str, ids: Sequence[str],
+                        embed: Callable[[List[int]], List[List[float]]],
+                        version: str = "", k: int = DEFAULT_K, rebuild: bool = False) -> NeighborGraph:
+    """저장된 그래프를 ids(코퍼스 순서)에 맞게 갱신해 저장합니다.
+
+    embed(행 번호 목록)은 해당 행의 임베딩을 돌려주는 함수입니다. (보통 임베딩 캐시 적중)
+    version은 임베딩 모델 이름처럼 벡터가 달라지는 조건이며, 바뀌면 처음부터 다시 만듭니다.
+    """
+    path = neighbor_graph_path(corpus_path)
+    start = time.perf_counter()
+
+    previous = None
+    if not rebuild and os.path.exists(path):
+        previous = NeighborGraph.load(path)
+        if previous.k != k or previous.version != version:
+            # 이웃 수나 임베딩 모델이 바뀌면 기존 이웃을 이어받을 수 없음
+            previous = None
+
+    if previous is not None and previous.ids == list(ids):
+        print(f"✓ 이웃 그래프 변경 없음: {path}")
+        return previous
+
+    vectors = embed(list(range(len(ids))))
+    if previous is None:
+        graph = NeighborGraph.build(ids, vectors, k, version)
+        action = "생성"
+    else:
+        graph = previous.updated(ids, vectors, version)
+        action = "갱신"
+
+    graph.save(path)
+    print(f"🕸️ 이웃 그래프 {action}: {path} (문제 {len(graph)}개 × 이웃 {k}개, "
+          f"{time.perf_counter() - start:.2f}초)")
+    return graph
+
+
+# ==================== 프로세스 공유 ====================
+
+# 코퍼스 경로 → [그래프, 확인한 (크기, 수정 시각)]
+_graphs: Dict[str, list] = {}
+_graphs_lock = threading.Lock()
+
+
+def get_neighbor_graph(corpus_path: str) -> Optional[NeighborGraph]:
+    """저장된 이웃 그래프 (파일이 바뀌면 다시 읽음). 아직 만들지 않았으면 None."""
+    path = neighbor_graph_path(os.path.abspath(corpus_path))
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    current = (stat.st_size, stat.st_mtime_ns)
+    entry = _graphs.get(path)
+    if entry is not None and entry[1] == current:
+        return entry[0]
+
+    with _graphs_lock:
+        entry = _graphs.get(path)
+        if entry is None or entry[1] != current:
+            entry = [NeighborGraph.load(path), current]
+            _graphs[path] = entry
+        return entry[0]
@@ -0,0 +1,300 @@
+"""
+NumPy 벡터 저장소 (정확한 코사인 검색)
+- 정규화한 임베딩을 연속된 float32/float16 행렬 파일({name}.{세대}.vectors, 헤더 없는 원시 배열)로
+  저장하고 메모리 맵으로 읽음
+- ID/메타데이터는 {name}.jsonl 로그에 한 줄씩 추가 (첫 줄은 헤더, 같은 ID가 다시 나오면 나중 것이 이김)
+- 검색은 행렬 곱 한 번 + argpartition으로 여러 쿼리를 한꺼번에 top-k
+- 메타데이터 필터는 필드별 게시 목록(값 → 행 번호 배열)으로 먼저 행을 고른 뒤 그 행만 점수 계산
+
+쓰기 비용:
+- upsert는 새 행을 행렬 파일 끝에, 메타데이터를 로그 끝에 덧붙이기만 함 (추가하는 행 수에 비례)
+  같은 ID를 덮어쓰면 그 행 자리에 바로 씀
+- delete만 남은 행으로 새 세대 파일을 만들어 교체 (동기화 때 한 번)
+
+문제 수천~수만 개 규모에서는 네트워크/무거운 의존성 없이 가장 빠르고 단순한 방법입니다.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+# float16 행렬은 이 행 수씩 float32로 바꿔 점수 계산 (행렬 전체를 복사하지 않음)
+SCORE_BLOCK_ROWS = 8192
+
+
+class NumpyVectorStore:
+    """컬렉션 하나 = {directory}/{name}.jsonl + {name}.{세대}.vectors"""
+
+    def __init__(self, directory: str, name: str, dimension: int, dtype: str = "float32"):
+        self.directory = directory
+        self.name = name
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+        self.log_path = os.path.join(directory, f"{name}.jsonl")
+
+        self._lock = threading.Lock()
+        self._loaded_stat = None
+        self._generation = 0
+        self._matrix = np.zeros((0, dimension), dtype=self.dtype)
+        self._ids: List[str] = []
+        self._metadatas: List[Dict] = []
+        self._positions: Dict[str, int] = {}
+        self._postings: Dict[str, Dict] = {}   # 필드 → 값 → 행 번호 배열 (필터에 처음 쓸 때 만듦)
+
+    def _vectors_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"{self.name}.{generation}.vectors")
+
+    def _map_matrix(self):
+        """행렬 파일을 현재 행 수만큼 메모리 맵으로 엽니다."""
+        if not self._ids:
+            self._matrix = np.zeros((0, self.dimension), dtype=self.dtype)
+        else:
+            self._matrix = np.memmap(self._vectors_path(self._generation), dtype=self.dtype,
+                                     mode='r', shape=(len(self._ids), self.dimension))
+
+    # ==================== 읽기 ====================
+
+    def _refresh(self):
+        """로그가 바뀌었으면 다시 읽습니다. (다른 프로세스가 쓴 내용도 반영)"""
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            return
+
+        current = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if current == self._loaded_stat:
+            return
+
+        with self._lock:
+            ids, metadatas, positions = [], [], {}
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break   # 쓰다가 끊긴 마지막 줄
+                    position = positions.get(entry["id"])
+                    if position is None:
+                        positions[entry["id"]] = len(ids)
+                        ids.append(entry["id"])
+                        metadatas.append(entry["metadata"])
+                    else:
+                        metadatas[position] = entry["metadata"]
+
+            self.dtype = np.dtype(header["dtype"])
+            self._generation = header["generation"]
+            self._ids, self._metadatas, self._positions = ids, metadatas, positions
+            self._postings = {}
+            self._map_matrix()
+            self._loaded_stat = current
+
+    def count(self) -> int:
+        self._refresh()
+        return len(self._ids)
+
+    def ids(self) -> List[str]:
+        self._refresh()
+        return list(self._ids)
+
+    @staticmethod
+    def _filter_rows(metadatas: List[Dict], postings: Dict[str, Dict], filters: Dict[str, Sequence]):
+        """필터를 만족하는 행 번호 배열 (필드 안에서는 OR, 필드끼리는 AND)"""
+        rows = None
+        for field, values in filters.items():
+            field_postings = postings.get(field)
+            if field_postings is None:
+                grouped = {}
+                for row, metadata in enumerate(metadatas):
+                    grouped.setdefault(metadata.get(field), []).append(row)
+                field_postings = {value: np.array(group, dtype=np.int64)
+                                  for value, group in grouped.items()}
+                postings[field] = field_postings
+
+            matched = [field_postings[value] for value in values if value in field_postings]
+            field_rows = np.unique(np.concatenate(matched)) if matched else np.zeros(0, dtype=np.int64)
+            rows = field_rows if rows is None else np.intersect1d(rows, field_rows, assume_unique=True)
+        return rows
+
+    @staticmethod
+    def _scores(queries, matrix):
+        """(쿼리 수 × 행 수) 유사도. float32가 아니면 블록마다 바꿔서 계산"""
+        if matrix.dtype == np.float32:
+            return queries @ np.asarray(matrix).T
+
+        scores = np.empty((len(queries), len(matrix)), dtype=np.float32)
+        for start in range(0, len(matrix), SCORE_BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+            scores[:, start:start + len(block)] = queries @ block.T
+        return scores
+
+    def query(self, query_vectors: Sequence[Sequence[float]], top_k: int = 3,
+              filters: Optional[Dict[str, Sequence]] = None) -> List[List[Dict]]:
+        """쿼리마다 코사인 유사도 상위 top_k개 [{"id", "score", "metadata"}]
+
+        filters: {메타데이터 필드: 허용 값 목록}. 조건에 맞는 행만 점수를 계산합니다.
+        """
+        self._refresh()
+        with self._lock:
+            matrix, ids, metadatas, postings = self._matrix, self._ids, self._metadatas, self._postings
+
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+
+        rows = self._filter_rows(metadatas, postings, filters) if filters else None
+        if rows is not None:
+            matrix = matrix[rows]
+
+        if not len(matrix) or top_k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        queries = _normalize(queries)
+        scores = self._scores(queries, matrix)
+        k = min(top_k, scores.shape[1])
+
+        # 상위 k개만 골라서(argpartition) 그 안에서만 정렬
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+
+        results = []
+        for query_index in range(len(queries)):
+            hits = []
+            for column in top[query_index]:
+                row = int(column) if rows is None else int(rows[column])
+                hits.append({
+                    "id": ids[row],
+                    "score": float(scores[query_index, column]),
+                    "metadata": metadatas[row]
+                })
+            results.append(hits)
+        return results
+
+    # ==================== 쓰기 ====================
+
+    def _header(self) -> str:
+        return json.dumps({"dimension": self.dimension, "dtype": self.dtype.name,
+                           "generation": self._generation}) + "\n"
+
+    @staticmethod
+    def _log_line(vector_id: str, metadata: Dict) -> str:
+        return json.dumps({"id": vector_id, "metadata": metadata}, ensure_ascii=False) + "\n"
+
+    def _mark_loaded(self):
+        stat = os.stat(self.log_path)
+        self._loaded_stat = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def upsert(self, ids: Sequence[str], embeddings: Sequence[Sequence[float]],
+               metadatas: Optional[Sequence[Dict]] = None):
+        """같은 ID는 그 행에 덮어쓰고 새 ID는 뒤에 추가합니다. (추가한 만큼만 씀)"""
+        if not len(ids):
+            return
+        metadatas = metadatas or [{} for _ in ids]
+
+        self._refresh()
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            if not os.path.exists(self.log_path):
+                with open(self.log_path, 'w', encoding='utf-8') as f:
+                    f.write(self._header())
+
+            vectors = _normalize(np.asarray(embeddings, dtype=np.float32)).astype(self.dtype)
+            row_bytes = self.dimension * self.dtype.itemsize
+            vectors_path = self._vectors_path(self._generation)
+
+            # 행 자리 정하기 (새 ID는 끝에서부터, 같은 배치 안의 중복 ID는 나중 것)
+            added: Dict[str, int] = {}
+            placements = []
+            for vector_id, vector, metadata in zip(ids, vectors, metadatas):
+                position = self._positions.get(vector_id, added.get(vector_id))
+                if position is None:
+                    position = added[vector_id] = len(self._ids) + len(added)
+                placements.append((position, vector_id, vector, metadata))
+
+            # 행렬을 먼저 쓰고 로그를 나중에 씀 (로그에 있는 행만 유효, 끊기면 남은 꼬리는 다음에 덮어씀)
+            with open(vectors_path, 'r+b' if os.path.exists(vectors_path) else 'wb') as f:
+                for position, _, vector, _ in placements:
+                    f.seek(position * row_bytes)
+                    f.write(vector.tobytes())
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write("".join(self._log_line(vector_id, metadata)
+                                for _, vector_id, _, metadata in placements))
+
+            # 방금 쓴 내용을 바로 반영 (동시에 들어온 다음 쓰기가 옛 내용을 덮어쓰지 않도록)
+            ids_list, metadatas_list = list(self._ids), list(self._metadatas)
+            for position, vector_id, _, metadata in placements:
+                if position == len(ids_list):
+                    ids_list.append(vector_id)
+                    metadatas_list.append(metadata)
+                else:
+                    metadatas_list[position] = metadata
+            self._positions.update(added)
+            self._ids, self._metadatas = ids_list, metadatas_list
+            self._postings = {}
+            self._map_matrix()
+            self._mark_loaded()
+
+    def delete(self, ids: Sequence[str]):
+        """ID를 지우고 남은 행으로 새 세대 파일을 만들어 교체합니다."""
+        self._refresh()
+        remove = set(ids)
+        with self._lock:
+            keep = [i for i, vector_id in enumerate(self._ids) if vector_id not in remove]
+            if len(keep) == len(self._ids):
+                return
+
+            old_vectors_path = self._vectors_path(self._generation)
+            matrix = np.ascontiguousarray(self._matrix[keep], dtype=self.dtype)
+            ids = [self._ids[i] for i in keep]
+            metadatas = [self._metadatas[i] for i in keep]
+
+            # 새 세대 행렬 → 로그 교체 순서 (로그가 가리키는 행렬 파일은 항상 완성된 것)
+            self._generation += 1
+            matrix.tofile(self._vectors_path(self._generation))
+            log_tmp = self.log_path + ".tmp"
+            with open(log_tmp, 'w', encoding='utf-8') as f:
+                f.write(self._header())
+                f.writelines(self._log_line(vector_id, metadata)
+                             for vector_id, metadata in zip(ids, metadatas))
+            os.replace(log_tmp, self.log_path)
+            os.remove(old_vectors_path)
+
+            self._ids, self._metadatas = ids, metadatas
+            self._positions = {vector_id: i for i, vector_id in enumerate(ids)}
+            self._postings = {}
+            self._map_matrix()
+            self._mark_loaded()
+
+    def drop(self):
+        """컬렉션 파일 삭제"""
+        with self._lock:
+            for path in self._vectors_files():
+                os.remove(path)
+            if os.path.exists(self.log_path):
+                os.remove(self.log_path)
+            self._generation = 0
+            self._matrix = np.zeros((0, self.dimension), dtype=self.dtype)
+            self._ids, self._metadatas, self._positions = [], [], {}
+            self._postings = {}
+            self._loaded_stat = None
+
+    def _vectors_files(self) -> List[str]:
+        """이 컬렉션의 모든 세대 행렬 파일"""
+        if not os.path.isdir(self.directory):
+            return []
+        prefix, suffix = f"{self.name}.", ".vectors"
+        return [os.path.join(self.directory, file_name) for file_name in os.listdir(self.directory)
+                if file_name.startswith(prefix) and file_name.endswith(suffix)
+                and file_name[len(prefix):-len(suffix)].isdigit()]
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
@@ -5,12 +5,20 @@
 
 import json
 from typing import Dict
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from dotenv import load_dotenv
 
+from .clients import get_clients
+
 load_dotenv()
 
+# 코퍼스 language 필드(split_by_type.detect_language) → 프롬프트에 쓸 언어 이름
+PROMPT_LANGUAGES = {
+    "Python": "Python",
+    "Java": "Java",
+    "C/C++": "C",
+}
+
 
 def generate_question(state: Dict) -> Dict:
     """문제 생성 노드 (GPT-4 사용)"""
@@ -25,15 +33,14 @@ def generate_question(state: Dict) -> Dict:
     print(f"새로운 {question_type} 문제 생성 중...")
     print(f"{'='*60}")
 
-    # LLM 초기화
-    llm = ChatOpenAI(
-        model="gpt-5-chat-latest",
-        temperature=0.8  # 창의성을 위해 높은 temperature
-    )
+    # LLM (프로세스 전체에서 공유, 창의성을 위해 높은 temperature)
+    llm = get_clients().chat_model("gpt-5-chat-latest", temperature=0.8)
 
-    # Few-shot 예시에서 사용된 언어 감지
+    # Few-shot 예시에서 사용된 언어 (분류 단계에서 저장한 language 필드 우선)
     detected_language = "Python"  # 기본값
-    if similar_questions and similar_questions[0].get('코드'):
+    if similar_questions and similar_questions[0].get('language') in PROMPT_LANGUAGES:
+        detected_language = PROMPT_LANGUAGES[similar_questions[0]['language']]
+    elif similar_questions and similar_questions[0].get('코드'):
         code = similar_questions[0].get('코드', '')
         if '#include' in code or 'printf' in code or 'scanf' in code:
             detected_language = "C"
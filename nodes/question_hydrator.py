@@ -0,0 +1,116 @@
+"""
+벡터 검색 결과 → 문제 dict 변환 (hydration)
+- 가벼운 메타데이터만 저장한 벡터는 ID로 로컬 코퍼스(CorpusStore)에서 한꺼번에 찾아옴
+- 예전처럼 full_question을 가진 벡터는 그 JSON을 그대로 사용
+- 자주 나오는 문제는 LRU 캐시에 보관
+  (벡터 ID는 임베딩되는 필드만의 해시라 답 패치 등은 같은 ID → 캐시 키에 코퍼스 버전을 넣음)
+
+사용법:
+    hydrator = get_question_hydrator()
+    questions = hydrator.hydrate("code", [(vector_id, metadata), ...])
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .corpus_store import get_corpus_store
+
+
+DEFAULT_MAX_ENTRIES = 1024
+
+Hit = Tuple[str, Dict]   # (벡터 ID, 메타데이터)
+
+
+class QuestionHydrator:
+    """(문제 유형, 코퍼스 버전, 벡터 ID) → 문제 dict, 크기 제한 LRU 캐시 포함"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "corpus_lookups": 0, "not_found": 0}
+
+    def _get_cached(self, key):
+        with self._lock:
+            question = self._cache.get(key)
+            if question is not None:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+            return question
+
+    def _put_cached(self, key, question):
+        with self._lock:
+            self._cache[key] = question
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def hydrate(self, question_type: str, hits: Sequence[Hit]) -> List[Dict]:
+        """검색 결과 순서대로 문제 dict 목록을 만듭니다. 찾을 수 없는 결과는 빠집니다."""
+        questions: List[Optional[Dict]] = [None] * len(hits)
+        missing = {}   # 코퍼스 내용 ID → 결과 위치 목록
+        store = get_corpus_store(f"{question_type}_questions.json")
+        try:
+            store.refresh()
+        except FileNotFoundError:
+            pass   # full_question만으로 만들 수 있는 결과는 코퍼스 없이도 돌려줌
+        version = store.version
+
+        for position, (vector_id, metadata) in enumerate(hits):
+            key = (question_type, version, vector_id)
+            question = self._get_cached(key)
+            if question is None and metadata.get('full_question'):
+                # 예전 형식: 메타데이터에 문제 전체가 들어 있음
+                question = json.loads(metadata['full_question'])
+                self._put_cached(key, question)
+
+            if question is not None:
+                questions[position] = question
+            else:
+                content_id = vector_id[2:] if vector_id.startswith("q_") else vector_id
+                missing.setdefault(content_id, []).append(position)
+
+        # 코퍼스를 한 번도 읽지 못했으면 찾을 곳이 없음 (못 찾은 결과로 셈)
+        if missing and version is not None:
+            try:
+                found = store.get_many_by_id(missing)
+                self.stats["corpus_lookups"] += 1
+
+                for content_id, positions in missing.items():
+                    question = found.get(content_id)
+                    if question is not None:
+                        self._put_cached((question_type, version, hits[positions[0]][0]), question)
+                    for position in positions:
+                        # 동기화 이후 코퍼스가 바뀐 경우: 문제 키로 다시 찾음 (캐시하지 않음)
+                        questions[position] = question or store.get(hits[position][1].get('key', ''))
+            except FileNotFoundError:
+                pass   # 조회 중에 코퍼스 파일이 없어짐 → 남은 결과는 못 찾은 것으로
+
+        result = [question for question in questions if question is not None]
+        if len(result) < len(hits):
+            self.stats["not_found"] += len(hits) - len(result)
+            print(f"⚠️ 코퍼스에서 찾지 못한 검색 결과 {len(hits) - len(result)}개 제외 "
+                  f"(벡터 DB를 다시 동기화하세요)")
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+_hydrator_instance: Optional[QuestionHydrator] = None
+_hydrator_lock = threading.Lock()
+
+
+def get_question_hydrator() -> QuestionHydrator:
+    """프로세스 전체에서 하나만 쓰는 hydrator"""
+    global _hydrator_instance
+    if _hydrator_instance is None:
+        with _hydrator_lock:
+            if _hydrator_instance is None:
+                _hydrator_instance = QuestionHydrator()
+    return _hydrator_instance
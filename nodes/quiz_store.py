@@ -0,0 +1,469 @@
+"""
+문제 풀이 기록 저장소 (SQLite, WAL 모드)
+- solved: 사용자별 푼 문제 키("출처#문제번호", 문제 유형별), wrong_answers: 사용자별 틀린 문제와 답
+- progress: 사용자별 출제 진행 상태 (섞인 순서의 시드 + 커서, 푼 문제는 건너뜀)
+- solved_epoch: 사용자별 푼 문제 세대. 초기화는 세대만 올리고(O(1)), 지난 세대의 solved 행은
+  푼 문제로 보지 않음 (같은 문제를 다시 풀면 그 행을 새 세대로 덮어씀)
+- 답 하나를 기록할 때 행 하나만 추가하므로 기록이 쌓여도 비용이 같음
+- WAL 모드라 여러 세션이 동시에 읽고 써도 파일이 깨지지 않음
+- 예전 solved_questions.json / wrong_questions.json은 처음 열 때 한 번만 옮겨 옴
+
+사용법:
+    store = get_quiz_store()
+    index, remaining = store.draw_question(user_id, "code", corpus_size, corpus_version,
+                                           question_key=lambda i: question_key(questions[i]))
+    store.add_solved(user_id, "code", ["2023년 1회#3"])
+    store.add_wrong(question, user_answer="...", correct_answer="...", user_id=user_id)
+"""
+
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from corpus import iter_corpus, question_key
+
+
+DB_FILE = "quiz.db"
+SOLVED_JSON = "solved_questions.json"
+WRONG_JSON = "wrong_questions.json"
+
+# 문제 유형별 코퍼스 파일 (문제번호만 저장했던 예전 기록을 문제 키로 옮길 때 사용)
+CORPUS_FILE = "{question_type}_questions.json"
+
+# 사용자 ID가 없을 때 (CLI, 예전 JSON 기록)
+DEFAULT_USER_ID = "local"
+
+SOLVED_TABLE = """
+CREATE TABLE IF NOT EXISTS solved (
+    user_id       TEXT NOT NULL,
+    question_type TEXT NOT NULL,
+    question_key  TEXT NOT NULL,
+    solved_at     REAL NOT NULL,
+    epoch         INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, question_type, question_key)
+)"""
+
+SOLVED_EPOCH_TABLE = """
+CREATE TABLE IF NOT EXISTS solved_epoch (
+    user_id       TEXT NOT NULL,
+    question_type TEXT NOT NULL,
+    epoch         INTEGER NOT NULL,
+    PRIMARY KEY (user_id, question_type)
+)"""
+
+SCHEMA = f"""{SOLVED_TABLE};
+
+{SOLVED_EPOCH_TABLE};
+
+CREATE TABLE IF NOT EXISTS progress (
+    user_id        TEXT NOT NULL,
+    question_type  TEXT NOT NULL,
+    corpus_version TEXT,
+    corpus_size    INTEGER NOT NULL,
+    seed           INTEGER NOT NULL,
+    cursor         INTEGER NOT NULL,
+    updated_at     REAL NOT NULL,
+    PRIMARY KEY (user_id, question_type)
+);
+
+CREATE TABLE IF NOT EXISTS wrong_answers (
+    id             INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id        TEXT NOT NULL DEFAULT '{DEFAULT_USER_ID}',
+    question       TEXT NOT NULL,
+    user_answer    TEXT,
+    correct_answer TEXT,
+    created_at     REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_wrong_answers_created_at ON wrong_answers (created_at);
+CREATE INDEX IF NOT EXISTS idx_wrong_answers_user ON wrong_answers (user_id, created_at);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# user_id 없는 예전 solved 테이블 → 사용자별 테이블 (기존 기록은 DEFAULT_USER_ID로)
+UPGRADE_SOLVED_USER_ID = f"""
+ALTER TABLE solved RENAME TO solved_old;
+CREATE TABLE solved (
+    user_id       TEXT NOT NULL,
+    question_type TEXT NOT NULL,
+    question_id   INTEGER NOT NULL,
+    solved_at     REAL NOT NULL,
+    PRIMARY KEY (user_id, question_type, question_id)
+);
+INSERT INTO solved (user_id, question_type, question_id, solved_at)
+    SELECT '{DEFAULT_USER_ID}', question_type, question_id, solved_at FROM solved_old;
+DROP TABLE solved_old;
+"""
+
+# 세대(epoch) 없는 solved 테이블 → 기존 기록은 0세대
+UPGRADE_SOLVED_EPOCH = f"""
+ALTER TABLE solved ADD COLUMN epoch INTEGER NOT NULL DEFAULT 0;
+{SOLVED_EPOCH_TABLE};
+INSERT OR IGNORE INTO solved_epoch (user_id, question_type, epoch)
+    SELECT DISTINCT user_id, question_type, 0 FROM solved;
+"""
+
+# user_id 없는 예전 wrong_answers 테이블 → 기존 기록은 DEFAULT_USER_ID로
+UPGRADE_WRONG_USER_ID = f"""
+ALTER TABLE wrong_answers ADD COLUMN user_id TEXT NOT NULL DEFAULT '{DEFAULT_USER_ID}';
+"""
+
+# 푼 문제 추가: 현재 세대로 기록하고, 지난 세대에 풀었던 문제면 새 세대로 덮어씀
+INSERT_SOLVED = """
+INSERT INTO solved (user_id, question_type, question_key, solved_at, epoch)
+    SELECT ?1, ?2, ?3, ?4, epoch FROM solved_epoch WHERE user_id = ?1 AND question_type = ?2
+ON CONFLICT (user_id, question_type, question_key) DO UPDATE
+    SET solved_at = excluded.solved_at, epoch = excluded.epoch
+    WHERE solved.epoch < excluded.epoch
+"""
+
+
+def legacy_key_mapper(question_type: str,
+                      corpus_file: str = CORPUS_FILE) -> Callable[[object], List[str]]:
+    """문제번호만 저장했던 예전 푼 문제 기록 → 문제 키 목록으로 바꾸는 함수
+
+    예전에는 문제번호가 같으면 출처(회차)가 달라도 푼 문제로 건너뛰었으므로, 같은 동작이
+    유지되도록 코퍼스에서 그 번호를 가진 모든 문제의 키로 바꿉니다.
+    코퍼스에 없는 번호는 출처가 빈 키("#번호")로 남깁니다.
+    """
+    corpus_file = corpus_file.format(question_type=question_type)
+    by_number: Dict[str, List[str]] = {}
+    if os.path.exists(corpus_file):
+        for question in iter_corpus(corpus_file):
+            by_number.setdefault(str(question.get('문제번호')), []).append(question_key(question))
+
+    return lambda number: by_number.get(str(number)) or [f"#{number}"]
+
+
+_FEISTEL_ROUNDS = 4
+
+
+def _feistel_round(value, round_index, seed):
+    digest = hashlib.blake2b(f"{seed}:{round_index}:{value}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def shuffled_index(position, size, seed):
+    """시드로 정해지는 0..size-1 순열의 position번째 값
+
+    Feistel 네트워크(2의 거듭제곱 범위의 순열)에 cycle walking을 더해
+    순열을 저장하지 않고 한 자리씩 O(1)로 계산합니다.
+    """
+    if not 0 <= position < size:
+        raise IndexError(f"position {position}이 범위(0..{size - 1})를 벗어났습니다.")
+
+    bits = max(2, (size - 1).bit_length())
+    bits += bits % 2
+    half = bits // 2
+    mask = (1 << half) - 1
+
+    value = position
+    while True:
+        left, right = value >> half, value & mask
+        for round_index in range(_FEISTEL_ROUNDS):
+            left, right = right, left ^ (_feistel_round(right, round_index, seed) & mask)
+        value = (left << half) | right
+        # 범위(size)를 넘으면 한 번 더 섞음 (범위가 size의 4배 미만이라 평균 몇 번 안에 끝남)
+        if value < size:
+            return value
+
+
+def make_wrong_item(question: Dict, user_answer: str, correct_answer: str,
+                    timestamp: Optional[float] = None, user_id: str = DEFAULT_USER_ID) -> Dict:
+    """틀린 문제 기록 항목 (recent_wrong이 돌려주는 모양과 같음)"""
+    return {
+        "user_id": user_id,
+        "question": question,
+        "user_answer": user_answer,
+        "correct_answer": correct_answer,
+        "timestamp": time.time() if timestamp is None else timestamp
+    }
+
+
+class QuizStore:
+    """풀이 기록 SQLite 저장소 (스레드마다 연결을 따로 사용)"""
+
+    def __init__(self, db_path: str = DB_FILE, migrate: bool = True, corpus_file: str = CORPUS_FILE):
+        self.db_path = db_path
+        self.corpus_file = corpus_file   # 예전 기록 변환용 코퍼스 경로 ({question_type} 자리)
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(solved)")}
+            if columns and 'user_id' not in columns:
+                conn.executescript(UPGRADE_SOLVED_USER_ID)
+            if columns and 'question_key' not in columns:
+                self._upgrade_solved_keys(conn)
+            elif columns and 'epoch' not in columns:
+                conn.executescript(UPGRADE_SOLVED_EPOCH)
+            wrong_columns = {row[1] for row in conn.execute("PRAGMA table_info(wrong_answers)")}
+            if wrong_columns and 'user_id' not in wrong_columns:
+                conn.executescript(UPGRADE_WRONG_USER_ID)
+            conn.executescript(SCHEMA)
+
+        if migrate:
+            self.migrate_json()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _upgrade_solved_keys(self, conn: sqlite3.Connection):
+        """문제번호(INTEGER)로 저장한 solved → 문제 키(TEXT) 테이블 (한 트랜잭션)"""
+        rows = conn.execute("SELECT user_id, question_type, question_id, solved_at FROM solved").fetchall()
+
+        mappers: Dict[str, Callable[[object], List[str]]] = {}
+        converted = []
+        for user_id, question_type, number, solved_at in rows:
+            if question_type not in mappers:
+                mappers[question_type] = legacy_key_mapper(question_type, self.corpus_file)
+            converted.extend((user_id, question_type, key, solved_at)
+                             for key in mappers[question_type](number))
+
+        conn.execute("BEGIN")
+        conn.execute("DROP TABLE solved")
+        conn.execute(SOLVED_TABLE)
+        conn.execute(SOLVED_EPOCH_TABLE)
+        self._insert_solved(conn, converted)
+        conn.commit()
+        print(f"📦 푼 문제 기록 {len(rows)}개를 문제 키 {len(converted)}개로 변환")
+
+    # ==================== 푼 문제 ====================
+
+    @staticmethod
+    def _insert_solved(conn: sqlite3.Connection, rows: List[tuple]):
+        """(user_id, question_type, question_key, solved_at)를 현재 세대로 추가 (트랜잭션은 호출하는 쪽)"""
+        conn.executemany(
+            "INSERT OR IGNORE INTO solved_epoch (user_id, question_type, epoch) VALUES (?, ?, 0)",
+            list(dict.fromkeys((row[0], row[1]) for row in rows))
+        )
+        conn.executemany(INSERT_SOLVED, rows)
+
+    def add_solved(self, user_id: str, question_type: str, question_keys: Iterable[str]):
+        """푼 문제 키("출처#문제번호")를 추가합니다. (이번 세대에 이미 있으면 무시)"""
+        now = time.time()
+        self.add_solved_batch([(user_id, question_type, key, now) for key in question_keys])
+
+    def add_solved_batch(self, rows: List[tuple]):
+        """(user_id, question_type, question_key, solved_at) 여러 개를 한 트랜잭션으로 추가"""
+        with self._connect() as conn:
+            self._insert_solved(conn, rows)
+
+    def solved_keys(self, user_id: str, question_type: str) -> Set[str]:
+        """현재 세대에 푼 문제 키 (기본 키 앞부분으로 사용자/유형의 행만 읽음)"""
+        rows = self._connect().execute(
+            "SELECT s.question_key FROM solved s JOIN solved_epoch e "
+            "ON e.user_id = s.user_id AND e.question_type = s.question_type "
+            "WHERE s.user_id = ? AND s.question_type = ? AND s.epoch = e.epoch",
+            (user_id, question_type)
+        )
+        return {row[0] for row in rows}
+
+    def clear_solved(self, user_id: str, question_type: Optional[str] = None):
+        """사용자의 푼 문제 기록을 비웁니다. (question_type이 None이면 전부)
+
+        행을 지우지 않고 세대만 올리므로 기록 수와 관계없이 O(1)입니다.
+        (None이면 문제 유형 수만큼의 행을 갱신)
+        """
+        with self._connect() as conn:
+            if question_type is None:
+                conn.execute("UPDATE solved_epoch SET epoch = epoch + 1 WHERE user_id = ?", (user_id,))
+            else:
+                conn.execute("UPDATE solved_epoch SET epoch = epoch + 1 "
+                             "WHERE user_id = ? AND question_type = ?", (user_id, question_type))
+
+    # ==================== 출제 진행 상태 ====================
+
+    def draw_question(self, user_id: str, question_type: str, corpus_size: int,
+                      corpus_version: Optional[str] = None,
+                      question_key: Optional[Callable[[int], str]] = None):
+        """사용자에게 아직 안 낸, 아직 안 푼 문제의 코퍼스 위치를 하나 뽑습니다.
+
+        사용자마다 시드로 섞인 순서를 커서로 따라가므로 뽑기 한 번이 O(1)이고
+        같은 순서 안에서 같은 문제가 두 번 나오지 않습니다.
+        question_key(위치 → 문제 키)를 주면 solved에 있는 문제는 커서를 넘기며 건너뜁니다.
+        푼 문제 집합은 뽑기마다 한 번만 읽고, 커서는 되돌아가지 않으므로 건너뛰기까지
+        합쳐도 순서 하나를 도는 비용은 O(N)입니다.
+
+        커서 계산은 쓰기 잠금 없이 하고, 진행 상태를 쓸 때만 BEGIN IMMEDIATE로 잠가
+        그 사이 같은 사용자의 다른 뽑기가 커서를 옮겼으면 다시 계산합니다.
+
+        코퍼스가 바뀌면(크기/버전) 새 순서로 시작하지만, 푼 문제 기록(solved)은 그대로라
+        이미 푼 문제는 다시 나오지 않습니다. 순서 끝까지 갔으면 새 순서로 한 번 더 돌며
+        뽑기만 하고 답하지 않은 문제를 찾습니다.
+        (위치, 남은 위치 수)를 반환하고, 더 낼 문제가 없으면 위치는 None입니다.
+        """
+        conn = self._connect()
+        solved = self.solved_keys(user_id, question_type) if question_key is not None else set()
+
+        while True:
+            row = conn.execute(
+                "SELECT corpus_version, corpus_size, seed, cursor FROM progress "
+                "WHERE user_id = ? AND question_type = ?", (user_id, question_type)
+            ).fetchone()
+
+            if row is None or row[0] != corpus_version or row[1] != corpus_size:
+                seed, cursor = random.getrandbits(63), 0
+            else:
+                seed, cursor = row[2], row[3]
+
+            index = None
+            for attempt in range(2):
+                while cursor < corpus_size:
+                    candidate = shuffled_index(cursor, corpus_size, seed)
+                    cursor += 1
+                    if not solved or question_key(candidate) not in solved:
+                        index = candidate
+                        break
+                # 다 돌았는데 건너뛰기를 하는 경우만 새 순서로 한 번 더 (뽑고 안 푼 문제)
+                if index is not None or question_key is None or attempt:
+                    break
+                seed, cursor = random.getrandbits(63), 0
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                current = conn.execute(
+                    "SELECT corpus_version, corpus_size, seed, cursor FROM progress "
+                    "WHERE user_id = ? AND question_type = ?", (user_id, question_type)
+                ).fetchone()
+                if current != row:
+                    # 계산하는 동안 다른 뽑기가 진행 상태를 바꿈 → 새 상태로 다시
+                    conn.rollback()
+                    continue
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO progress "
+                    "(user_id, question_type, corpus_version, corpus_size, seed, cursor, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (user_id, question_type, corpus_version, corpus_size, seed, cursor, time.time())
+                )
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+            return index, corpus_size - cursor
+
+    def reset_progress(self, user_id: str, question_type: Optional[str] = None):
+        """사용자의 출제 진행 상태를 처음으로 되돌립니다. (새 시드, 커서 0)"""
+        with self._connect() as conn:
+            if question_type is None:
+                conn.execute("UPDATE progress SET seed = ?, cursor = 0, updated_at = ? WHERE user_id = ?",
+                             (random.getrandbits(63), time.time(), user_id))
+            else:
+                conn.execute("UPDATE progress SET seed = ?, cursor = 0, updated_at = ? "
+                             "WHERE user_id = ? AND question_type = ?",
+                             (random.getrandbits(63), time.time(), user_id, question_type))
+
+    # ==================== 틀린 문제 ====================
+
+    def add_wrong(self, question: Dict, user_answer: str, correct_answer: str,
+                  timestamp: Optional[float] = None, user_id: str = DEFAULT_USER_ID) -> Dict:
+        """틀린 문제를 추가하고, 저장한 항목을 반환합니다."""
+        item = make_wrong_item(question, user_answer, correct_answer, timestamp, user_id)
+        self.add_wrong_batch([item])
+        return item
+
+    def add_wrong_batch(self, items: List[Dict]):
+        """make_wrong_item 항목 여러 개를 한 트랜잭션으로 추가"""
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO wrong_answers (user_id, question, user_answer, correct_answer, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(item.get("user_id", DEFAULT_USER_ID), json.dumps(item["question"], ensure_ascii=False),
+                  item["user_answer"], item["correct_answer"], item["timestamp"])
+                 for item in items]
+            )
+
+    def recent_wrong(self, user_id: str, limit: int = 5) -> List[Dict]:
+        """사용자의 최근 틀린 문제 (오래된 것부터, 예전 wrong_questions.json[-limit:]과 같은 순서)"""
+        rows = self._connect().execute(
+            "SELECT question, user_answer, correct_answer, created_at FROM wrong_answers "
+            "WHERE user_id = ? ORDER BY created_at DESC, id DESC LIMIT ?", (user_id, limit)
+        ).fetchall()
+        return [
+            make_wrong_item(json.loads(question), user_answer, correct_answer, created_at, user_id)
+            for question, user_answer, correct_answer, created_at in reversed(rows)
+        ]
+
+    def count_wrong(self, user_id: str) -> int:
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM wrong_answers WHERE user_id = ?", (user_id,)
+        ).fetchone()[0]
+
+    # ==================== JSON 파일 이전 ====================
+
+    def migrate_json(self, solved_file: str = SOLVED_JSON, wrong_file: str = WRONG_JSON):
+        """예전 JSON 파일의 기록을 한 번만 옮기고, 원본은 .migrated로 이름을 바꿉니다."""
+        with self._connect() as conn:
+            done = conn.execute("SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+        if done:
+            return
+
+        solved_count = wrong_count = 0
+
+        with self._connect() as conn:
+            if os.path.exists(solved_file):
+                with open(solved_file, 'r', encoding='utf-8') as f:
+                    solved_data = json.load(f)
+                now = time.time()
+                for question_type, question_numbers in solved_data.items():
+                    to_keys = legacy_key_mapper(question_type, self.corpus_file)
+                    self._insert_solved(conn, [(DEFAULT_USER_ID, question_type, key, now)
+                                               for number in question_numbers for key in to_keys(number)])
+                    solved_count += len(question_numbers)
+
+            if os.path.exists(wrong_file):
+                with open(wrong_file, 'r', encoding='utf-8') as f:
+                    wrong_questions = json.load(f)
+                conn.executemany(
+                    "INSERT INTO wrong_answers (question, user_answer, correct_answer, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(json.dumps(item.get("question", {}), ensure_ascii=False),
+                      item.get("user_answer", ""), item.get("correct_answer", ""),
+                      item.get("timestamp", 0.0))
+                     for item in wrong_questions]
+                )
+                wrong_count = len(wrong_questions)
+
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)",
+                         (str(time.time()),))
+
+        # 커밋이 끝난 뒤에만 원본 이름 변경
+        for path in (solved_file, wrong_file):
+            if os.path.exists(path):
+                os.replace(path, path + ".migrated")
+
+        if solved_count or wrong_count:
+            print(f"📦 JSON 기록 이전 완료: 푼 문제 {solved_count}개, 틀린 문제 {wrong_count}개 → {self.db_path}")
+
+
+_stores: Dict[str, QuizStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_quiz_store(db_path: str = DB_FILE) -> QuizStore:
+    """DB 경로별 QuizStore를 프로세스 전체에서 하나씩만 만들어 돌려줍니다."""
+    key = os.path.abspath(db_path)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = QuizStore(key)
+                _stores[key] = store
+    return store
@@ -1,59 +1,151 @@
 """
 벡터 DB 관련 노드
-- Pinecone (우선) 또는 ChromaDB에 임베딩하여 저장
+- Pinecone, ChromaDB 또는 NumPy 파일(numpy_store)에 임베딩하여 저장
 - 틀린 문제를 별도 컬렉션에 저장
+
+백엔드 선택: 환경 변수 VECTOR_BACKEND (pinecone / chroma / numpy)
+    지정하지 않으면 PINECONE_API_KEY가 있으면 pinecone, 없으면 chroma
+    numpy 백엔드의 저장 정밀도는 VECTOR_DTYPE (float32 / float16, 기본 float32)
 """
 
+import hashlib
 import json
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
-from langchain_openai import OpenAIEmbeddings
 from dotenv import load_dotenv
 
+from corpus import question_content_id, question_key
+from keyword_index import filter_values, get_keyword_index, reciprocal_rank_fusion
+
+from .bulk_loader import BulkLoader
+from .clients import get_clients
+from .embedding_cache import CachedEmbeddings
+from .neighbor_graph import get_neighbor_graph, sync_neighbor_graph
+from .question_hydrator import get_question_hydrator
+from .write_behind import get_write_behind
+
 # .env 파일 로드
 load_dotenv()
 
-# Pinecone 사용 가능 여부 확인
-USE_PINECONE = bool(os.getenv("PINECONE_API_KEY"))
+# 벡터 DB 백엔드 선택
+VECTOR_BACKENDS = ("pinecone", "chroma", "numpy")
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "").strip().lower() or (
+    "pinecone" if os.getenv("PINECONE_API_KEY") else "chroma"
+)
+if VECTOR_BACKEND not in VECTOR_BACKENDS:
+    raise ValueError(f"알 수 없는 VECTOR_BACKEND: {VECTOR_BACKEND} (사용 가능: {', '.join(VECTOR_BACKENDS)})")
 
-if USE_PINECONE:
+if VECTOR_BACKEND == "pinecone":
     try:
-        from pinecone import Pinecone, ServerlessSpec
+        from pinecone import ServerlessSpec
         print("✓ Pinecone 클라우드 벡터 DB 사용")
     except ImportError:
         print("⚠️ Pinecone 패키지 없음. ChromaDB 사용")
-        USE_PINECONE = False
+        VECTOR_BACKEND = "chroma"
 
-if not USE_PINECONE:
-    import chromadb
-    from chromadb.config import Settings
+if VECTOR_BACKEND == "chroma":
+    import chromadb  # 클라이언트는 nodes.clients에서 생성
     print("✓ ChromaDB 로컬 벡터 DB 사용")
 
+if VECTOR_BACKEND == "numpy":
+    from .numpy_store import NumpyVectorStore
+    print("✓ NumPy 로컬 벡터 파일 사용")
+
+# 예전 코드 호환용
+USE_PINECONE = VECTOR_BACKEND == "pinecone"
+
+BACKEND_NAMES = {"pinecone": "Pinecone", "chroma": "ChromaDB", "numpy": "NumPy"}
+
+# search_similar_many에서 원격 백엔드(Pinecone)에 동시에 보내는 쿼리 수
+SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "8"))
+
+# 검색 방식: vector(임베딩), keyword(로컬 BM25, 네트워크 없음), hybrid(두 순위를 RRF로 합침)
+SEARCH_MODES = ("vector", "keyword", "hybrid")
+HYBRID_CANDIDATES = 20   # hybrid에서 각 방식으로 가져오는 후보 수 (top_k가 더 크면 top_k)
+
+# 동기화 때 미리 계산해 두는 문제별 이웃 수 (similar_to는 검색 없이 이 안에서 조회)
+NEIGHBOR_K = int(os.getenv("NEIGHBOR_K", "10"))
+
+# 검색 필터 language 값: 프롬프트 언어 이름 → 코퍼스 language 값 (split_by_type.detect_language)
+LANGUAGE_ALIASES = {"C": "C/C++", "C++": "C/C++"}
+
+
+def make_filters(source=None, language=None, has_code: Optional[bool] = None) -> Dict[str, list]:
+    """검색 필터 {메타데이터 필드: 허용 값 목록}. source/language는 문자열 또는 목록."""
+    filters = {}
+    if source is not None:
+        filters["source"] = [source] if isinstance(source, str) else list(source)
+    if language is not None:
+        languages = [language] if isinstance(language, str) else list(language)
+        filters["language"] = list(dict.fromkeys(LANGUAGE_ALIASES.get(name, name) for name in languages))
+    if has_code is not None:
+        filters["has_code"] = [bool(has_code)]
+    return filters
+
+
+def _field_condition(values: list) -> Dict:
+    """필드 하나의 조건 ($in은 문자열/숫자만 받으므로 bool 값은 $eq)"""
+    if len(values) == 1 and isinstance(values[0], bool):
+        return {"$eq": values[0]}
+    return {"$in": values}
+
+
+def _pinecone_filter(filters: Dict[str, list]) -> Dict:
+    """Pinecone 메타데이터 필터 (필드끼리는 AND)"""
+    return {field: _field_condition(values) for field, values in filters.items()}
+
+
+def _chroma_where(filters: Dict[str, list]) -> Dict:
+    """ChromaDB where 조건 (조건이 둘 이상이면 $and)"""
+    conditions = [{field: _field_condition(values)} for field, values in filters.items()]
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+# 문제 벡터 메타데이터 형식
+# - slim: 필터용 필드만 저장하고 문제 본문은 검색 후 로컬 코퍼스에서 ID로 찾아옴 (기본)
+# - full: 예전처럼 문제 전체(full_question)와 텍스트까지 저장
+VECTOR_METADATA_MODES = ("slim", "full")
+VECTOR_METADATA = os.getenv("VECTOR_METADATA", "slim").strip().lower()
+if VECTOR_METADATA not in VECTOR_METADATA_MODES:
+    raise ValueError(f"알 수 없는 VECTOR_METADATA: {VECTOR_METADATA} (사용 가능: {', '.join(VECTOR_METADATA_MODES)})")
+
+# 메타데이터 필드 구성이 바뀌면 올림 → 다음 동기화 때 이미 있는 벡터의 메타데이터도 다시 업로드
+# (벡터 ID는 임베딩되는 내용의 해시라 ID 비교만으로는 메타데이터가 낡았는지 알 수 없어서,
+#  동기화마다 {벡터 ID: 메타데이터 해시}를 {컬렉션}.sync.json에 남겨 두고 비교)
+#   2: 필터 필드(source, language, has_code) 추가
+METADATA_SCHEMA_VERSION = 2
+
 
 class QuestionVectorDB:
-    """문제 벡터 DB 관리 클래스 (Pinecone 또는 ChromaDB)"""
+    """문제 벡터 DB 관리 클래스 (Pinecone, ChromaDB 또는 NumPy)"""
 
     def __init__(self, persist_directory: str = "vector_store"):
         self.persist_directory = persist_directory
-        self.use_pinecone = USE_PINECONE
-        self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small"
-        )
+        self.backend = VECTOR_BACKEND
+        self.use_pinecone = self.backend == "pinecone"
+        self.embedding_model = "text-embedding-3-small"
         self.dimension = 1536  # text-embedding-3-small 차원
+        self.metadata_mode = VECTOR_METADATA
+        # 클라이언트는 프로세스 전체에서 공유 (연결 풀 재사용)
+        self.clients = get_clients()
+        # 같은 텍스트는 디스크 캐시에서 (바뀐 텍스트만 API 호출)
+        self.embeddings = CachedEmbeddings(
+            self.clients.embeddings(self.embedding_model),
+            model=self.embedding_model,
+            dimension=self.dimension
+        )
 
-        if self.use_pinecone:
-            # Pinecone 클라이언트 초기화
-            self.pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+        if self.backend == "pinecone":
+            self.pc = self.clients.pinecone()
+        elif self.backend == "numpy":
+            # 컬렉션 이름 → NumpyVectorStore (필요할 때 생성)
+            self.vector_dtype = os.getenv("VECTOR_DTYPE", "float32")
+            self.numpy_stores = {}
         else:
-            # ChromaDB 클라이언트 초기화
-            self.client = chromadb.PersistentClient(
-                path=persist_directory,
-                settings=Settings(
-                    anonymized_telemetry=False,
-                    allow_reset=True
-                )
-            )
+            self.client = self.clients.chroma(persist_directory)
 
     def _create_question_text(self, question: Dict) -> str:
         """문제를 텍스트로 변환"""
@@ -72,19 +164,150 @@ class QuestionVectorDB:
         """인덱스/컬렉션 이름 생성"""
         return f"gisa-{question_type}-questions"
 
-    # ==================== Pinecone 메서드 ====================
+    @staticmethod
+    def _vector_id(question: Dict) -> str:
+        """임베딩되는 문제 내용으로 정하는 벡터 ID (순서가 바뀌어도 같고, 내용이 바뀌면 달라짐)"""
+        return "q_" + question_content_id(question)
+
+    def _metadata_fingerprint(self, question: Dict) -> str:
+        """저장할 메타데이터의 해시 (스키마 버전 포함, 바뀌면 다시 업로드)"""
+        metadata = {"schema": METADATA_SCHEMA_VERSION, **self._question_metadata(question)}
+        content = json.dumps(metadata, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+    def _diff_questions(self, questions: List[Dict], existing_ids: set,
+                        synced: Optional[Dict[str, str]] = None):
+        """문제 목록과 저장된 ID를 비교
+
+        synced: 지난 동기화 때 올린 {벡터 ID: 메타데이터 해시}. None이면 기록이 없으므로
+            이미 있는 벡터도 모두 메타데이터가 낡은 것으로 봅니다.
+        반환: (새로 넣을 (ID, 문제) 목록, 메타데이터만 다시 올릴 (ID, 문제) 목록,
+               지울 ID 집합, 그대로 둘 ID 집합, 이번 동기화 후의 {ID: 메타데이터 해시})
+        """
+        wanted = {}
+        for question in questions:
+            wanted.setdefault(self._vector_id(question), question)
+
+        fingerprints = {vector_id: self._metadata_fingerprint(question)
+                        for vector_id, question in wanted.items()}
+        synced = synced or {}
+
+        new_questions, updated_questions, kept_ids = [], [], set()
+        for vector_id, question in wanted.items():
+            if vector_id not in existing_ids:
+                new_questions.append((vector_id, question))
+            elif synced.get(vector_id) != fingerprints[vector_id]:
+                updated_questions.append((vector_id, question))
+            else:
+                kept_ids.add(vector_id)
+        removed_ids = existing_ids - wanted.keys()
+        return new_questions, updated_questions, removed_ids, kept_ids, fingerprints
+
+    def _sync_state_path(self, collection_name: str) -> str:
+        return os.path.join(self.persist_directory, f"{collection_name}.sync.json")
+
+    def _load_sync_state(self, collection_name: str) -> Optional[Dict[str, str]]:
+        path = self._sync_state_path(collection_name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get("metadata")
+
+    def _save_sync_state(self, collection_name: str, fingerprints: Dict[str, str]):
+        """동기화가 끝난 뒤에만 기록 (중간에 끊기면 다음 동기화가 다시 비교)"""
+        os.makedirs(self.persist_directory, exist_ok=True)
+        path = self._sync_state_path(collection_name)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({"metadata": fingerprints}, f)
+        os.replace(path + ".tmp", path)
+
+    def _checkpoint_path(self, collection_name: str) -> str:
+        return os.path.join(self.persist_directory, f"{collection_name}.checkpoint")
+
+    def _clear_checkpoint(self, collection_name: str):
+        """컬렉션을 지우고 다시 만들 때 호출 (예전 체크포인트의 ID는 새 컬렉션에 없음)"""
+        path = self._checkpoint_path(collection_name)
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"🧹 체크포인트 삭제: {path}")
+
+    @staticmethod
+    def _plan_id(fingerprints: Dict[str, str]) -> str:
+        """동기화 계획 ID = 이번 동기화 후의 {벡터 ID: 메타데이터 해시} 해시
+
+        중간에 끊긴 뒤 다시 실행해도 코퍼스가 같으면 같은 값이라 체크포인트를 이어서 쓰고,
+        코퍼스가 바뀌었으면 예전 체크포인트를 버립니다.
+        """
+        content = json.dumps(sorted(fingerprints.items()))
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+    def _plan_sync(self, collection_name: str, question_type: str, questions: List[Dict], existing_ids: set):
+        """동기화할 (업로드할 목록, 지울 ID 집합, 메타데이터 해시)를 정하고 요약을 출력"""
+        new_questions, updated_questions, removed_ids, kept_ids, fingerprints = self._diff_questions(
+            questions, existing_ids, self._load_sync_state(collection_name)
+        )
+        print(f"\n{question_type} 문제 {len(questions)}개 동기화: "
+              f"추가 {len(new_questions)}개, 메타데이터 갱신 {len(updated_questions)}개, "
+              f"삭제 {len(removed_ids)}개, 유지 {len(kept_ids)}개")
+        if updated_questions:
+            print(f"🔁 메타데이터가 바뀐 벡터는 다시 업로드합니다. (임베딩은 캐시 사용)")
+        return new_questions + updated_questions, removed_ids, fingerprints
+
+    def _question_metadata(self, question: Dict) -> Dict:
+        """벡터와 함께 저장하는 문제 메타데이터"""
+        if self.metadata_mode == "slim":
+            # 필터용 필드 + 코퍼스가 바뀌었을 때 다시 찾을 문제 키 (None은 저장할 수 없어 빈 문자열)
+            return {
+                "key": question_key(question),
+                **filter_values(question),
+                "score": question.get('점수', 0)
+            }
 
-    def _initialize_pinecone_index(self, question_type: str, questions: List[Dict]):
-        """Pinecone 인덱스 초기화 (배치 임베딩)"""
-        index_name = self._get_index_name(question_type)
+        return {
+            "question_number": question.get('문제번호', 0),
+            **filter_values(question),
+            "score": question.get('점수', 0),
+            "answer": question.get('답', ''),
+            "full_question": json.dumps(question, ensure_ascii=False)
+        }
+
+    def _bulk_load(self, collection_name: str, new_questions: List[tuple], upsert,
+                   fingerprints: Dict[str, str], with_text: bool = False):
+        """새 문제를 청크로 나눠 동시에 임베딩/업로드 (중간에 끊기면 체크포인트에서 이어서)"""
+        records = []
+        for vector_id, question in new_questions:
+            question_text = self._create_question_text(question)
+            metadata = self._question_metadata(question)
+            if with_text and self.metadata_mode == "full":
+                metadata["text"] = question_text
+            records.append((vector_id, question_text, metadata))
+
+        print(f"📊 임베딩 생성 및 업로드 중... (OpenAI API 호출)")
+        loader = BulkLoader(
+            self.embeddings.embed_documents,
+            upsert,
+            dimension=self.dimension,
+            checkpoint_file=self._checkpoint_path(collection_name),
+            plan_id=self._plan_id(fingerprints)
+        )
+        stats = loader.load(records)
+        self.embeddings.print_stats()
+        return stats
 
-        # 기존 인덱스 삭제
-        if index_name in self.pc.list_indexes().names():
-            print(f"기존 Pinecone 인덱스 '{index_name}' 삭제")
-            self.pc.delete_index(index_name)
-            time.sleep(1)
+    # ==================== Pinecone 메서드 ====================
 
-        # 새 인덱스 생성
+    def _wait_pinecone_ready(self, index_name: str, timeout: float = 120.0):
+        """인덱스가 준비될 때까지 describe_index를 점점 긴 간격으로 확인"""
+        start = time.monotonic()
+        delay = 0.5
+        while not self.pc.describe_index(index_name).status['ready']:
+            if time.monotonic() - start > timeout:
+                raise TimeoutError(f"Pinecone 인덱스 '{index_name}'가 {timeout:.0f}초 안에 준비되지 않았습니다.")
+            time.sleep(delay)
+            delay = min(delay * 2, 5.0)
+
+    def _create_pinecone_index(self, index_name: str):
+        """Pinecone 인덱스 생성 후 준비될 때까지 대기"""
         print(f"Pinecone 인덱스 '{index_name}' 생성 중...")
         self.pc.create_index(
             name=index_name,
@@ -95,46 +318,52 @@ class QuestionVectorDB:
                 region="us-east-1"
             )
         )
+        self._wait_pinecone_ready(index_name)
+
+    def _sync_pinecone_index(self, question_type: str, questions: List[Dict], rebuild: bool = False):
+        """Pinecone 인덱스를 문제 목록과 맞춤 (새/바뀐 문제만 업로드, 없어진 문제는 삭제)"""
+        index_name = self._get_index_name(question_type)
+        exists = index_name in self.pc.list_indexes().names()
+
+        # 전체 재생성 (rebuild=True일 때만)
+        if exists and rebuild:
+            print(f"기존 Pinecone 인덱스 '{index_name}' 삭제")
+            self.pc.delete_index(index_name)
+            self.clients.forget_pinecone_index(index_name)
+            exists = False
 
-        # 인덱스 준비 대기
-        print(f"인덱스 준비 중...")
-        time.sleep(5)
-        index = self.pc.Index(index_name)
+        if rebuild or not exists:
+            self._clear_checkpoint(index_name)
 
-        # 문제들 임베딩하여 저장
-        print(f"\n{question_type} 문제 {len(questions)}개를 Pinecone에 저장 중...")
-        print(f"📊 배치 임베딩 생성 중... (OpenAI API 호출)")
+        if not exists:
+            self._create_pinecone_index(index_name)
 
-        # 모든 문제 텍스트 생성 (배치)
-        question_texts = [self._create_question_text(q) for q in questions]
+        index = self.clients.pinecone_index(index_name)
 
-        # 배치 임베딩 생성 (한 번의 API 호출!)
-        embeddings = self.embeddings.embed_documents(question_texts)
-        print(f"✅ 임베딩 생성 완료!")
+        # 인덱스에 이미 있는 ID와 비교
+        existing_ids = set()
+        for id_page in index.list():
+            existing_ids.update(id_page)
 
-        # 벡터 준비
-        print(f"📤 Pinecone에 업로드 중...")
-        vectors = []
-        for i, (question, embedding) in enumerate(zip(questions, embeddings)):
-            metadata = {
-                "question_number": question.get('문제번호', 0),
-                "source": question.get('출처', ''),
-                "has_code": bool(question.get('코드')),
-                "score": question.get('점수', 0),
-                "answer": question.get('답', ''),
-                "text": question_texts[i],
-                "full_question": json.dumps(question, ensure_ascii=False)
-            }
+        new_questions, removed_ids, fingerprints = self._plan_sync(index_name, question_type, questions, existing_ids)
+
+        if new_questions:
+            def upsert(ids, texts, embeddings, metadatas):
+                index.upsert(vectors=[
+                    {"id": vector_id, "values": embedding, "metadata": metadata}
+                    for vector_id, embedding, metadata in zip(ids, embeddings, metadatas)
+                ])
 
-            vectors.append({
-                "id": f"q_{i}",
-                "values": embedding,
-                "metadata": metadata
-            })
+            self._bulk_load(index_name, new_questions, upsert, fingerprints, with_text=True)
 
-        # 배치로 업로드
-        index.upsert(vectors=vectors)
-        print(f"✅ {len(questions)}개 문제 Pinecone 저장 완료!\n")
+        # 없어진 문제 삭제
+        removed_ids = sorted(removed_ids)
+        for start in range(0, len(removed_ids), 1000):
+            index.delete(ids=removed_ids[start:start + 1000])
+
+        self._save_sync_state(index_name, fingerprints)
+
+        print(f"✅ {len(questions)}개 문제 Pinecone 동기화 완료!\n")
 
     def _get_pinecone_index(self, question_type: str):
         """Pinecone 인덱스 가져오기"""
@@ -143,111 +372,103 @@ class QuestionVectorDB:
         if index_name not in self.pc.list_indexes().names():
             raise ValueError(f"인덱스 '{index_name}'가 존재하지 않습니다.")
 
-        return self.pc.Index(index_name)
+        return self.clients.pinecone_index(index_name)
 
-    def _search_pinecone(self, index, query_text: str, top_k: int = 3) -> List[Dict]:
-        """Pinecone에서 유사 문제 검색"""
-        # 쿼리 임베딩
+    def _search_pinecone(self, index, query_text: str, top_k: int = 3,
+                         filters: Optional[Dict] = None) -> List[tuple]:
+        """Pinecone에서 유사 문제 검색 → [(벡터 ID, 메타데이터)]"""
         query_embedding = self.embeddings.embed_query(query_text)
+        return self._query_pinecone(index, [query_embedding], top_k, filters)[0]
+
+    def _query_pinecone(self, index, query_embeddings: List[List[float]], top_k: int = 3,
+                        filters: Optional[Dict] = None) -> List[List[tuple]]:
+        """쿼리 벡터마다 검색 (여러 개면 동시에 보냄), 입력 순서대로 반환"""
+        options = {"filter": _pinecone_filter(filters)} if filters else {}
+
+        def query(query_embedding):
+            results = index.query(
+                vector=query_embedding,
+                top_k=top_k,
+                include_metadata=True,
+                **options
+            )
+            return [(match['id'], match['metadata']) for match in results['matches']]
 
-        # 검색
-        results = index.query(
-            vector=query_embedding,
-            top_k=top_k,
-            include_metadata=True
-        )
-
-        # 결과 변환
-        questions = []
-        for match in results['matches']:
-            full_question = json.loads(match['metadata']['full_question'])
-            questions.append(full_question)
+        if len(query_embeddings) == 1:
+            return [query(query_embeddings[0])]
 
-        return questions
+        with ThreadPoolExecutor(max_workers=min(SEARCH_CONCURRENCY, len(query_embeddings))) as executor:
+            return list(executor.map(query, query_embeddings))
 
-    def _save_to_pinecone_wrong(self, question: Dict, user_answer: str):
-        """Pinecone에 틀린 문제 저장"""
+    def _save_to_pinecone_wrong(self, items: List[tuple]):
+        """Pinecone에 틀린 문제 저장 (여러 개를 한 번의 임베딩 호출/업로드로)"""
         index_name = "gisa-wrong-questions"
 
         # 인덱스 없으면 생성
         if index_name not in self.pc.list_indexes().names():
-            self.pc.create_index(
-                name=index_name,
-                dimension=self.dimension,
-                metric="cosine",
-                spec=ServerlessSpec(cloud="aws", region="us-east-1")
-            )
-            time.sleep(5)
+            self._create_pinecone_index(index_name)
 
-        index = self.pc.Index(index_name)
+        index = self.clients.pinecone_index(index_name)
 
-        # 문제 텍스트 생성
-        question_text = self._create_question_text(question)
-        embedding = self.embeddings.embed_query(question_text)
+        # 문제 텍스트 생성 + 배치 임베딩
+        question_texts = [self._create_question_text(question) for question, _ in items]
+        embeddings = self.embeddings.embed_documents(question_texts)
 
         # 저장
-        doc_id = f"wrong_{int(time.time() * 1000)}"
+        now = time.time()
+        id_prefix = f"wrong_{int(now * 1000)}"
         index.upsert(vectors=[{
-            "id": doc_id,
+            "id": f"{id_prefix}_{i}",
             "values": embedding,
             "metadata": {
                 "question_number": question.get('문제번호', 0),
                 "user_answer": user_answer,
                 "correct_answer": question.get('답', ''),
-                "timestamp": time.time(),
+                "timestamp": now,
                 "text": question_text,
                 "full_question": json.dumps(question, ensure_ascii=False)
             }
-        }])
+        } for i, ((question, user_answer), question_text, embedding)
+            in enumerate(zip(items, question_texts, embeddings))])
 
-        print(f"❌ 틀린 문제가 Pinecone 복습 DB에 저장되었습니다.")
+        print(f"❌ 틀린 문제 {len(items)}개가 Pinecone 복습 DB에 저장되었습니다.")
 
     # ==================== ChromaDB 메서드 ====================
 
-    def _initialize_chroma_collection(self, question_type: str, questions: List[Dict]):
-        """ChromaDB 컬렉션 초기화 (배치 임베딩)"""
+    def _sync_chroma_collection(self, question_type: str, questions: List[Dict], rebuild: bool = False):
+        """ChromaDB 컬렉션을 문제 목록과 맞춤 (새/바뀐 문제만 추가, 없어진 문제는 삭제)"""
         collection_name = f"{question_type}_questions"
 
-        # 기존 컬렉션 삭제 후 재생성
-        try:
-            self.client.delete_collection(collection_name)
-            print(f"기존 {collection_name} 컬렉션 삭제")
-        except:
-            pass
+        # 전체 재생성 (rebuild=True일 때만)
+        if rebuild:
+            try:
+                self.client.delete_collection(collection_name)
+                print(f"기존 {collection_name} 컬렉션 삭제")
+            except:
+                pass
+            self._clear_checkpoint(collection_name)
 
-        # 컬렉션 생성
-        collection = self.client.create_collection(
+        collection = self.client.get_or_create_collection(
             name=collection_name,
             metadata={"hnsw:space": "cosine"}
         )
 
-        print(f"\n{question_type} 문제 {len(questions)}개를 ChromaDB에 저장 중...")
-        print(f"📊 배치 임베딩 생성 중... (OpenAI API 호출)")
+        # 컬렉션에 이미 있는 ID와 비교
+        existing_ids = set(collection.get(include=[])['ids'])
+        new_questions, removed_ids, fingerprints = self._plan_sync(collection_name, question_type, questions, existing_ids)
 
-        # 모든 문제 텍스트 생성 (배치)
-        question_texts = [self._create_question_text(q) for q in questions]
+        if new_questions:
+            def upsert(ids, texts, embeddings, metadatas):
+                collection.upsert(ids=ids, embeddings=embeddings, documents=texts, metadatas=metadatas)
 
-        # 배치 임베딩 생성 (한 번의 API 호출!)
-        embeddings = self.embeddings.embed_documents(question_texts)
-        print(f"✅ 임베딩 생성 완료!")
+            self._bulk_load(collection_name, new_questions, upsert, fingerprints)
 
-        # ChromaDB에 배치로 저장
-        print(f"💾 ChromaDB에 저장 중...")
-        collection.add(
-            ids=[f"q_{i}" for i in range(len(questions))],
-            embeddings=embeddings,
-            documents=question_texts,
-            metadatas=[{
-                "question_number": q.get('문제번호', 0),
-                "source": q.get('출처', ''),
-                "has_code": bool(q.get('코드')),
-                "score": q.get('점수', 0),
-                "answer": q.get('답', ''),
-                "full_question": json.dumps(q, ensure_ascii=False)
-            } for q in questions]
-        )
+        if removed_ids:
+            collection.delete(ids=sorted(removed_ids))
+
+        self._save_sync_state(collection_name, fingerprints)
 
-        print(f"✅ {len(questions)}개 문제 ChromaDB 저장 완료!\n")
+        print(f"✅ {len(questions)}개 문제 ChromaDB 동기화 완료!\n")
         return collection
 
     def _get_chroma_collection(self, question_type: str):
@@ -255,29 +476,29 @@ class QuestionVectorDB:
         collection_name = f"{question_type}_questions"
         return self.client.get_collection(collection_name)
 
-    def _search_chroma(self, collection, query_text: str, top_k: int = 3) -> List[Dict]:
-        """ChromaDB에서 유사 문제 검색"""
-        # 쿼리 임베딩
+    def _search_chroma(self, collection, query_text: str, top_k: int = 3,
+                       filters: Optional[Dict] = None) -> List[tuple]:
+        """ChromaDB에서 유사 문제 검색 → [(벡터 ID, 메타데이터)]"""
         query_embedding = self.embeddings.embed_query(query_text)
+        return self._query_chroma(collection, [query_embedding], top_k, filters)[0]
 
-        # 검색
+    def _query_chroma(self, collection, query_embeddings: List[List[float]], top_k: int = 3,
+                      filters: Optional[Dict] = None) -> List[List[tuple]]:
+        """여러 쿼리 벡터를 한 번의 query 호출로 검색, 입력 순서대로 반환"""
+        options = {"where": _chroma_where(filters)} if filters else {}
         results = collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=query_embeddings,
             n_results=top_k,
-            include=["metadatas"]
+            include=["metadatas"],
+            **options
         )
 
-        # 결과 변환
-        questions = []
-        if results['metadatas']:
-            for metadata in results['metadatas'][0]:
-                full_question = json.loads(metadata['full_question'])
-                questions.append(full_question)
+        if not results['ids']:
+            return [[] for _ in query_embeddings]
+        return [list(zip(ids, metadatas)) for ids, metadatas in zip(results['ids'], results['metadatas'])]
 
-        return questions
-
-    def _save_to_chroma_wrong(self, question: Dict, user_answer: str):
-        """ChromaDB에 틀린 문제 저장"""
+    def _save_to_chroma_wrong(self, items: List[tuple]):
+        """ChromaDB에 틀린 문제 저장 (여러 개를 한 번의 임베딩 호출/저장으로)"""
         # wrong_questions 컬렉션 가져오기 또는 생성
         try:
             collection = self.client.get_collection("wrong_questions")
@@ -287,33 +508,107 @@ class QuestionVectorDB:
                 metadata={"hnsw:space": "cosine"}
             )
 
-        # 문제 텍스트 생성
-        question_text = self._create_question_text(question)
-        embedding = self.embeddings.embed_query(question_text)
+        # 문제 텍스트 생성 + 배치 임베딩
+        question_texts = [self._create_question_text(question) for question, _ in items]
+        embeddings = self.embeddings.embed_documents(question_texts)
 
         # 고유 ID 생성
-        doc_id = f"wrong_{int(time.time() * 1000)}"
+        now = time.time()
+        id_prefix = f"wrong_{int(now * 1000)}"
 
         # ChromaDB에 저장
         collection.add(
-            ids=[doc_id],
-            embeddings=[embedding],
-            documents=[question_text],
+            ids=[f"{id_prefix}_{i}" for i in range(len(items))],
+            embeddings=embeddings,
+            documents=question_texts,
+            metadatas=[{
+                "question_number": question.get('문제번호', 0),
+                "user_answer": user_answer,
+                "correct_answer": question.get('답', ''),
+                "timestamp": now,
+                "full_question": json.dumps(question, ensure_ascii=False)
+            } for question, user_answer in items]
+        )
+
+        print(f"❌ 틀린 문제 {len(items)}개가 ChromaDB 복습 DB에 저장되었습니다.")
+
+    # ==================== NumPy 메서드 ====================
+
+    def _get_numpy_store(self, collection_name: str):
+        """NumPy 컬렉션 가져오기"""
+        store = self.numpy_stores.get(collection_name)
+        if store is None:
+            # 여러 스레드가 동시에 만들어도 먼저 들어간 것 하나만 사용
+            store = self.numpy_stores.setdefault(collection_name, NumpyVectorStore(
+                self.persist_directory, collection_name, self.dimension, self.vector_dtype
+            ))
+        return store
+
+    def _sync_numpy_collection(self, question_type: str, questions: List[Dict], rebuild: bool = False):
+        """NumPy 컬렉션을 문제 목록과 맞춤 (새/바뀐 문제만 추가, 없어진 문제는 삭제)"""
+        store = self._get_numpy_store(f"{question_type}_questions")
+        if rebuild:
+            store.drop()
+            self._clear_checkpoint(store.name)
+
+        new_questions, removed_ids, fingerprints = self._plan_sync(store.name, question_type, questions, set(store.ids()))
+
+        if removed_ids:
+            store.delete(removed_ids)
+
+        if new_questions:
+            def upsert(ids, texts, embeddings, metadatas):
+                store.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas)
+
+            self._bulk_load(store.name, new_questions, upsert, fingerprints)
+
+        self._save_sync_state(store.name, fingerprints)
+        print(f"✅ {len(questions)}개 문제 NumPy 동기화 완료!\n")
+        return store
+
+    def _search_numpy(self, store, query_text: str, top_k: int = 3,
+                      filters: Optional[Dict] = None) -> List[tuple]:
+        """NumPy 컬렉션에서 유사 문제 검색 → [(벡터 ID, 메타데이터)]"""
+        query_embedding = self.embeddings.embed_query(query_text)
+        return self._query_numpy(store, [query_embedding], top_k, filters)[0]
+
+    def _query_numpy(self, store, query_embeddings: List[List[float]], top_k: int = 3,
+                     filters: Optional[Dict] = None) -> List[List[tuple]]:
+        """여러 쿼리 벡터를 행렬 곱 한 번으로 검색 (필터는 게시 목록으로 먼저 행 선택), 입력 순서대로 반환"""
+        return [[(match['id'], match['metadata']) for match in matches]
+                for matches in store.query(query_embeddings, top_k, filters)]
+
+    def _save_to_numpy_wrong(self, items: List[tuple]):
+        """NumPy 컬렉션에 틀린 문제 저장"""
+        store = self._get_numpy_store("wrong_questions")
+
+        question_texts = [self._create_question_text(question) for question, _ in items]
+        embeddings = self.embeddings.embed_documents(question_texts)
+
+        now = time.time()
+        id_prefix = f"wrong_{int(now * 1000)}"
+        store.upsert(
+            ids=[f"{id_prefix}_{i}" for i in range(len(items))],
+            embeddings=embeddings,
             metadatas=[{
                 "question_number": question.get('문제번호', 0),
                 "user_answer": user_answer,
                 "correct_answer": question.get('답', ''),
-                "timestamp": time.time(),
+                "timestamp": now,
                 "full_question": json.dumps(question, ensure_ascii=False)
-            }]
+            } for question, user_answer in items]
         )
 
-        print(f"❌ 틀린 문제가 ChromaDB 복습 DB에 저장되었습니다.")
+        print(f"❌ 틀린 문제 {len(items)}개가 NumPy 복습 DB에 저장되었습니다.")
 
     # ==================== 공통 인터페이스 ====================
 
-    def initialize_questions(self, question_type: str = "code"):
-        """문제들을 벡터 DB에 저장 (Pinecone 또는 ChromaDB)"""
+    def initialize_questions(self, question_type: str = "code", rebuild: bool = False):
+        """문제들을 벡터 DB와 동기화 (Pinecone 또는 ChromaDB)
+
+        기본은 바뀐 부분만 반영하고, rebuild=True이면 인덱스/컬렉션을 지우고 새로 만듭니다.
+        문제별 이웃 그래프({question_type}_questions.neighbors.npz)도 함께 갱신합니다.
+        """
         # JSON 파일 로드
         json_file = f"{question_type}_questions.json"
         if not os.path.exists(json_file):
@@ -322,45 +617,205 @@ class QuestionVectorDB:
         with open(json_file, 'r', encoding='utf-8') as f:
             questions = json.load(f)
 
-        if self.use_pinecone:
-            self._initialize_pinecone_index(question_type, questions)
+        if self.backend == "pinecone":
+            self._sync_pinecone_index(question_type, questions, rebuild)
+        elif self.backend == "numpy":
+            self._sync_numpy_collection(question_type, questions, rebuild)
         else:
-            self._initialize_chroma_collection(question_type, questions)
+            self._sync_chroma_collection(question_type, questions, rebuild)
+
+        self._sync_neighbor_graph(json_file, questions, rebuild)
+
+    def _sync_neighbor_graph(self, json_file: str, questions: List[Dict], rebuild: bool = False):
+        """코퍼스 문제별 이웃 그래프 갱신 (임베딩은 방금 동기화에서 캐시된 것을 재사용)"""
+        unique = {}
+        for question in questions:
+            unique.setdefault(question_content_id(question), question)
+        texts = [self._create_question_text(question) for question in unique.values()]
+
+        def embed(rows):
+            return self.embeddings.embed_documents([texts[row] for row in rows])
+
+        sync_neighbor_graph(json_file, list(unique), embed, version=self.embedding_model,
+                            k=NEIGHBOR_K, rebuild=rebuild)
 
     def get_collection(self, question_type: str = "code"):
         """컬렉션/인덱스 가져오기"""
-        if self.use_pinecone:
+        if self.backend == "pinecone":
             return self._get_pinecone_index(question_type)
+        elif self.backend == "numpy":
+            return self._get_numpy_store(f"{question_type}_questions")
         else:
             return self._get_chroma_collection(question_type)
 
-    def search_similar(self, question_type: str, query_text: str, top_k: int = 3) -> List[Dict]:
-        """유사 문제 검색"""
-        if self.use_pinecone:
+    def search_similar(self, question_type: str, query_text: str, top_k: int = 3,
+                       mode: str = "vector", source=None, language=None,
+                       has_code: Optional[bool] = None) -> List[Dict]:
+        """유사 문제 검색 (문제 본문은 메타데이터 또는 로컬 코퍼스에서)
+
+        mode: "vector"(임베딩), "keyword"(로컬 BM25), "hybrid"(둘을 RRF로 합침)
+        source/language/has_code: 결과를 제한하는 필터 (source/language는 목록도 가능,
+            language는 "C", "Java", "Python"처럼 프롬프트 언어 이름도 받음).
+            Pinecone/ChromaDB는 메타데이터 필터로, 로컬 백엔드는 게시 목록으로 점수 계산 전에 거릅니다.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"알 수 없는 검색 방식: {mode} (사용 가능: {', '.join(SEARCH_MODES)})")
+        filters = make_filters(source, language, has_code)
+        if mode == "keyword":
+            return keyword_search(question_type, query_text, top_k, source, language, has_code)
+
+        depth = max(top_k, HYBRID_CANDIDATES) if mode == "hybrid" else top_k
+        if self.backend == "pinecone":
+            index = self._get_pinecone_index(question_type)
+            hits = self._search_pinecone(index, query_text, depth, filters)
+        elif self.backend == "numpy":
+            store = self._get_numpy_store(f"{question_type}_questions")
+            hits = self._search_numpy(store, query_text, depth, filters)
+        else:
+            collection = self._get_chroma_collection(question_type)
+            hits = self._search_chroma(collection, query_text, depth, filters)
+
+        if mode == "hybrid":
+            hits = _fuse_hits(hits, _keyword_hits(question_type, query_text, depth, filters), top_k)
+        return get_question_hydrator().hydrate(question_type, hits)
+
+    def search_similar_many(self, question_type: str, query_texts: List[str], top_k: int = 3,
+                            mode: str = "vector", source=None, language=None,
+                            has_code: Optional[bool] = None) -> List[List[Dict]]:
+        """여러 쿼리를 한꺼번에 검색 (모의고사 전체 few-shot, 생성 문제 일괄 중복 확인 등)
+
+        임베딩은 한 번의 배치 호출로 만들고, NumPy는 행렬 곱 한 번, ChromaDB는 query 한 번,
+        Pinecone은 동시 쿼리로 검색합니다. 결과는 query_texts 순서대로 반환합니다.
+        필터는 search_similar와 같고 모든 쿼리에 적용됩니다.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"알 수 없는 검색 방식: {mode} (사용 가능: {', '.join(SEARCH_MODES)})")
+        if not query_texts:
+            return []
+        filters = make_filters(source, language, has_code)
+        if mode == "keyword":
+            return [keyword_search(question_type, query_text, top_k, source, language, has_code)
+                    for query_text in query_texts]
+
+        depth = max(top_k, HYBRID_CANDIDATES) if mode == "hybrid" else top_k
+        query_embeddings = self.embeddings.embed_queries(list(query_texts))
+
+        if self.backend == "pinecone":
             index = self._get_pinecone_index(question_type)
-            return self._search_pinecone(index, query_text, top_k)
+            hit_lists = self._query_pinecone(index, query_embeddings, depth, filters)
+        elif self.backend == "numpy":
+            store = self._get_numpy_store(f"{question_type}_questions")
+            hit_lists = self._query_numpy(store, query_embeddings, depth, filters)
         else:
             collection = self._get_chroma_collection(question_type)
-            return self._search_chroma(collection, query_text, top_k)
+            hit_lists = self._query_chroma(collection, query_embeddings, depth, filters)
+
+        if mode == "hybrid":
+            hit_lists = [_fuse_hits(hits, _keyword_hits(question_type, query_text, depth, filters), top_k)
+                         for hits, query_text in zip(hit_lists, query_texts)]
+
+        hydrator = get_question_hydrator()
+        return [hydrator.hydrate(question_type, hits) for hits in hit_lists]
+
+    def similar_to(self, question_type: str, question, top_k: int = 3) -> List[Dict]:
+        """코퍼스 문제와 비슷한 문제 (자기 자신 제외, 유사도 높은 순)
+
+        question: 문제 dict 또는 코퍼스 내용 ID (corpus.question_content_id)
+        미리 계산한 이웃 그래프에서 조회하므로 임베딩/검색 호출이 없습니다.
+        그래프가 없거나 그래프에 없는 문제(dict)이면 벡터 검색으로 대신합니다.
+        """
+        content_id = question if isinstance(question, str) else question_content_id(question)
+        graph = get_neighbor_graph(f"{question_type}_questions.json")
+        if graph is not None and content_id in graph.rows:
+            hits = [("q_" + neighbor_id, {}) for neighbor_id in graph.neighbors_of(content_id, top_k)]
+            return get_question_hydrator().hydrate(question_type, hits)
+
+        if isinstance(question, str):
+            print(f"⚠️ 이웃 그래프에 없는 문제 ID: {question}")
+            return []
+        results = self.search_similar(question_type, self._create_question_text(question), top_k + 1)
+        return [result for result in results if question_content_id(result) != content_id][:top_k]
 
     def save_wrong_question(self, question: Dict, user_answer: str):
         """틀린 문제 저장"""
-        if self.use_pinecone:
-            self._save_to_pinecone_wrong(question, user_answer)
+        self.save_wrong_questions([(question, user_answer)])
+
+    def save_wrong_questions(self, items: List[tuple]):
+        """틀린 문제 여러 개 저장 ((문제, 사용자 답) 목록)"""
+        if not items:
+            return
+        if self.backend == "pinecone":
+            self._save_to_pinecone_wrong(items)
+        elif self.backend == "numpy":
+            self._save_to_numpy_wrong(items)
         else:
-            self._save_to_chroma_wrong(question, user_answer)
+            self._save_to_chroma_wrong(items)
 
     def get_collection_count(self, question_type: str) -> int:
         """컬렉션/인덱스의 문제 개수"""
-        if self.use_pinecone:
+        if self.backend == "pinecone":
             index = self._get_pinecone_index(question_type)
             stats = index.describe_index_stats()
             return stats.get('total_vector_count', 0)
+        elif self.backend == "numpy":
+            return self._get_numpy_store(f"{question_type}_questions").count()
         else:
             collection = self._get_chroma_collection(question_type)
             return collection.count()
 
 
+# ==================== 키워드 / 하이브리드 검색 ====================
+
+def _keyword_hits(question_type: str, query_text: str, top_k: int,
+                  filters: Optional[Dict] = None) -> List[tuple]:
+    """로컬 BM25 검색 → [(벡터 ID, 메타데이터)] (벡터 ID는 QuestionVectorDB._vector_id와 같은 규칙)"""
+    index = get_keyword_index(f"{question_type}_questions.json")
+    return [("q_" + content_id, {"key": key})
+            for content_id, key, _ in index.search(query_text, top_k, filters)]
+
+
+def _fuse_hits(vector_hits: List[tuple], keyword_hits: List[tuple], top_k: int) -> List[tuple]:
+    """두 검색 결과를 RRF로 합쳐 상위 top_k개 (메타데이터는 벡터 쪽 우선)"""
+    metadatas = dict(keyword_hits)
+    metadatas.update(vector_hits)
+    fused = reciprocal_rank_fusion([[vector_id for vector_id, _ in vector_hits],
+                                    [vector_id for vector_id, _ in keyword_hits]])
+    return [(vector_id, metadatas[vector_id]) for vector_id, _ in fused[:top_k]]
+
+
+def keyword_search(question_type: str, query_text: str, top_k: int = 3,
+                   source=None, language=None, has_code: Optional[bool] = None) -> List[Dict]:
+    """키워드만으로 유사 문제 검색 (임베딩/네트워크 없이 로컬 인덱스만 사용)"""
+    filters = make_filters(source, language, has_code)
+    hits = _keyword_hits(question_type, query_text, top_k, filters)
+    return get_question_hydrator().hydrate(question_type, hits)
+
+
+_db_instances: Dict[str, QuestionVectorDB] = {}
+_db_lock = threading.Lock()
+
+
+def get_vector_db(persist_directory: str = "vector_store") -> QuestionVectorDB:
+    """저장 경로별로 하나만 쓰는 QuestionVectorDB (노드/앱/쓰기 지연 큐가 공유)"""
+    key = os.path.abspath(persist_directory)
+    db = _db_instances.get(key)
+    if db is None:
+        with _db_lock:
+            db = _db_instances.get(key)
+            if db is None:
+                db = QuestionVectorDB(persist_directory)
+                _db_instances[key] = db
+    return db
+
+
+def _write_wrong_embeddings(items: List[tuple]):
+    """쓰기 지연 큐 처리 함수: 모인 틀린 문제를 한 번에 임베딩해서 저장"""
+    get_vector_db().save_wrong_questions(items)
+
+
+get_write_behind().register("wrong_embedding", _write_wrong_embeddings)
+
+
 # ==================== LangGraph 노드 함수들 ====================
 
 def initialize_vector_db(state: Dict) -> Dict:
@@ -372,7 +827,7 @@ def initialize_vector_db(state: Dict) -> Dict:
     print(f"벡터 DB 확인 중... (타입: {question_type})")
     print(f"{'='*60}")
 
-    db = QuestionVectorDB()
+    db = get_vector_db()
 
     # 컬렉션이 없거나 비어있으면 초기화
     try:
@@ -382,7 +837,7 @@ def initialize_vector_db(state: Dict) -> Dict:
             print(f"컬렉션이 비어있습니다. 새로 생성합니다...")
             db.initialize_questions(question_type)
         else:
-            db_type = "Pinecone" if db.use_pinecone else "ChromaDB"
+            db_type = BACKEND_NAMES[db.backend]
             print(f"✓ 기존 {question_type} 벡터 DB 로드 완료 ({count}개 문제, {db_type})")
     except Exception as e:
         print(f"컬렉션이 없습니다. 새로 생성합니다... ({e})")
@@ -403,11 +858,11 @@ def save_wrong_question(state: Dict) -> Dict:
     if not generated_question:
         return state
 
-    db = QuestionVectorDB()
-    db.save_wrong_question(generated_question, user_answer)
+    # 임베딩/업로드는 쓰기 지연 큐에서 (사용자는 기다리지 않음)
+    get_write_behind().submit("wrong_embedding", (generated_question, user_answer))
 
     # wrong_questions 리스트에 추가
-    wrong_questions = state.get("wrong_questions", [])
+    wrong_questions = list(state.get("wrong_questions", []))
     wrong_questions.append({
         "question": generated_question,
         "user_answer": user_answer,
@@ -418,3 +873,17 @@ def save_wrong_question(state: Dict) -> Dict:
         "wrong_questions": wrong_questions,
         "messages": [{"role": "system", "content": "틀린 문제가 복습 DB에 저장되었습니다."}]
     }
+
+
+if __name__ == "__main__":
+    # 문제 파일과 벡터 DB 동기화: python -m nodes.vector_db [--rebuild]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="문제 벡터 DB 동기화")
+    parser.add_argument("--types", nargs="+", default=["code", "theory"], help="동기화할 문제 유형")
+    parser.add_argument("--rebuild", action="store_true", help="인덱스/컬렉션을 지우고 새로 만들기")
+    args = parser.parse_args()
+
+    db = get_vector_db()
+    for question_type in args.types:
+        db.initialize_questions(question_type, rebuild=args.rebuild)
@@ -0,0 +1,171 @@
+"""
+쓰기 지연 큐 (write-behind)
+- 푼 문제/틀린 문제 기록, 틀린 문제 임베딩처럼 사용자가 결과를 보는 데 필요 없는
+  쓰기를 백그라운드 스레드로 넘김
+- 쌓인 작업은 종류별로 묶어 한 번에 처리 (SQLite는 한 트랜잭션, 임베딩은 한 번의 API 호출)
+- 프로세스 종료 시(atexit) 남은 작업을 모두 처리하고 끝냄
+- queue_depth(대기 중인 작업 수)와 처리 통계를 metrics()로 확인
+
+사용법:
+    queue = get_write_behind()
+    queue.register("solved", write_solved_batch)   # 묶음(list)을 받는 함수
+    queue.submit("solved", row)
+"""
+
+import atexit
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_MAX_DELAY = 0.2   # 첫 작업이 들어온 뒤 묶음을 모으며 기다리는 최대 시간(초)
+DEFAULT_RETRIES = 3
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """작업 종류별 묶음 처리 함수를 등록해 두고, 작업을 백그라운드에서 묶어서 처리하는 큐"""
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, max_delay: float = DEFAULT_MAX_DELAY,
+                 retries: int = DEFAULT_RETRIES):
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.retries = retries
+
+        self._queue = queue.Queue()
+        self._handlers: Dict[str, Callable[[List], None]] = {}
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+        self.stats = {
+            "submitted": 0,
+            "written": 0,
+            "batches": 0,
+            "errors": 0,
+            "dropped": 0,
+            "last_error": None
+        }
+
+    def register(self, kind: str, handler: Callable[[List], None]):
+        """작업 종류별 묶음 처리 함수 등록 (같은 종류를 다시 등록하면 교체)"""
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, payload):
+        """작업을 큐에 넣고 바로 돌아옵니다."""
+        if kind not in self._handlers:
+            raise ValueError(f"등록되지 않은 작업 종류: {kind}")
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("이미 종료된 쓰기 큐입니다.")
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._worker.start()
+            self.stats["submitted"] += 1
+
+        self._queue.put((kind, payload))
+
+    @property
+    def queue_depth(self) -> int:
+        """아직 처리되지 않은 작업 수 (처리 중인 묶음 포함)"""
+        return self._queue.unfinished_tasks
+
+    def metrics(self) -> Dict:
+        return {"queue_depth": self.queue_depth, **self.stats}
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """지금까지 넣은 작업이 모두 처리될 때까지 기다립니다. 다 끝났으면 True."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None):
+        """남은 작업을 모두 처리하고 백그라운드 스레드를 멈춥니다."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            worker = self._worker
+
+        if worker is None:
+            return
+
+        self._queue.put((_STOP, None))
+        worker.join(timeout)
+
+    # ==================== 백그라운드 스레드 ====================
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+
+            # 첫 작업 이후 max_delay 동안 또는 batch_size까지 모음 (group commit)
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.batch_size and batch[-1][0] is not _STOP:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0
+                                 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = batch[-1][0] is _STOP
+            items = batch[:-1] if stop else batch
+
+            try:
+                self._process(items)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if stop:
+                return
+
+    def _process(self, items):
+        # 종류별로 묶되, 종류 안에서는 넣은 순서 유지
+        groups: Dict[str, List] = {}
+        for kind, payload in items:
+            groups.setdefault(kind, []).append(payload)
+
+        for kind, payloads in groups.items():
+            handler = self._handlers[kind]
+
+            for attempt in range(1, self.retries + 1):
+                try:
+                    handler(payloads)
+                    self.stats["written"] += len(payloads)
+                    self.stats["batches"] += 1
+                    break
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    self.stats["last_error"] = f"{kind}: {e}"
+                    print(f"⚠️ 쓰기 지연 큐 {kind} 처리 실패 ({attempt}/{self.retries}): {e}")
+                    if attempt < self.retries:
+                        time.sleep(0.5 * 2 ** (attempt - 1))
+            else:
+                self.stats["dropped"] += len(payloads)
+                print(f"❌ 쓰기 지연 큐 {kind} 작업 {len(payloads)}개를 버립니다.")
+
+
+_queue_instance: Optional[WriteBehindQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_write_behind() -> WriteBehindQueue:
+    """프로세스 전체에서 하나만 쓰는 쓰기 지연 큐 (종료 시 자동으로 flush)"""
+    global _queue_instance
+    if _queue_instance is None:
+        with _queue_lock:
+            if _queue_instance is None:
+                _queue_instance = WriteBehindQueue()
+                atexit.register(_queue_instance.close)
+    return _queue_instance
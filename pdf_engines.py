@@ -0,0 +1,86 @@
+"""
+PDF 텍스트 추출 엔진
+- 엔진은 "PDF 경로를 받아 페이지 텍스트를 한 장씩 돌려주는 함수" 하나로 구현
+- pdfplumber(기본), pypdfium2(pdfplumber 설치 시 함께 설치됨), PyMuPDF(선택)
+- 새 엔진은 ENGINES에 함수를 등록하면 pdf_to_json / bench_extract에서 바로 사용 가능
+"""
+
+import importlib.util
+
+
+DEFAULT_ENGINE = "pdfplumber"
+
+
+def _normalize_newlines(text):
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def iter_pages_pdfplumber(file_path):
+    """pdfplumber: 레이아웃 분석이 가장 꼼꼼하지만 느림 (기본 엔진)"""
+    import pdfplumber
+
+    with pdfplumber.open(file_path) as pdf:
+        print(f"  총 페이지 수: {len(pdf.pages)}")
+
+        for page in pdf.pages:
+            text = page.extract_text()
+            # 읽은 페이지의 캐시는 바로 해제
+            page.close()
+            if text:
+                yield text
+
+
+def iter_pages_pypdfium2(file_path):
+    """pypdfium2: PDFium(C++) 기반이라 빠름"""
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        print(f"  총 페이지 수: {len(pdf)}")
+
+        for page_index in range(len(pdf)):
+            page = pdf[page_index]
+            textpage = page.get_textpage()
+            text = _normalize_newlines(textpage.get_text_range()).strip()
+            textpage.close()
+            page.close()
+            if text:
+                yield text
+    finally:
+        pdf.close()
+
+
+def iter_pages_pymupdf(file_path):
+    """PyMuPDF: MuPDF(C) 기반이라 빠름 (pip install pymupdf 필요)"""
+    import fitz
+
+    with fitz.open(file_path) as doc:
+        print(f"  총 페이지 수: {doc.page_count}")
+
+        for page in doc:
+            text = _normalize_newlines(page.get_text()).strip()
+            if text:
+                yield text
+
+
+# 엔진 이름: (페이지 iterator 함수, 필요한 모듈)
+ENGINES = {
+    "pdfplumber": (iter_pages_pdfplumber, "pdfplumber"),
+    "pypdfium2": (iter_pages_pypdfium2, "pypdfium2"),
+    "pymupdf": (iter_pages_pymupdf, "fitz"),
+}
+
+
+def available_engines():
+    """현재 환경에 설치되어 사용할 수 있는 엔진 이름 목록"""
+    return [name for name, (_, module) in ENGINES.items()
+            if importlib.util.find_spec(module) is not None]
+
+
+def iter_pages(file_path, engine=DEFAULT_ENGINE):
+    """지정한 엔진으로 PDF 페이지 텍스트를 한 장씩 돌려줍니다."""
+    if engine not in ENGINES:
+        raise ValueError(f"알 수 없는 추출 엔진: {engine} (사용 가능: {', '.join(ENGINES)})")
+
+    iter_func, _ = ENGINES[engine]
+    return iter_func(file_path)
@@ -3,41 +3,92 @@
 
 사용법:
     python pdf_to_json.py
+    python pdf_to_json.py --workers 4   # 프로세스 4개로 병렬 변환
+    python pdf_to_json.py --force       # 변경 여부와 관계없이 전부 다시 변환
+    python pdf_to_json.py --engine pypdfium2   # 다른 텍스트 추출 엔진 사용
 """
 
-import pdfplumber
+import argparse
+import contextlib
+import io
 import json
 import re
 import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from exam_parser import (
+    SECTION_PATTERNS,
+    ExamParser,
+    iter_blocks,
+    parse_question_block,
+    parse_answer_block
+)
+from pdf_engines import DEFAULT_ENGINE, ENGINES, iter_pages
+from ingest_report import (
+    StageTimer,
+    build_run_report,
+    default_report_path,
+    print_stage_table,
+    save_run_report
+)
+from ingest_manifest import (
+    MANIFEST_FILE,
+    file_sha256,
+    load_manifest,
+    save_manifest,
+    pdf_is_up_to_date,
+    record_pdf
+)
+
+
+# 파싱 로직이 바뀌면 올려서 기존 변환 결과를 무효화
+PARSER_VERSION = "3"
+
+
+def iter_pdf_pages(file_path, engine=DEFAULT_ENGINE):
+    """PDF 페이지 텍스트를 한 페이지씩 돌려줍니다.
+
+    읽은 페이지는 바로 해제하므로 메모리에는 현재 페이지만 남습니다.
+    engine으로 텍스트 추출 엔진을 고릅니다 (pdf_engines.ENGINES 참고).
+    """
+    return iter_pages(file_path, engine)
+
+
+def read_pdf_text(file_path, engine=DEFAULT_ENGINE):
+    """PDF 파일의 모든 텍스트를 읽어옵니다."""
+    return '\n'.join(iter_pdf_pages(file_path, engine))
 
 
-def read_pdf_text(file_path):
-    """PDF 파일의 모든 텍스트를 읽어옵니다."""
-    all_text = []
+def iter_exam_blocks(pages):
+    """페이지 텍스트를 차례로 받아 문제/답 블록을 완성되는 대로 돌려줍니다.
+
+    ExamParser에 한 줄씩 넘기므로 메모리에는 현재 페이지와 만들고 있는
+    블록 하나만 남습니다.
 
-    with pdfplumber.open(file_path) as pdf:
-        print(f"  총 페이지 수: {len(pdf.pages)}")
+    Yields:
+        ("question", 문제번호, 내용), ("answer", 문제번호, 내용),
+        답/해설 섹션 시작 시 ("section", None, 패턴) 한 번
+    """
+    parser = ExamParser()
 
-        for page_num, page in enumerate(pdf.pages, 1):
-            text = page.extract_text()
-            if text:
-                all_text.append(text)
+    for page_text in pages:
+        for line in page_text.split('\n'):
+            for event in parser.feed(line):
+                if event[0] == "section":
+                    print(f"  ✓ '{event[2]}' 패턴으로 섹션 분리 성공")
+                yield event
 
-    return '\n'.join(all_text)
+    yield from parser.close()
+
+    if parser.section == "question":
+        print("  ⚠ 답/해설 섹션을 찾지 못했습니다.")
 
 
 def split_questions_and_answers(text):
     """PDF 텍스트를 문제 섹션과 답/해설 섹션으로 분리합니다."""
 
-    # "기출문제 정답 및 해설" 또는 유사한 패턴 찾기
-    split_patterns = [
-        r'기출문제\s*정답\s*및\s*해설',
-        r'정답\s*및\s*해설',
-        r'정답\s*해설',
-        r'모범\s*답안'
-    ]
-
-    for pattern in split_patterns:
+    for pattern in SECTION_PATTERNS:
         match = re.search(pattern, text, re.IGNORECASE)
         if match:
             questions_section = text[:match.start()].strip()
@@ -55,50 +106,9 @@ def parse_answers(answers_text):
     """답/해설 섹션에서 각 문제의 답과 해설을 추출합니다."""
     answers_dict = {}
 
-    # [문제 숫자] 패턴으로 분리
-    pattern = r'\[문제\s+(\d+)\](.*?)(?=\[문제\s+\d+\]|$)'
-    matches = re.finditer(pattern, answers_text, re.DOTALL)
-
-    for match in matches:
-        question_num = int(match.group(1))
-        content = match.group(2).strip()
-
-        # 답 추출
-        lines = content.split('\n')
-        answer = ""
-        explanation = []
-
-        in_explanation = False
-
-        for i, line in enumerate(lines):
-            line = line.strip()
-
-            # [해설] 시작
-            if re.match(r'^\[해설\]', line):
-                in_explanation = True
-                continue
-
-            # 명시적인 "답:" 패턴
-            answer_match = re.match(r'^답\s*[:：]\s*(.*)', line)
-            if answer_match and not answer:
-                answer = answer_match.group(1).strip()
-                continue
-
-            # [문제 N] 바로 다음이 답인 경우
-            if not answer and line and not line.startswith('※') and not line.startswith('['):
-                # 너무 긴 줄은 답이 아닐 가능성이 높음
-                if len(line) < 100 and not re.match(r'^(public|def|class|import|from)', line):
-                    answer = line
-                    continue
-
-            # 해설 내용 수집
-            if in_explanation and line:
-                explanation.append(line)
-
-        answers_dict[question_num] = {
-            "답": answer,
-            "해설": '\n'.join(explanation) if explanation else ""
-        }
+    # [문제 숫자] 단위로 한 번에 훑으면서 분리
+    for _, question_num, content in iter_blocks(answers_text.split('\n'), "answer", False):
+        answers_dict[question_num] = parse_answer_block(content)
 
     return answers_dict
 
@@ -107,47 +117,9 @@ def parse_questions_improved(questions_text):
     """문제 섹션에서 문제들을 파싱합니다 (답은 제외)."""
     questions = []
 
-    # "문제 숫자" 패턴으로 분리
-    pattern = r'문제\s+(\d+)\s+(.*?)(?=문제\s+\d+|$)'
-    matches = re.finditer(pattern, questions_text, re.DOTALL)
-
-    for match in matches:
-        question_num = int(match.group(1))
-        content = match.group(2).strip()
-
-        # 점수 추출
-        score_match = re.search(r'\((\d+)점\)', content)
-        score = int(score_match.group(1)) if score_match else 0
-
-        # 코드 블록 추출 (여러 언어 지원)
-        code = None
-        code_patterns = [
-            r'((?:def|class)\s+\w+.*?)(?=답\s*[:：]|$)',  # Python
-            r'((?:public|private|protected)\s+(?:static\s+)?(?:class|void|int|String).*?)(?=답\s*[:：]|$)',  # Java
-            r'(#include.*?int\s+main.*?)(?=답\s*[:：]|$)',  # C/C++
-        ]
-
-        for code_pattern in code_patterns:
-            code_match = re.search(code_pattern, content, re.DOTALL)
-            if code_match:
-                code = code_match.group(1).strip()
-                # 코드 부분을 문제 내용에서 제거
-                content = content.replace(code, '').strip()
-                break
-
-        # "답 :" 이후 내용 제거 (혹시 있다면)
-        content = re.sub(r'답\s*[:：].*$', '', content, flags=re.MULTILINE | re.DOTALL).strip()
-
-        question_data = {
-            "문제번호": question_num,
-            "문제내용": content,
-            "코드": code,
-            "점수": score,
-            "답": "",
-            "해설": ""
-        }
-
-        questions.append(question_data)
+    # "문제 숫자" 단위로 한 번에 훑으면서 분리
+    for _, question_num, content in iter_blocks(questions_text.split('\n'), "question", False):
+        questions.append(parse_question_block(question_num, content))
 
     return questions
 
@@ -179,48 +151,172 @@ def save_questions_to_json(questions, output_file):
     print(f"  ✓ 총 {len(questions)}개 문제 저장")
 
 
-def pdf_to_json_complete(pdf_path, output_path):
-    """PDF 파일을 읽어서 답/해설이 포함된 JSON으로 변환"""
+def pdf_to_json_complete(pdf_path, output_path, streaming=True, engine=DEFAULT_ENGINE,
+                         timer=None):
+    """PDF 파일을 읽어서 답/해설이 포함된 JSON으로 변환
+
+    streaming=True이면 페이지를 하나씩 읽으면서 문제/답 블록을 바로 파싱하므로
+    문서 전체 텍스트를 메모리에 올리지 않습니다.
+    timer(StageTimer)를 넘기면 단계별 시간/문자 수/문제 수를 기록합니다.
+    """
 
     print("="*60)
     print(f"처리 중: {os.path.basename(pdf_path)}")
     print("="*60)
 
+    if timer is None:
+        timer = StageTimer()
+
+    if not streaming:
+        return _pdf_to_json_whole_text(pdf_path, output_path, engine, timer)
+
+    # 1~4. 페이지 단위로 읽으면서 섹션 분리 및 문제/답 파싱
+    print(f"\n[1/5] PDF 읽기 중... (페이지 단위 스트리밍, 엔진: {engine})")
+    print("\n[2/5] 섹션 분리 및 [3/5] 문제, [4/5] 답/해설 파싱 중...")
+    questions = []
+    answers_dict = {}
+    has_answers_section = False
+
+    pages = timer.timed_pages("extract", iter_pdf_pages(pdf_path, engine))
+    loop_wall = time.perf_counter()
+    loop_cpu = time.process_time()
+
+    for kind, question_num, content in iter_exam_blocks(pages):
+        if kind == "question":
+            with timer.stage("parse_questions", chars=len(content), questions=1):
+                questions.append(parse_question_block(question_num, content))
+        elif kind == "answer":
+            with timer.stage("parse_answers", chars=len(content), questions=1):
+                answers_dict[question_num] = parse_answer_block(content)
+        else:
+            has_answers_section = True
+
+    # 단계들이 섞여서 실행되므로, 섹션 분리 시간은 전체에서 나머지 단계를 뺀 값
+    stages = timer.stages
+    nested = ("extract", "parse_questions", "parse_answers")
+    timer.add("split",
+              wall=time.perf_counter() - loop_wall - sum(stages[n]["wall"] for n in nested),
+              cpu=time.process_time() - loop_cpu - sum(stages[n]["cpu"] for n in nested),
+              chars=stages["extract"]["chars"],
+              questions=len(questions))
+
+    print(f"  → {len(questions)}개 문제 발견")
+
+    # 5. 문제와 답 매칭
+    if has_answers_section:
+        print(f"  → {len(answers_dict)}개 답/해설 발견")
+        print("\n[5/5] 문제와 답 매칭 중...")
+        with timer.stage("merge", questions=len(questions)):
+            complete_questions = merge_questions_and_answers(questions, answers_dict)
+    else:
+        print("  → 답/해설 섹션 없음")
+        complete_questions = questions
+
+    # 6. JSON 저장
+    print("\n[완료] JSON 파일 저장 중...")
+    with timer.stage("save", questions=len(complete_questions)):
+        save_questions_to_json(complete_questions, output_path)
+
+    return complete_questions
+
+
+def _pdf_to_json_whole_text(pdf_path, output_path, engine=DEFAULT_ENGINE, timer=None):
+    """문서 전체 텍스트를 한 번에 읽어서 변환 (기존 방식)"""
+
+    if timer is None:
+        timer = StageTimer()
+
     # 1. PDF 읽기
-    print("\n[1/5] PDF 읽기 중...")
-    full_text = read_pdf_text(pdf_path)
+    print(f"\n[1/5] PDF 읽기 중... (엔진: {engine})")
+    full_text = '\n'.join(timer.timed_pages("extract", iter_pdf_pages(pdf_path, engine)))
 
     # 2. 문제 섹션과 답/해설 섹션 분리
     print("\n[2/5] 섹션 분리 중...")
-    questions_text, answers_text = split_questions_and_answers(full_text)
+    with timer.stage("split", chars=len(full_text)):
+        questions_text, answers_text = split_questions_and_answers(full_text)
 
     # 3. 문제 파싱
     print("\n[3/5] 문제 파싱 중...")
-    questions = parse_questions_improved(questions_text)
+    with timer.stage("parse_questions", chars=len(questions_text)) as stage:
+        questions = parse_questions_improved(questions_text)
+        stage["questions"] += len(questions)
     print(f"  → {len(questions)}개 문제 발견")
 
     # 4. 답/해설 파싱
     print("\n[4/5] 답/해설 파싱 중...")
     if answers_text:
-        answers_dict = parse_answers(answers_text)
+        with timer.stage("parse_answers", chars=len(answers_text)) as stage:
+            answers_dict = parse_answers(answers_text)
+            stage["questions"] += len(answers_dict)
         print(f"  → {len(answers_dict)}개 답/해설 발견")
 
         # 5. 문제와 답 매칭
         print("\n[5/5] 문제와 답 매칭 중...")
-        complete_questions = merge_questions_and_answers(questions, answers_dict)
+        with timer.stage("merge", questions=len(questions)):
+            complete_questions = merge_questions_and_answers(questions, answers_dict)
     else:
         print("  → 답/해설 섹션 없음")
         complete_questions = questions
 
     # 6. JSON 저장
     print("\n[완료] JSON 파일 저장 중...")
-    save_questions_to_json(complete_questions, output_path)
+    with timer.stage("save", questions=len(complete_questions)):
+        save_questions_to_json(complete_questions, output_path)
 
     return complete_questions
 
 
-def process_all_pdfs(data_folder="data", output_folder="output"):
-    """data 폴더의 모든 PDF를 JSON으로 변환"""
+def convert_pdf(pdf_path, output_path, capture_log=False, engine=DEFAULT_ENGINE):
+    """PDF 1개를 변환하고 처리 결과를 반환합니다 (프로세스 풀 작업 단위).
+
+    capture_log=True이면 진행 로그를 화면 대신 결과의 "log"에 담아 반환합니다.
+    병렬 실행 시 여러 PDF의 로그가 섞이지 않도록 부모 프로세스가 순서대로 출력합니다.
+    단계별 측정값은 결과의 "timing"에 담깁니다.
+    """
+    buffer = io.StringIO()
+    timer = StageTimer()
+    redirect = contextlib.redirect_stdout(buffer) if capture_log else contextlib.nullcontext()
+
+    with redirect:
+        try:
+            questions = pdf_to_json_complete(pdf_path, output_path, engine=engine, timer=timer)
+            result = {
+                "status": "success",
+                "count": len(questions),
+                "output": output_path,
+                "timing": timer.to_dict()
+            }
+        except Exception as e:
+            print(f"\n❌ 오류 발생: {e}")
+            print(traceback.format_exc())
+            result = {
+                "status": "error",
+                "error": str(e)
+            }
+
+    if capture_log:
+        result["log"] = buffer.getvalue()
+
+    return result
+
+
+def process_all_pdfs(data_folder="data", output_folder="output", workers=1,
+                     force=False, manifest_file=MANIFEST_FILE, engine=DEFAULT_ENGINE,
+                     report_file=None):
+    """data 폴더의 모든 PDF를 JSON으로 변환
+
+    workers가 2 이상이면 PDF들을 프로세스 풀에 나눠서 병렬로 변환합니다.
+    (None 또는 0이면 CPU 코어 수만큼 사용) 각 PDF의 변환 과정은 직렬 실행과
+    동일하므로 생성되는 JSON 파일도 같습니다.
+
+    매니페스트에 기록된 내용 해시와 파서 버전(추출 엔진 포함)이 같은 PDF는
+    건너뜁니다. (force=True이면 모두 다시 변환)
+
+    PDF별/단계별 측정값과 전체 합계는 report_file(기본: output 폴더 옆의
+    ingest_report.json)에 저장합니다.
+    """
+
+    batch_start = time.perf_counter()
 
     # output 폴더 생성
     os.makedirs(output_folder, exist_ok=True)
@@ -237,32 +333,91 @@ def process_all_pdfs(data_folder="data", output_folder="output"):
         print(f"  {i}. {pdf_file}")
     print()
 
-    all_results = {}
+    manifest = load_manifest(manifest_file)
+    # 추출 엔진이 바뀌면 텍스트가 달라질 수 있으므로 버전에 포함
+    parser_version = f"{PARSER_VERSION}/{engine}"
 
-    for idx, pdf_file in enumerate(pdf_files, 1):
-        print(f"\n\n{'#'*60}")
-        print(f"# [{idx}/{len(pdf_files)}] {pdf_file}")
-        print(f"{'#'*60}\n")
+    # 사라진 PDF의 기록 정리
+    for pdf_file in list(manifest["pdfs"]):
+        if pdf_file not in pdf_files:
+            del manifest["pdfs"][pdf_file]
 
+    all_results = {}
+    content_hashes = {}
+    jobs = []
+
+    for pdf_file in pdf_files:
         pdf_path = os.path.join(data_folder, pdf_file)
         output_name = pdf_file.replace('.pdf', '.json')
         output_path = os.path.join(output_folder, output_name)
 
-        try:
-            questions = pdf_to_json_complete(pdf_path, output_path)
-            all_results[pdf_file] = {
-                "status": "success",
-                "count": len(questions),
-                "output": output_path
-            }
-        except Exception as e:
-            import traceback
-            print(f"\n❌ 오류 발생: {e}")
-            print(traceback.format_exc())
+        content_hash = file_sha256(pdf_path)
+        content_hashes[pdf_file] = content_hash
+
+        if not force and pdf_is_up_to_date(manifest, pdf_file, content_hash, parser_version,
+                                           output_path):
+            entry = manifest["pdfs"][pdf_file]
             all_results[pdf_file] = {
-                "status": "error",
-                "error": str(e)
+                "status": "skipped",
+                "count": entry["count"],
+                "output": entry["output"]
             }
+            continue
+
+        jobs.append((pdf_file, pdf_path, output_path))
+
+    skipped_count = len(pdf_files) - len(jobs)
+    if skipped_count:
+        print(f"변경 없는 PDF {skipped_count}개는 건너뜁니다.\n")
+
+    if not workers:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs) or 1))
+
+    if workers > 1:
+        print(f"병렬 처리: 프로세스 {workers}개\n")
+
+    def print_header(idx, pdf_file):
+        print(f"\n\n{'#'*60}")
+        print(f"# [{idx}/{len(jobs)}] {pdf_file}")
+        print(f"{'#'*60}\n")
+
+    if workers == 1:
+        for idx, (pdf_file, pdf_path, output_path) in enumerate(jobs, 1):
+            print_header(idx, pdf_file)
+            all_results[pdf_file] = convert_pdf(pdf_path, output_path, engine=engine)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(convert_pdf, pdf_path, output_path, True, engine)
+                for _, pdf_path, output_path in jobs
+            ]
+
+            # 완료 순서와 관계없이 파일 순서대로 로그 출력
+            for idx, ((pdf_file, _, _), future) in enumerate(zip(jobs, futures), 1):
+                print_header(idx, pdf_file)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # 작업 프로세스 자체가 죽은 경우 (BrokenProcessPool 등)
+                    print(f"\n❌ 오류 발생: {e}")
+                    result = {
+                        "status": "error",
+                        "error": str(e)
+                    }
+                print(result.pop("log", ""), end="")
+                all_results[pdf_file] = result
+
+    # 성공한 변환만 매니페스트에 기록
+    for pdf_file, _, _ in jobs:
+        result = all_results[pdf_file]
+        if result["status"] == "success":
+            record_pdf(manifest, pdf_file, content_hashes[pdf_file], parser_version,
+                       result["output"], result["count"])
+    save_manifest(manifest, manifest_file)
+
+    # 파일 순서대로 정렬
+    all_results = {pdf_file: all_results[pdf_file] for pdf_file in pdf_files}
 
     # 처리 결과 요약
     print("\n\n" + "="*60)
@@ -276,17 +431,43 @@ def process_all_pdfs(data_folder="data", output_folder="output"):
         if result["status"] == "success":
             print(f"✓ {pdf}: {result['count']}개 문제")
             success_count += 1
+        elif result["status"] == "skipped":
+            print(f"- {pdf}: {result['count']}개 문제 (변경 없음)")
         else:
             print(f"✗ {pdf}: {result['error']}")
             error_count += 1
 
-    print(f"\n성공: {success_count}개, 실패: {error_count}개")
+    print(f"\n성공: {success_count}개, 실패: {error_count}개, 건너뜀: {skipped_count}개")
     print(f"\nJSON 파일 저장 위치: {os.path.abspath(output_folder)}/")
 
+    # 단계별 측정 리포트
+    report = build_run_report(all_results, time.perf_counter() - batch_start, {
+        "data_folder": data_folder,
+        "output_folder": output_folder,
+        "engine": engine,
+        "workers": workers,
+        "parser_version": parser_version
+    })
+    if report["batch"]["converted"]:
+        print_stage_table(report["stages"])
+        print(f"\n전체 {report['batch']['wall']:.2f}초, "
+              f"{report['batch']['pages_per_sec']:.1f} 페이지/초, "
+              f"{report['batch']['chars_per_sec']:,.0f} 문자/초")
+    save_run_report(report, report_file or default_report_path(output_folder))
+
     return all_results
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="정보처리기사 PDF → JSON 변환")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="병렬 변환에 사용할 프로세스 수 (0: CPU 코어 수)")
+    parser.add_argument("--force", action="store_true",
+                        help="변경되지 않은 PDF도 모두 다시 변환")
+    parser.add_argument("--engine", choices=list(ENGINES), default=DEFAULT_ENGINE,
+                        help="PDF 텍스트 추출 엔진")
+    args = parser.parse_args()
+
     # 스크립트가 있는 디렉토리로 이동
     script_dir = os.path.dirname(os.path.abspath(__file__))
     os.chdir(script_dir)
@@ -297,4 +478,4 @@ if __name__ == "__main__":
     print(f"작업 디렉토리: {os.getcwd()}")
 
     # 모든 PDF 파일 처리
-    results = process_all_pdfs()
+    results = process_all_pdfs(workers=args.workers, force=args.force, engine=args.engine)
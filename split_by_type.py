@@ -4,58 +4,116 @@
 
 import json
 import os
+from corpus import CorpusWriter, iter_corpus
+from keyword_index import build_keyword_index, keyword_index_path
+from ingest_manifest import (
+    MANIFEST_FILE,
+    load_manifest,
+    save_manifest,
+    fingerprint_files,
+    stage_is_up_to_date,
+    record_stage
+)
 
 
-def split_questions_by_type(input_file="all_questions.json"):
-    """문제를 코드/이론으로 분류하여 저장합니다."""
+# 코퍼스 레코드에 미리 저장해 두는 분류 필드
+#   type: "code" / "theory", language: detect_language 결과 (이론 문제는 None),
+#   has_answer: 답이 비어 있지 않은지
+CLASSIFICATION_FIELDS = ('type', 'language', 'has_answer')
+
+# 분류 규칙(detect_language 등)이 바뀌면 올림 → 통합/분류 단계가 다시 실행되어 코퍼스를 다시 분류
+CLASSIFIER_VERSION = 2
+
+
+def classify_question(question, force=False):
+    """문제에 분류 필드(type, language, has_answer)를 채워서 반환합니다.
+
+    이미 분류된 레코드는 그대로 둡니다. (force=True이면 다시 분류)
+    """
+    if not force and all(field in question for field in CLASSIFICATION_FIELDS):
+        return question
+
+    # 분류 기준:
+    # 1. 코드 문제: "코드" 필드가 비어 있지 않은 경우
+    # 2. 이론 문제: "코드" 필드가 None이거나 빈 경우
+    code = question.get('코드')
+    question['type'] = "code" if code else "theory"
+    question['language'] = detect_language(code) if code else None
+    question['has_answer'] = bool(question.get('답'))
+    return question
+
+
+def split_questions_by_type(input_file="all_questions.ndjson", force=False,
+                            manifest_file=MANIFEST_FILE):
+    """문제를 코드/이론으로 분류하여 저장하고 통계를 반환합니다.
+
+    코퍼스를 한 번만 훑으면서 분류, 파일 저장, 출처/언어/답 통계를 함께
+    처리하므로 메모리에는 문제 하나만 남습니다. 저장되는 문제에는 분류 필드
+    (type, language, has_answer)가 들어 있어 다른 노드가 다시 계산하지 않아도 됩니다.
+
+    입력 파일이 지난 분류 이후 바뀌지 않았으면 건너뛰고 None을 반환합니다.
+    (force=True이면 항상 다시 분류)
+    """
 
     print("="*60)
     print("문제 유형별 분류 프로그램")
     print("="*60)
 
-    # JSON 파일 읽기
+    code_file = "code_questions.json"
+    theory_file = "theory_questions.json"
+    stats_file = "questions_stats.json"
+    output_files = [code_file, theory_file, stats_file,
+                    keyword_index_path(code_file), keyword_index_path(theory_file)]
+
+    # 입력 변경 여부 확인
+    manifest = load_manifest(manifest_file)
+    previous = manifest["stages"].get("split", {}).get("inputs")
+    fingerprint = fingerprint_files([input_file], previous)
+    settings = {"classifier_version": CLASSIFIER_VERSION}
+
+    if not force and stage_is_up_to_date(manifest, "split", fingerprint, output_files, settings):
+        print(f"\n✓ {input_file} 변경 없음. 분류를 건너뜁니다.")
+        return None
+
     print(f"\n파일 읽기: {input_file}")
-    with open(input_file, 'r', encoding='utf-8') as f:
-        all_questions = json.load(f)
 
-    print(f"총 {len(all_questions)}개 문제 로드 완료\n")
+    # 입력 코퍼스가 예전 분류 규칙으로 통합되었으면 분류 필드를 다시 계산
+    merge_settings = manifest["stages"].get("merge", {}).get("settings") or {}
+    reclassify = merge_settings.get("classifier_version") != CLASSIFIER_VERSION
 
-    # 분류 기준:
-    # 1. 코드 문제: "코드" 필드가 None이 아닌 경우
-    # 2. 이론 문제: "코드" 필드가 None인 경우
+    code_stats = new_stats()
+    theory_stats = new_stats()
+
+    # 한 번의 패스로 분류 + 저장 + 통계
+    with CorpusWriter(code_file) as code_writer, CorpusWriter(theory_file) as theory_writer:
+        for question in iter_corpus(input_file):
+            classify_question(question, force=reclassify)
 
-    code_questions = []
-    theory_questions = []
+            if question['type'] == "code":
+                code_writer.write(question)
+                count_question(code_stats, question)
+            else:
+                theory_writer.write(question)
+                count_question(theory_stats, question)
 
-    for question in all_questions:
-        if question.get('코드') and question['코드'] is not None:
-            code_questions.append(question)
-        else:
-            theory_questions.append(question)
+    code_count = code_writer.count
+    theory_count = theory_writer.count
+    total_count = code_count + theory_count
 
     # 통계
     print("="*60)
     print("분류 결과")
     print("="*60)
-    print(f"\n📝 코드 문제: {len(code_questions)}개")
-    print(f"📚 이론 문제: {len(theory_questions)}개")
-    print(f"   총합: {len(all_questions)}개")
+    print(f"\n📝 코드 문제: {code_count}개")
+    print(f"📚 이론 문제: {theory_count}개")
+    print(f"   총합: {total_count}개")
 
-    # 코드 문제 저장
-    code_file = "code_questions.json"
-    with open(code_file, 'w', encoding='utf-8') as f:
-        json.dump(code_questions, f, ensure_ascii=False, indent=2)
     print(f"\n✅ 코드 문제 저장: {code_file}")
-
-    # 이론 문제 저장
-    theory_file = "theory_questions.json"
-    with open(theory_file, 'w', encoding='utf-8') as f:
-        json.dump(theory_questions, f, ensure_ascii=False, indent=2)
     print(f"✅ 이론 문제 저장: {theory_file}")
 
-    # 상세 통계 생성
-    code_stats = analyze_questions(code_questions, "코드")
-    theory_stats = analyze_questions(theory_questions, "이론")
+    # 키워드 검색 인덱스 (오프라인/하이브리드 검색용)
+    build_keyword_index(code_file)
+    build_keyword_index(theory_file)
 
     # 통계 출력
     print(f"\n{'='*60}")
@@ -70,67 +128,67 @@ def split_questions_by_type(input_file="all_questions.json"):
 
     # 통계 정보 저장
     stats = {
-        "총_문제수": len(all_questions),
+        "총_문제수": total_count,
         "코드_문제": {
-            "개수": len(code_questions),
+            "개수": code_count,
             "상세": code_stats
         },
         "이론_문제": {
-            "개수": len(theory_questions),
+            "개수": theory_count,
             "상세": theory_stats
         }
     }
 
-    stats_file = "questions_stats.json"
     with open(stats_file, 'w', encoding='utf-8') as f:
         json.dump(stats, f, ensure_ascii=False, indent=2)
     print(f"\n✅ 통계 정보 저장: {stats_file}")
 
-    return code_questions, theory_questions
+    record_stage(manifest, "split", fingerprint, output_files, settings)
+    save_manifest(manifest, manifest_file)
 
+    return stats
 
-def analyze_questions(questions, category):
-    """문제 유형별 상세 분석"""
-    stats = {
+
+def new_stats():
+    """문제 유형별 상세 통계의 빈 틀"""
+    return {
         "출처별": {},
         "언어별": {},
         "답_있음": 0,
         "해설_있음": 0
     }
 
-    # 출처별 카운트
-    for q in questions:
-        source = q.get('출처', '알 수 없음')
-        stats["출처별"][source] = stats["출처별"].get(source, 0) + 1
+
+def count_question(stats, question):
+    """분류된 문제 하나를 통계에 더합니다."""
+    source = question.get('출처', '알 수 없음')
+    stats["출처별"][source] = stats["출처별"].get(source, 0) + 1
 
     # 언어별 카운트 (코드 문제만)
-    if category == "코드":
-        for q in questions:
-            code = q.get('코드', '')
-            if code:
-                lang = detect_language(code)
-                stats["언어별"][lang] = stats["언어별"].get(lang, 0) + 1
+    language = question.get('language')
+    if language:
+        stats["언어별"][language] = stats["언어별"].get(language, 0) + 1
 
     # 답/해설 통계
-    for q in questions:
-        if q.get('답'):
-            stats["답_있음"] += 1
-        if q.get('해설'):
-            stats["해설_있음"] += 1
-
-    return stats
+    if question.get('has_answer'):
+        stats["답_있음"] += 1
+    if question.get('해설'):
+        stats["해설_있음"] += 1
 
 
 def detect_language(code):
-    """코드 언어 자동 감지"""
+    """코드 언어 자동 감지
+
+    Java/C 규칙을 먼저 확인합니다. ('import java.util.*'처럼 Python 규칙에도 걸리는 코드가 있음)
+    """
     code = code.strip()
 
-    if code.startswith('def ') or 'print(' in code or 'import ' in code:
-        return 'Python'
-    elif 'public class' in code or 'public static' in code or 'System.out' in code:
+    if 'public class' in code or 'public static' in code or 'System.out' in code:
         return 'Java'
     elif '#include' in code or 'printf(' in code or 'scanf(' in code:
         return 'C/C++'
+    elif code.startswith('def ') or 'print(' in code or 'import ' in code:
+        return 'Python'
     else:
         return '기타'
 
@@ -159,8 +217,8 @@ if __name__ == "__main__":
 
     print(f"작업 디렉토리: {os.getcwd()}\n")
 
-    # 문제 분류
-    code_questions, theory_questions = split_questions_by_type()
+    # 문제 분류 (입력이 바뀌지 않았으면 건너뜀)
+    split_questions_by_type()
 
     print(f"\n{'='*60}")
     print("완료!")
@@ -169,3 +227,4 @@ if __name__ == "__main__":
     print(f"  - code_questions.json (코드 문제)")
     print(f"  - theory_questions.json (이론 문제)")
     print(f"  - questions_stats.json (통계 정보)")
+    print(f"  - code_questions.keyword.npz, theory_questions.keyword.npz (키워드 검색 인덱스)")
@@ -9,6 +9,9 @@ from langgraph.graph import add_messages
 class QuizState(TypedDict):
     """문제 풀이 시스템의 상태"""
 
+    # 사용자 (세션) ID - 푼 문제/출제 순서를 사용자별로 관리
+    user_id: str
+
     # 문제 타입
     question_type: str  # "code" or "theory"
 
@@ -0,0 +1,6 @@
+"""테스트에서 저장소 최상위 모듈(corpus, exam_parser, nodes 등)을 import할 수 있게 경로 추가"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
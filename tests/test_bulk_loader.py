@@ -0,0 +1,125 @@
+"""BulkLoader 체크포인트 테스트 (중간에 끊긴 뒤 이어서/다시 만들기)"""
+
+import hashlib
+import importlib
+import threading
+
+import pytest
+
+from nodes.bulk_loader import BulkLoader
+
+
+DIMENSION = 8
+
+
+class Crash(BaseException):
+    """프로세스가 죽은 것처럼 재시도 없이 청크를 실패시킴"""
+
+
+class FakeEmbeddings:
+    def __init__(self, crash_on_call=None):
+        self.crash_on_call = crash_on_call
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self.lock:
+            self.calls += 1
+            crash = self.calls == self.crash_on_call
+        if crash:
+            raise Crash("중간에 끊김")
+        return [[b / 255 for b in hashlib.sha256(text.encode()).digest()[:DIMENSION]] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def make_records(count):
+    return [(f"id{i}", f"문제 {i}", {"n": i}) for i in range(count)]
+
+
+def make_loader(embeddings, stored, checkpoint_file, plan_id):
+    def upsert(ids, texts, vectors, metadatas):
+        stored.update(ids)
+
+    return BulkLoader(embeddings.embed_documents, upsert, dimension=DIMENSION, max_items=10,
+                      concurrency=1, retries=0, checkpoint_file=checkpoint_file,
+                      plan_id=plan_id, count_tokens=len, sleep=lambda seconds: None)
+
+
+def test_resume_skips_finished_ids_of_same_plan(tmp_path):
+    checkpoint = str(tmp_path / "code.checkpoint")
+    records = make_records(50)
+    stored = set()
+
+    with pytest.raises(RuntimeError):
+        make_loader(FakeEmbeddings(crash_on_call=3), stored, checkpoint, "plan-a").load(records)
+    # 실패한 세 번째 청크만 빠지고 나머지 청크는 끝까지 올라감
+    assert len(stored) == 40
+
+    stats = make_loader(FakeEmbeddings(), stored, checkpoint, "plan-a").load(records)
+
+    assert stats["skipped"] == 40
+    assert stats["vectors"] == 10
+    assert stored == {record[0] for record in records}
+    assert not (tmp_path / "code.checkpoint").exists()
+
+
+def test_checkpoint_of_other_plan_is_ignored(tmp_path):
+    checkpoint = str(tmp_path / "code.checkpoint")
+    records = make_records(50)
+
+    with pytest.raises(RuntimeError):
+        make_loader(FakeEmbeddings(crash_on_call=3), set(), checkpoint, "plan-a").load(records)
+
+    # 다시 만든 빈 컬렉션에 다른 계획으로 올리면 예전 체크포인트의 ID도 모두 올라가야 함
+    stored = set()
+    stats = make_loader(FakeEmbeddings(), stored, checkpoint, "plan-b").load(records)
+
+    assert stats["skipped"] == 0
+    assert stored == {record[0] for record in records}
+
+
+def test_truncated_last_line_is_not_treated_as_done(tmp_path):
+    checkpoint = tmp_path / "code.checkpoint"
+    checkpoint.write_text("# plan plan-a\nid0\nid1\nid", encoding="utf-8")
+    stored = set()
+
+    stats = make_loader(FakeEmbeddings(), stored, str(checkpoint), "plan-a").load(make_records(3))
+
+    assert stats["skipped"] == 2
+    assert stored == {"id2"}
+
+
+def test_rebuild_after_failed_sync_uploads_every_id(tmp_path, monkeypatch):
+    for module in ("dotenv", "langchain_openai", "httpx"):
+        pytest.importorskip(module)
+    monkeypatch.chdir(tmp_path)   # 기본 임베딩 캐시 파일이 작업 폴더에 생김
+    monkeypatch.setenv("VECTOR_BACKEND", "numpy")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    vector_db = importlib.import_module("nodes.vector_db")
+    if vector_db.VECTOR_BACKEND != "numpy":
+        pytest.skip("nodes.vector_db가 이미 다른 백엔드로 import됨")
+
+    from nodes.embedding_cache import CachedEmbeddings, EmbeddingCache, MemoryEmbeddingCache
+
+    db = vector_db.QuestionVectorDB(str(tmp_path / "vector_store"))
+    db.dimension = DIMENSION
+
+    def use_embeddings(embeddings):
+        db.embeddings = CachedEmbeddings(embeddings, model="fake", dimension=DIMENSION,
+                                         cache=EmbeddingCache(str(tmp_path / "cache.db")),
+                                         memory=MemoryEmbeddingCache())
+
+    questions = [{"문제번호": i, "출처": "2024년 1회", "문제내용": f"문제 {i}", "답": str(i)}
+                 for i in range(250)]
+
+    # 청크 3개 중 하나가 실패 → 체크포인트에 끝난 청크의 ID가 남음
+    use_embeddings(FakeEmbeddings(crash_on_call=2))
+    with pytest.raises(RuntimeError):
+        db._sync_numpy_collection("code", questions)
+
+    use_embeddings(FakeEmbeddings())
+    store = db._sync_numpy_collection("code", questions, rebuild=True)
+
+    assert set(store.ids()) == {db._vector_id(question) for question in questions}
@@ -0,0 +1,84 @@
+"""NearDuplicateIndex (MinHash LSH) 테스트"""
+
+import pytest
+
+from dedup import NearDuplicateIndex, normalize_text, shingles
+
+
+BASE = {
+    "문제내용": "다음 C 프로그램의 실행 결과를 쓰시오.",
+    "코드": "#include <stdio.h>\nint main() {\n    int a = 3, b = 5;\n"
+            "    printf(\"%d\", a * b + a);\n    return 0;\n}"
+}
+
+
+def test_normalize_text_collapses_whitespace_and_case():
+    question = {"문제내용": "  Hello\n\nWorld ", "코드": "Print(X)\t"}
+
+    assert normalize_text(question) == "hello world print(x)"
+
+
+def test_shingles_of_short_text_is_single_hash():
+    assert len(shingles("abc", size=5)) == 1
+    assert len(shingles("abcdefg", size=5)) == 3
+
+
+def test_exact_duplicate_points_to_first_key():
+    index = NearDuplicateIndex()
+
+    assert index.add("a", BASE) is None
+    duplicate = index.add("b", dict(BASE))
+
+    assert duplicate[0] == "a"
+    assert duplicate[1] == pytest.approx(1.0)
+
+
+def test_whitespace_only_change_is_duplicate():
+    index = NearDuplicateIndex()
+    index.add("a", BASE)
+    reformatted = dict(BASE, 코드=BASE["코드"].replace("    ", "\t"))
+
+    assert index.add("b", reformatted)[0] == "a"
+
+
+def test_small_edit_is_duplicate_and_unrelated_is_not():
+    index = NearDuplicateIndex()
+    index.add("a", BASE)
+    edited = dict(BASE, 코드=BASE["코드"].replace("a * b + a", "a * b + b"))
+    unrelated = {"문제내용": "데이터베이스에서 릴레이션의 튜플 수를 무엇이라 하는지 쓰시오.", "코드": ""}
+
+    assert index.add("b", edited)[0] == "a"
+    assert index.add("c", unrelated) is None
+
+
+def test_threshold_rejects_candidates_below_it():
+    strict = NearDuplicateIndex(threshold=1.0)
+    strict.add("a", BASE)
+    edited = dict(BASE, 코드=BASE["코드"].replace("a * b + a", "a * b + b"))
+
+    assert strict.add("b", edited) is None
+
+
+def test_empty_question_is_never_duplicate():
+    index = NearDuplicateIndex()
+
+    assert index.add("a", {}) is None
+    assert index.add("b", {}) is None
+    assert index.report() == []
+
+
+def test_report_lists_only_clusters_with_duplicates():
+    index = NearDuplicateIndex()
+    index.add("a", BASE)
+    index.add("b", dict(BASE))
+    index.add("c", {"문제내용": "전혀 다른 문제입니다. 운영체제의 교착상태 조건을 쓰시오."})
+
+    report = index.report()
+
+    assert [cluster["대표"] for cluster in report] == ["a"]
+    assert report[0]["중복"] == [{"키": "b", "유사도": 1.0}]
+
+
+def test_num_perm_must_divide_into_bands():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(num_perm=100, bands=16)
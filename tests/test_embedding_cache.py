@@ -0,0 +1,68 @@
+"""CachedEmbeddings 캐시 계층 테스트 (문서는 디스크만, 검색어는 메모리 → 디스크)"""
+
+import pytest
+
+from nodes.embedding_cache import CachedEmbeddings, EmbeddingCache, MemoryEmbeddingCache
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.documents = 0
+        self.queries = 0
+
+    def embed_documents(self, texts):
+        self.documents += len(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.queries += 1
+        return [float(len(text)), 1.0]
+
+
+@pytest.fixture
+def embeddings(tmp_path):
+    return CachedEmbeddings(CountingEmbeddings(), model="fake", dimension=2,
+                            cache=EmbeddingCache(str(tmp_path / "cache.db")),
+                            memory=MemoryEmbeddingCache(max_entries=4))
+
+
+def test_documents_bypass_memory_cache(embeddings):
+    embeddings.embed_queries(["검색어"])
+    memory_stats = dict(embeddings.memory.stats)
+
+    vectors = embeddings.embed_documents([f"문서 {i}" for i in range(10)])
+
+    assert len(vectors) == 10
+    assert embeddings.memory.stats == memory_stats
+    assert len(embeddings.memory) == 1   # 검색어 항목이 밀려나지 않음
+    assert len(embeddings.cache) == 11
+
+
+def test_documents_reuse_disk_cache(embeddings):
+    texts = ["문서 a", "문서 b", "문서 a"]
+    first = embeddings.embed_documents(texts)
+    second = embeddings.embed_documents(texts)
+
+    assert first == second
+    assert embeddings.embeddings.documents == 2
+    assert embeddings.cache.stats["hits"] == 3
+
+
+def test_queries_hit_memory_after_first_call(embeddings):
+    embeddings.embed_queries(["q1", "q2"])
+    embeddings.embed_query("q1")
+    embeddings.embed_queries(["q2"])
+
+    assert embeddings.memory.stats["hits"] == 2
+    assert embeddings.embeddings.documents == 2
+    assert embeddings.embeddings.queries == 0
+
+
+def test_document_embedding_warms_disk_for_queries(embeddings):
+    embeddings.embed_documents(["같은 텍스트"])
+
+    embeddings.embed_query("같은 텍스트")
+
+    # 메모리에는 없지만 디스크 캐시에서 찾으므로 API는 다시 부르지 않음
+    assert embeddings.embeddings.queries == 0
+    assert embeddings.memory.stats["misses"] == 1
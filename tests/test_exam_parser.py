@@ -0,0 +1,77 @@
+"""ExamParser 상태 기계 테스트"""
+
+from exam_parser import ExamParser, iter_blocks, parse_exam_text
+
+
+EXAM_TEXT = """2023년 1회 기출
+문제 1 다음 설명에 해당하는 용어를 쓰시오. (5점)
+데이터베이스 정규화
+문제 2 다음 설명의 빈칸을 쓰시오. (3점)
+문제
+3 처럼 줄바꿈으로 끊긴 표기는 경계가 아님
+기출문제 정답 및 해설
+[문제 1]
+제2정규형
+[해설]
+부분 함수 종속 제거
+[문제 2]
+답 : 1
+"""
+
+
+def test_blocks_and_section_event_in_order():
+    events = list(iter_blocks(EXAM_TEXT.split("\n")))
+
+    assert [(kind, number) for kind, number, _ in events] == [
+        ("question", 1), ("question", 2), ("section", None), ("answer", 1), ("answer", 2)
+    ]
+    assert events[0][2] == "다음 설명에 해당하는 용어를 쓰시오. (5점)\n데이터베이스 정규화"
+    # "문제\n3"은 새 블록이 아니라 문제 2의 내용
+    assert events[1][2].endswith("3 처럼 줄바꿈으로 끊긴 표기는 경계가 아님")
+
+
+def test_parse_exam_text_joins_questions_and_answers():
+    questions, answers = parse_exam_text(EXAM_TEXT)
+
+    assert [q["문제번호"] for q in questions] == [1, 2]
+    assert questions[0]["점수"] == 5
+    assert questions[0]["코드"] is None
+    assert answers == {
+        1: {"답": "제2정규형", "해설": "부분 함수 종속 제거"},
+        2: {"답": "1", "해설": ""},
+    }
+
+
+def test_without_answer_section_answers_are_none():
+    questions, answers = parse_exam_text("문제 1 첫 번째\n문제 2 두 번째")
+
+    assert [q["문제내용"] for q in questions] == ["첫 번째", "두 번째"]
+    assert answers is None
+
+
+def test_marker_must_be_followed_by_whitespace():
+    # "문제 10점"은 숫자 뒤에 공백이 없으므로 문제 시작이 아님
+    events = list(iter_blocks(["문제 10점짜리 설명", "문제 3 진짜 문제"]))
+
+    assert events == [("question", 3, "진짜 문제")]
+
+
+def test_trailing_marker_at_document_end_is_dropped():
+    questions, _ = parse_exam_text("문제 1 내용\n문제 2")
+
+    assert [q["문제번호"] for q in questions] == [1]
+
+
+def test_feed_returns_blocks_as_soon_as_they_finish():
+    parser = ExamParser()
+
+    assert parser.feed("문제 1 abc 문제 2 def") == [("question", 1, "abc")]
+    assert parser.close() == [("question", 2, "def")]
+    assert parser.close() == []
+
+
+def test_answer_only_parsing_without_section_detection():
+    events = list(iter_blocks(["[문제 4]", "정답 및 해설 같은 글자가 있어도", "[문제 5]", "B"],
+                              section="answer", detect_sections=False))
+
+    assert [(kind, number) for kind, number, _ in events] == [("answer", 4), ("answer", 5)]
@@ -0,0 +1,116 @@
+"""KeywordIndex 검색/필터 테스트"""
+
+import pytest
+
+from corpus import question_content_id, question_key
+from keyword_index import KeywordIndex, filter_values, reciprocal_rank_fusion
+
+
+TOPICS = ["트랜잭션 격리 수준", "정규화와 함수 종속", "교착상태 회피", "페이지 교체 알고리즘",
+          "해시 테이블 충돌", "이진 탐색 트리", "프로세스 스케줄링", "서브넷 마스크 계산"]
+SOURCES = ["2022년 1회", "2023년 2회", "2024년 3회"]
+CODES = [("c", "#include <stdio.h>\nint main() { printf(\"%d\", 1); }"),
+         ("java", "public class Main { public static void main(String[] a) {} }"),
+         ("python", "print(sum(range(10)))"),
+         (None, None)]
+
+
+def make_questions(count=48):
+    questions = []
+    for i in range(count):
+        language, code = CODES[i % len(CODES)]
+        question = {
+            "문제번호": i + 1,
+            "출처": SOURCES[i % len(SOURCES)],
+            "문제내용": f"{TOPICS[i % len(TOPICS)]}에 대한 설명으로 옳은 것을 쓰시오. 번호 {i}",
+            "해설": f"{TOPICS[(i + 3) % len(TOPICS)]} 참고",
+        }
+        if code:
+            question["코드"] = code
+            question["language"] = language
+        questions.append(question)
+    return questions
+
+
+@pytest.fixture(scope="module")
+def questions():
+    return make_questions()
+
+
+@pytest.fixture(scope="module")
+def index(questions):
+    return KeywordIndex.build(questions, version="test")
+
+
+def matches(question, filters):
+    values = filter_values(question)
+    return all(values[field] in allowed for field, allowed in filters.items())
+
+
+def test_search_returns_content_id_and_key(index, questions):
+    results = index.search("서브넷 마스크", top_k=3)
+
+    assert results
+    content_ids = {question_content_id(q): q for q in questions}
+    for content_id, key, score in results:
+        assert question_key(content_ids[content_id]) == key
+        assert "서브넷 마스크" in content_ids[content_id]["문제내용"]
+        assert score > 0
+    assert [score for _, _, score in results] == sorted((s for _, _, s in results), reverse=True)
+
+
+def test_unknown_query_and_zero_top_k(index):
+    assert index.search("쀍쀍쀍", top_k=5) == []
+    assert index.search("트랜잭션", top_k=0) == []
+
+
+@pytest.mark.parametrize("filters", [
+    {"source": ["2023년 2회"]},
+    {"language": ["c", "java"]},
+    {"has_code": [False]},
+    {"source": ["2022년 1회", "2024년 3회"], "has_code": [True]},
+    {"language": ["python"], "source": ["2023년 2회"]},
+])
+def test_filtered_search_equals_filtering_full_ranking(index, questions, filters):
+    by_id = {question_content_id(q): q for q in questions}
+    everything = index.search("교착상태 트랜잭션 정규화", top_k=len(questions))
+
+    filtered = index.search("교착상태 트랜잭션 정규화", top_k=len(questions), filters=filters)
+
+    assert filtered
+    assert all(matches(by_id[content_id], filters) for content_id, _, _ in filtered)
+    # 점수가 같은 문서끼리는 순서가 정해져 있지 않으므로 ID → 점수로 비교
+    expected = {content_id: score for content_id, _, score in everything
+                if matches(by_id[content_id], filters)}
+    assert {content_id: score for content_id, _, score in filtered} == pytest.approx(expected)
+    assert [score for _, _, score in filtered] == sorted((s for _, _, s in filtered), reverse=True)
+
+
+def test_filter_fields_are_anded(index):
+    mask = index.filter_mask({"language": ["c"], "has_code": [False]})
+
+    assert not mask.any()
+    assert index.search("교착상태", filters={"language": ["c"], "has_code": [False]}) == []
+
+
+def test_filter_with_unknown_value_matches_nothing(index):
+    assert index.search("트랜잭션", filters={"source": ["없는 출처"]}) == []
+
+
+def test_save_and_load_keep_results(index, tmp_path):
+    path = str(tmp_path / "index.keyword.npz")
+    index.save(path)
+
+    loaded = KeywordIndex.load(path)
+    filters = {"source": ["2024년 3회"], "has_code": [True]}
+
+    assert loaded.version == "test"
+    assert loaded.search("해시 테이블", top_k=5, filters=filters) == \
+        index.search("해시 테이블", top_k=5, filters=filters)
+
+
+def test_reciprocal_rank_fusion_prefers_items_ranked_in_both():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d", "a"]])
+
+    assert [item for item, _ in fused][:2] == ["b", "a"]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
@@ -0,0 +1,108 @@
+"""NeighborGraph 증분 갱신 테스트 (전체 다시 만들기와 같은 결과인지)"""
+
+import zlib
+
+import numpy as np
+import pytest
+
+from nodes.neighbor_graph import (NeighborGraph, get_neighbor_graph, neighbor_graph_path,
+                                  sync_neighbor_graph)
+
+
+DIMENSION = 16
+
+
+def make_vectors(ids, seed=0):
+    """ID마다 고정된 무작위 벡터 (같은 ID는 어느 목록에서나 같은 벡터)"""
+    return np.stack([np.random.RandomState(zlib.crc32(f"{seed}:{item}".encode())).randn(DIMENSION)
+                     for item in ids]).astype(np.float32)
+
+
+def assert_same_graph(graph, expected):
+    assert graph.ids == expected.ids
+    np.testing.assert_array_equal(graph.neighbors, expected.neighbors)
+    finite = np.isfinite(expected.scores)
+    np.testing.assert_array_equal(np.isfinite(graph.scores), finite)
+    np.testing.assert_allclose(graph.scores[finite], expected.scores[finite], rtol=1e-5, atol=1e-6)
+
+
+IDS = [f"q{i}" for i in range(60)]
+
+
+@pytest.mark.parametrize("new_ids", [
+    IDS + [f"q{i}" for i in range(60, 75)],                       # 추가만
+    [item for i, item in enumerate(IDS) if i % 4],                # 삭제만
+    [item for i, item in enumerate(IDS) if i % 5] + ["n1", "n2"],  # 추가 + 삭제
+    list(reversed(IDS)),                                          # 순서만 바뀜
+], ids=["add", "remove", "add-remove", "reorder"])
+def test_updated_matches_full_rebuild(new_ids):
+    graph = NeighborGraph.build(IDS, make_vectors(IDS), k=5)
+
+    updated = graph.updated(new_ids, make_vectors(new_ids))
+
+    assert_same_graph(updated, NeighborGraph.build(new_ids, make_vectors(new_ids), k=5))
+
+
+def test_repeated_updates_match_full_rebuild():
+    ids = IDS[:20]
+    graph = NeighborGraph.build(ids, make_vectors(ids), k=4)
+    for step in range(5):
+        ids = ids[3:] + [f"s{step}_{i}" for i in range(8)]
+        graph = graph.updated(ids, make_vectors(ids))
+
+    assert_same_graph(graph, NeighborGraph.build(ids, make_vectors(ids), k=4))
+
+
+def test_graph_smaller_than_k_is_padded():
+    graph = NeighborGraph.build(["a", "b", "c"], make_vectors(["a", "b", "c"]), k=5)
+
+    assert graph.neighbors.shape == (3, 5)
+    assert (graph.neighbors[:, 2:] == -1).all()
+    assert len(graph.neighbors_of("a")) == 2
+    assert "a" not in graph.neighbors_of("a")
+
+
+def test_neighbors_of_orders_by_similarity():
+    vectors = np.array([[1, 0], [0.9, 0.1], [0.5, 0.5], [0, 1]], dtype=np.float32)
+    graph = NeighborGraph.build(["a", "b", "c", "d"], vectors, k=3)
+
+    assert graph.neighbors_of("a") == ["b", "c", "d"]
+    assert graph.neighbors_of("a", top_k=1) == ["b"]
+    assert graph.neighbors_of("missing") == []
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    graph = NeighborGraph.build(IDS, make_vectors(IDS), k=5, version="model-a")
+    path = str(tmp_path / "questions.neighbors.npz")
+    graph.save(path)
+
+    loaded = NeighborGraph.load(path)
+
+    assert loaded.version == "model-a"
+    assert_same_graph(loaded, graph)
+
+
+def test_sync_neighbor_graph_updates_and_rebuilds_on_version_change(tmp_path):
+    corpus_path = str(tmp_path / "questions.json")
+    embedded = []
+
+    def embed_for(ids):
+        def embed(rows):
+            embedded.append(len(rows))
+            return make_vectors([ids[row] for row in rows])
+        return embed
+
+    first = sync_neighbor_graph(corpus_path, IDS, embed_for(IDS), version="m1", k=5)
+    assert get_neighbor_graph(corpus_path).ids == first.ids
+
+    # 같은 ID 목록이면 임베딩을 다시 묻지 않음
+    sync_neighbor_graph(corpus_path, IDS, embed_for(IDS), version="m1", k=5)
+    assert embedded == [len(IDS)]
+
+    new_ids = IDS[5:] + ["x1", "x2"]
+    updated = sync_neighbor_graph(corpus_path, new_ids, embed_for(new_ids), version="m1", k=5)
+    assert_same_graph(updated, NeighborGraph.build(new_ids, make_vectors(new_ids), k=5))
+
+    rebuilt = sync_neighbor_graph(corpus_path, new_ids, embed_for(new_ids), version="m2", k=5)
+    assert rebuilt.version == "m2"
+    assert NeighborGraph.load(neighbor_graph_path(corpus_path)).version == "m2"
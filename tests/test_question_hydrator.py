@@ -0,0 +1,43 @@
+"""QuestionHydrator 테스트 (코퍼스 ID 조회, 코퍼스 파일이 없을 때)"""
+
+import json
+
+import pytest
+
+from corpus import question_content_id, question_key
+from nodes.question_hydrator import QuestionHydrator
+
+
+QUESTIONS = [{"출처": "2024년 1회", "문제번호": i, "문제내용": f"문제 {i}", "답": str(i)} for i in range(3)]
+
+
+def slim_hit(question):
+    return "q_" + question_content_id(question), {"key": question_key(question)}
+
+
+@pytest.fixture
+def in_tmp(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_hydrate_finds_slim_hits_in_corpus(in_tmp):
+    (in_tmp / "code_questions.json").write_text(json.dumps(QUESTIONS, ensure_ascii=False), encoding="utf-8")
+    hydrator = QuestionHydrator()
+
+    questions = hydrator.hydrate("code", [slim_hit(QUESTIONS[2]), slim_hit(QUESTIONS[0])])
+
+    assert questions == [QUESTIONS[2], QUESTIONS[0]]
+    assert hydrator.stats["not_found"] == 0
+
+
+def test_missing_corpus_counts_slim_hits_as_not_found(in_tmp):
+    hydrator = QuestionHydrator()
+    full = ("q_old", {"full_question": json.dumps(QUESTIONS[1], ensure_ascii=False)})
+
+    questions = hydrator.hydrate("theory", [slim_hit(QUESTIONS[0]), full])
+
+    # full_question을 가진 결과만 돌려주고 예외는 내지 않음
+    assert questions == [QUESTIONS[1]]
+    assert hydrator.stats["not_found"] == 1
+    assert hydrator.stats["corpus_lookups"] == 0
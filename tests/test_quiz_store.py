@@ -0,0 +1,200 @@
+"""shuffled_index 순열과 QuizStore.draw_question 테스트"""
+
+import json
+import sqlite3
+
+import pytest
+
+from corpus import question_key
+from nodes.quiz_store import DEFAULT_USER_ID, QuizStore, shuffled_index
+
+
+@pytest.fixture
+def store(tmp_path):
+    return QuizStore(str(tmp_path / "quiz.db"), migrate=False)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16, 100, 1000])
+@pytest.mark.parametrize("seed", [0, 1, 20240601])
+def test_shuffled_index_is_permutation(size, seed):
+    values = [shuffled_index(position, size, seed) for position in range(size)]
+
+    assert sorted(values) == list(range(size))
+
+
+def test_shuffled_index_depends_on_seed():
+    first = [shuffled_index(position, 100, 1) for position in range(100)]
+    second = [shuffled_index(position, 100, 2) for position in range(100)]
+
+    assert first != second
+    assert first == [shuffled_index(position, 100, 1) for position in range(100)]
+
+
+@pytest.mark.parametrize("position", [-1, 10])
+def test_shuffled_index_out_of_range(position):
+    with pytest.raises(IndexError):
+        shuffled_index(position, 10, 0)
+
+
+def test_draw_question_visits_every_position_once(store):
+    drawn = [store.draw_question("u1", "code", 20)[0] for _ in range(20)]
+
+    assert sorted(drawn) == list(range(20))
+    assert store.draw_question("u1", "code", 20) == (None, 0)
+
+
+def test_draw_question_skips_solved(store):
+    keys = [f"2023년 1회#{i + 1}" for i in range(10)]
+    store.add_solved("u1", "code", [keys[0], keys[3], keys[7]])
+
+    drawn = []
+    while True:
+        index, _ = store.draw_question("u1", "code", 10, question_key=keys.__getitem__)
+        if index is None:
+            break
+        drawn.append(index)
+        # 답을 내면 solved에 들어감 (안 그러면 두 번째 순서에서 다시 나옴)
+        store.add_solved("u1", "code", [keys[index]])
+
+    assert sorted(drawn) == [1, 2, 4, 5, 6, 8, 9]
+
+
+def test_same_number_in_other_exam_is_not_skipped(store):
+    questions = [{"출처": source, "문제번호": 3} for source in ("2022년 1회", "2023년 1회")]
+    store.add_solved("u1", "code", [question_key(questions[0])])
+
+    # 2022년 1회 3번만 풀었으므로 2023년 1회 3번은 나와야 함
+    index, _ = store.draw_question("u1", "code", 2,
+                                   question_key=lambda i: question_key(questions[i]))
+
+    assert index == 1
+
+
+def test_solved_survives_corpus_change(store):
+    store.add_solved("u1", "code", ["1", "2", "3"])
+
+    # 코퍼스 버전이 바뀌면 새 순서로 시작하지만 푼 문제는 다시 나오지 않음
+    drawn = {store.draw_question("u1", "code", 5, corpus_version="v2",
+                                 question_key=str)[0]
+             for _ in range(2)}
+
+    assert drawn == {0, 4}
+
+
+def test_drawn_but_unsolved_comes_back_in_second_pass(store):
+    first, _ = store.draw_question("u1", "code", 2, question_key=str)
+    second, _ = store.draw_question("u1", "code", 2, question_key=str)
+    store.add_solved("u1", "code", [str(second)])
+
+    # 순서 끝 → 새 순서로 한 번 더 돌며 뽑고 안 푼 문제를 다시 냄
+    index, _ = store.draw_question("u1", "code", 2, question_key=str)
+
+    assert index == first
+
+
+def test_progress_is_per_user(store):
+    store.add_solved("u1", "code", ["0"])
+
+    index, remaining = store.draw_question("u2", "code", 1, question_key=str)
+
+    assert (index, remaining) == (0, 0)
+    assert store.solved_keys("u2", "code") == set()
+
+
+def test_integer_solved_rows_are_migrated_to_keys(tmp_path):
+    corpus_file = tmp_path / "code_questions.json"
+    corpus_file.write_text(json.dumps([
+        {"출처": "2022년 1회", "문제번호": 3}, {"출처": "2023년 1회", "문제번호": 3},
+        {"출처": "2023년 1회", "문제번호": 4},
+    ], ensure_ascii=False), encoding="utf-8")
+    db_path = str(tmp_path / "quiz.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript("""
+            CREATE TABLE solved (user_id TEXT NOT NULL, question_type TEXT NOT NULL,
+                                 question_id INTEGER NOT NULL, solved_at REAL NOT NULL,
+                                 PRIMARY KEY (user_id, question_type, question_id));
+            INSERT INTO solved VALUES ('u1', 'code', 3, 1.0), ('u1', 'code', 99, 2.0);
+        """)
+    conn.close()
+
+    store = QuizStore(db_path, migrate=False, corpus_file=str(tmp_path / "{question_type}_questions.json"))
+
+    # 예전처럼 같은 번호의 모든 회차 문제를 푼 것으로, 코퍼스에 없는 번호는 "#번호"로
+    assert store.solved_keys("u1", "code") == {"2022년 1회#3", "2023년 1회#3", "#99"}
+
+
+def test_clear_solved_starts_new_epoch(store):
+    store.add_solved("u1", "code", ["A#1", "A#2"])
+    store.add_solved("u1", "theory", ["B#1"])
+    store.add_solved("u2", "code", ["A#1"])
+
+    store.clear_solved("u1", "code")
+    assert store.solved_keys("u1", "code") == set()
+    assert store.solved_keys("u1", "theory") == {"B#1"}
+
+    # 지난 세대에 풀었던 문제를 다시 풀면 새 세대로 기록
+    store.add_solved("u1", "code", ["A#2"])
+    assert store.solved_keys("u1", "code") == {"A#2"}
+
+    store.clear_solved("u1")
+    assert store.solved_keys("u1", "code") == set()
+    assert store.solved_keys("u1", "theory") == set()
+    assert store.solved_keys("u2", "code") == {"A#1"}
+
+
+def test_draw_after_clear_offers_previously_solved(store):
+    store.add_solved("u1", "code", ["0", "1"])
+    assert store.draw_question("u1", "code", 2, question_key=str)[0] is None
+
+    store.clear_solved("u1")
+    store.reset_progress("u1")
+
+    assert store.draw_question("u1", "code", 2, question_key=str)[0] is not None
+
+
+def test_solved_rows_without_epoch_are_upgraded(tmp_path):
+    db_path = str(tmp_path / "quiz.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript("""
+            CREATE TABLE solved (user_id TEXT NOT NULL, question_type TEXT NOT NULL,
+                                 question_key TEXT NOT NULL, solved_at REAL NOT NULL,
+                                 PRIMARY KEY (user_id, question_type, question_key));
+            INSERT INTO solved VALUES ('u1', 'code', 'A#1', 1.0);
+        """)
+    conn.close()
+
+    store = QuizStore(db_path, migrate=False)
+
+    assert store.solved_keys("u1", "code") == {"A#1"}
+    store.clear_solved("u1")
+    assert store.solved_keys("u1", "code") == set()
+
+
+def test_wrong_answers_are_per_user(store):
+    store.add_wrong({"문제번호": 1}, "a", "b", timestamp=1.0, user_id="u1")
+    store.add_wrong({"문제번호": 2}, "c", "d", timestamp=2.0, user_id="u2")
+    store.add_wrong({"문제번호": 3}, "e", "f", timestamp=3.0, user_id="u1")
+
+    recent = store.recent_wrong("u1", limit=5)
+
+    assert [item["question"]["문제번호"] for item in recent] == [1, 3]
+    assert {item["user_id"] for item in recent} == {"u1"}
+    assert store.count_wrong("u1") == 2
+    assert store.count_wrong("u2") == 1
+
+
+def test_wrong_answers_without_user_are_upgraded(tmp_path):
+    db_path = str(tmp_path / "quiz.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript("""
+            CREATE TABLE wrong_answers (id INTEGER PRIMARY KEY AUTOINCREMENT, question TEXT NOT NULL,
+                                        user_answer TEXT, correct_answer TEXT, created_at REAL NOT NULL);
+            INSERT INTO wrong_answers (question, user_answer, correct_answer, created_at)
+                VALUES ('{"문제번호": 7}', 'x', 'y', 1.0);
+        """)
+    conn.close()
+
+    store = QuizStore(db_path, migrate=False)
+
+    assert [item["question"]["문제번호"] for item in store.recent_wrong(DEFAULT_USER_ID)] == [7]
+    assert store.recent_wrong("someone-else") == []